@@ -2,9 +2,11 @@ from fastapi import APIRouter, Depends, HTTPException
 from sqlalchemy.orm import Session
 from sqlalchemy import select
 from uuid import UUID
+from app import request_ids
 from app.db import get_db
 from app.models.request import Request
 from app.schemas.request import RequestCreate, RequestOut
+from app.services import request_status
 
 router = APIRouter(prefix="/requests", tags=["requests"])
 
@@ -28,19 +30,20 @@ def create_request(payload: RequestCreate, db: Session = Depends(get_db)):
 
 @router.get("/{request_id}", response_model=RequestOut)
 def get_request(request_id: UUID, db: Session = Depends(get_db)):
-    rec = db.get(Request, request_id)
+    rec = db.execute(select(Request).where(*request_ids.match(Request, request_id))).scalar_one_or_none()
     if not rec:
         raise HTTPException(404, "Request not found")
     return rec
 
 @router.patch("/{request_id}/status", response_model=RequestOut)
 def update_status(request_id: UUID, status: str, db: Session = Depends(get_db)):
-    if status not in ("pending", "assigned", "calling", "completed"):
+    if status not in request_status.STATUSES:
         raise HTTPException(400, "Invalid status")
-    rec = db.get(Request, request_id)
-    if not rec:
-        raise HTTPException(404, "Request not found")
-    rec.status = status
+    rec = db.execute(request_status.transition([request_id], status)).scalar_one_or_none()
     db.commit()
-    db.refresh(rec)
-    return rec
+    if rec:
+        return rec
+    current = db.execute(request_status.current_statuses([request_id])).first()
+    if not current:
+        raise HTTPException(404, "Request not found")
+    raise HTTPException(409, f"Cannot change status from {current.status} to {status}")
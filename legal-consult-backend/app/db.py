@@ -1,9 +1,16 @@
+import asyncio
 import os
+from contextlib import asynccontextmanager
 from pathlib import Path
-from typing import Generator
+from typing import AsyncGenerator, Generator
 
 from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.engine import make_url
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker, DeclarativeBase, Session
+from starlette.concurrency import run_in_threadpool
+
+from app.services import pool_metrics
 
 # --- NEW: load .env early ---
 try:
@@ -23,8 +30,20 @@ DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
     raise RuntimeError("DATABASE_URL is not set. Put it in a .env file or environment.")
 
+# Pool settings come from DB_* env vars (app/settings.py); import after .env is loaded
+from app.settings import db_settings  # noqa: E402
+
+DB_MODE = db_settings.mode
+# async mode runs two pools per process: asyncpg for the routers, psycopg2 for the rest
+_ENGINES = 2 if DB_MODE == "async" else 1
+POOL_SIZE, MAX_OVERFLOW = db_settings.pool_limits(_ENGINES)
+_PING_IDLE = db_settings.pre_ping_idle_seconds if db_settings.pre_ping == "idle" else None
+
 # Engine & Session
-engine = create_engine(DATABASE_URL, pool_pre_ping=True)
+engine = create_engine(
+    DATABASE_URL, poolclass=pool_metrics.pool_class(is_async=False), **db_settings.engine_kwargs(_ENGINES)
+)
+pool_metrics.instrument(engine, ping_idle_seconds=_PING_IDLE)
 SessionLocal = sessionmaker(bind=engine, autoflush=False, autocommit=False)
 
 class Base(DeclarativeBase):
@@ -36,3 +55,125 @@ def get_db() -> Generator:
         yield db
     finally:
         db.close()
+
+
+# --- Async stack (asyncpg) ---
+# DB_MODE=async (default): async routers get an AsyncSession on an asyncpg engine.
+# DB_MODE=sync: the same routers get ThreadedSession, i.e. the psycopg2 session above
+# driven from Starlette's threadpool, exactly like the old sync `def` routes.
+
+
+def to_async_url(url: str) -> str:
+    """postgresql+psycopg2://...?sslmode=require -> postgresql+asyncpg://...?ssl=require"""
+    u = make_url(url)
+    query = dict(u.query)
+    if "sslmode" in query:
+        query["ssl"] = query.pop("sslmode")
+    for unsupported in ("channel_binding", "options"):
+        query.pop(unsupported, None)
+    return u.set(drivername="postgresql+asyncpg", query=query).render_as_string(hide_password=False)
+
+
+async_engine = None
+AsyncSessionLocal = None
+if DB_MODE == "async":
+    async_engine = create_async_engine(
+        to_async_url(DATABASE_URL), poolclass=pool_metrics.pool_class(is_async=True), **db_settings.engine_kwargs(_ENGINES)
+    )
+    pool_metrics.instrument(async_engine, ping_idle_seconds=_PING_IDLE)
+    # no expire on commit: attribute access after commit would otherwise need IO
+    AsyncSessionLocal = async_sessionmaker(bind=async_engine, autoflush=False, expire_on_commit=False)
+
+
+class ThreadedSession:
+    """AsyncSession-shaped wrapper running a sync Session in the threadpool (DB_MODE=sync)."""
+
+    def __init__(self, session: Session):
+        self.sync_session = session
+
+    def add(self, instance) -> None:
+        self.sync_session.add(instance)
+
+    def add_all(self, instances) -> None:
+        self.sync_session.add_all(instances)
+
+    async def run_sync(self, fn, *args, **kwargs):
+        return await run_in_threadpool(fn, self.sync_session, *args, **kwargs)
+
+    async def execute(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.execute, *args, **kwargs)
+
+    async def scalar(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalar, *args, **kwargs)
+
+    async def scalars(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.scalars, *args, **kwargs)
+
+    async def stream(self, *args, **kwargs):
+        result = await run_in_threadpool(self.sync_session.execute, *args, **kwargs)
+        return _ThreadedResult(result)
+
+    async def get(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.get, *args, **kwargs)
+
+    async def refresh(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.refresh, *args, **kwargs)
+
+    async def flush(self, *args, **kwargs):
+        return await run_in_threadpool(self.sync_session.flush, *args, **kwargs)
+
+    async def delete(self, instance):
+        return await run_in_threadpool(self.sync_session.delete, instance)
+
+    async def commit(self):
+        return await run_in_threadpool(self.sync_session.commit)
+
+    async def rollback(self):
+        return await run_in_threadpool(self.sync_session.rollback)
+
+    async def close(self):
+        return await run_in_threadpool(self.sync_session.close)
+
+
+class _ThreadedResult:
+    """The AsyncResult.partitions() part of a streamed sync Result."""
+
+    def __init__(self, result):
+        self._result = result
+
+    async def partitions(self, size: int):
+        while True:
+            rows = await run_in_threadpool(self._result.fetchmany, size)
+            if not rows:
+                break
+            yield rows
+
+    async def close(self):
+        await run_in_threadpool(self._result.close)
+
+
+# A ThreadedSession keeps its connection across several threadpool hops. Without a
+# cap, more sessions than connections would fill every worker thread with pool
+# waits while the sessions holding connections can't get a thread to finish on.
+_sync_sessions = asyncio.Semaphore(POOL_SIZE + MAX_OVERFLOW)
+
+
+@asynccontextmanager
+async def async_session() -> AsyncGenerator:
+    """AsyncSession, or ThreadedSession in sync mode. For work that outlives a request's
+    dependencies, e.g. a StreamingResponse body (FastAPI closes those before streaming)."""
+    if AsyncSessionLocal is not None:
+        async with AsyncSessionLocal() as db:
+            yield db
+        return
+    async with _sync_sessions:
+        db = ThreadedSession(SessionLocal(expire_on_commit=False))  # same semantics as AsyncSessionLocal
+        try:
+            yield db
+        finally:
+            await db.close()
+
+
+async def get_async_db() -> AsyncGenerator:
+    async with async_session() as db:
+        yield db
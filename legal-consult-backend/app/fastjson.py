@@ -0,0 +1,42 @@
+# app/fastjson.py
+# orjson encoding of plain column rows, for list endpoints that return thousands of rows.
+#
+# Validating ORM objects into ArticleOut/RequestOut (from_attributes) and dumping
+# them costs more CPU than the query itself on large pages. The list routes select
+# the schema's columns as tuples instead and encode them here. Output is the same
+# bytes pydantic produces for those schemas: fields in schema order, UUIDs as
+# strings, naive datetimes as ISO 8601 (only naive timestamps are stored).
+# Rows must start with one column per name, in the same order (projection.columns);
+# trailing columns (ORDER BY / cursor helpers) are dropped.
+import uuid
+from typing import Iterable, Optional, Sequence
+
+import orjson
+
+
+def _default(value):
+    # asyncpg returns its own UUID subclass, which orjson only encodes natively as the exact type
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
+def dumps(obj) -> bytes:
+    return orjson.dumps(obj, default=_default)
+
+
+def objects(names: Sequence[str], rows: Iterable) -> list[dict]:
+    return [dict(zip(names, row)) for row in rows]
+
+
+def dump_list(names: Sequence[str], rows: Iterable) -> bytes:
+    return dumps(objects(names, rows))
+
+
+def dump_page(names: Sequence[str], rows: Iterable, next_cursor: Optional[str]) -> bytes:
+    return dumps({"items": objects(names, rows), "next_cursor": next_cursor})
+
+
+def dump_lines(names: Sequence[str], rows: Iterable) -> bytes:
+    """NDJSON: one object per line."""
+    return b"".join(dumps(dict(zip(names, row))) + b"\n" for row in rows)
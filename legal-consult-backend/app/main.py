@@ -1,15 +1,45 @@
 import os
-from fastapi import FastAPI
+import time
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, Depends, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import RedirectResponse
+from fastapi.responses import PlainTextResponse, RedirectResponse
 
 
-from .db import Base, engine
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from . import metrics
+from .db import Base, engine, async_engine, get_async_db, DB_MODE
+from .settings import db_settings
 from .routers import articles
 from .routers import requests as requests_router
 from .routers import auth as auth_router  # <-- NEW: bring in /auth routes
+from .routers import lawyers as lawyers_router
+from .routers import admin as admin_router
+from .routers import attachments as attachments_router
+from .services import article_index, partitions, pool_metrics, request_events, response_cache, sql_profiler
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # in-memory article search (no-op unless ARTICLE_SEARCH_BACKEND=memory)
+    article_index.start()
+    response_cache.start()
+    # monthly requests partitions ahead of time (no-op unless requests is partitioned)
+    partitions.start()
+    # one LISTEN connection per worker for GET /requests/{id}/events
+    await request_events.start()
+    yield
+    await request_events.stop()
+    partitions.stop()
+    response_cache.stop()
+    article_index.stop()
+    if async_engine is not None:
+        await async_engine.dispose()
+
 
-app = FastAPI(title="Legal Consult API", version="0.1.0")
+app = FastAPI(title="Legal Consult API", version="0.1.0", lifespan=lifespan)
 
 # CORS so the mobile app can call APIs (tighten later)
 app.add_middleware(
@@ -20,6 +50,12 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# slow-query log, N+1 detector, sampled EXPLAIN capture (SQL_SLOW_MS, SQL_N1_THRESHOLD, SQL_EXPLAIN_SAMPLE):
+# hooks into the metrics middleware and SQL listeners, so it registers first
+sql_profiler.install()
+# per-route latency / SQL counts for GET /metrics and Server-Timing (METRICS_ENABLED, SERVER_TIMING)
+metrics.install(app, {"sync": engine, "async": async_engine})
+
 # Optional: create tables on first run if you set RUN_SYNC_DDL=1 (use Alembic otherwise)
 if os.getenv("RUN_SYNC_DDL", "0") == "1":
     Base.metadata.create_all(bind=engine)
@@ -33,7 +69,34 @@ def root():
 def health():
     return {"status": "ok", "version": "0.1.0"}
 
+@app.get("/health/db")
+async def health_db(db: AsyncSession = Depends(get_async_db)):
+    t0 = time.perf_counter()
+    try:
+        await db.execute(text("SELECT 1"))
+    except Exception as e:
+        raise HTTPException(503, f"Database unreachable: {type(e).__name__}")
+    pools = {"sync": pool_metrics.pool_status(engine)}
+    if async_engine is not None:
+        pools["async"] = pool_metrics.pool_status(async_engine)
+    return {
+        "status": "ok",
+        "mode": DB_MODE,
+        "latency_ms": round((time.perf_counter() - t0) * 1000, 2),
+        "settings": db_settings.model_dump(),
+        "pools": pools,
+    }
+
+@app.get("/metrics", include_in_schema=False)
+def prometheus_metrics():
+    if not metrics.METRICS_ENABLED:
+        raise HTTPException(404, "Metrics disabled")
+    return PlainTextResponse(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
 # --- Routers ---
 app.include_router(articles.router)          # /articles
 app.include_router(requests_router.router)   # /requests
 app.include_router(auth_router.router)       # /auth  <-- NEW: request-code, verify, me
+app.include_router(lawyers_router.router)    # /lawyers
+app.include_router(admin_router.router)      # /admin (X-Admin-Token)
+app.include_router(attachments_router.router)  # /attachments
@@ -0,0 +1,305 @@
+# app/metrics.py
+# Request instrumentation: Prometheus text at GET /metrics and Server-Timing headers.
+#
+# install(app, engines) adds a plain ASGI middleware (no BaseHTTPMiddleware task
+# hop) and SQLAlchemy before/after_cursor_execute hooks. Per HTTP request it records
+#   latency, response size, in-flight count    by method + route template
+#   SQL statement count and DB time            from the cursor hooks, via a contextvar
+# Routes are labelled by their template ("/requests/{request_id}"), unmatched paths
+# as "unmatched", so label cardinality stays bounded.
+#
+# Server-Timing: db (SQL time + statement count), serialize (spans the routers mark
+# with span("serialize")) and app (everything else until the response headers).
+#
+# Other per-statement / per-request consumers (app/services/sql_profiler.py) register
+# with add_hooks() instead of adding listeners and middleware of their own; with
+# count_templates each request's RequestTiming also counts statements per template.
+#
+# METRICS_ENABLED=0 and SERVER_TIMING=0 with no hooks registered skip install()
+# entirely: no middleware, no hooks. Recording is a few dict updates per request;
+# rendering only happens on scrape.
+import os
+import re
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from functools import lru_cache
+from typing import Callable, Optional
+
+from sqlalchemy import event
+
+from app.services.pool_metrics import Histogram, pool_status
+
+METRICS_ENABLED = os.getenv("METRICS_ENABLED", "1") == "1"
+SERVER_TIMING = os.getenv("SERVER_TIMING", "1") == "1"
+
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+_PLACEHOLDER_RE = re.compile(r"\$\d+|%\(\w+\)s|%s")
+_LIST_RE = re.compile(r"\?(?:::\w+)?(?:\s*,\s*\?(?:::\w+)?)+")
+_WS_RE = re.compile(r"\s+")
+
+
+@lru_cache(maxsize=4096)
+def template(statement: str) -> str:
+    """Statement with placeholders as ? and IN-lists of any length as a single "?, ..."."""
+    tpl = _PLACEHOLDER_RE.sub("?", statement)
+    tpl = _LIST_RE.sub("?, ...", tpl)
+    return _WS_RE.sub(" ", tpl).strip()
+
+
+class RequestTiming:
+    __slots__ = ("scope", "queries", "db", "spans", "templates", "locations")
+
+    def __init__(self, scope=None):
+        self.scope = scope
+        self.queries = 0
+        self.db = 0.0  # seconds
+        self.spans: dict[str, float] = {}
+        self.templates: dict[str, int] = {}               # template -> statements, with count_templates
+        self.locations: dict[str, Optional[str]] = {}     # template -> app line, filled in by hooks
+
+    @property
+    def route(self) -> str:
+        route = self.scope.get("route")
+        return f"{self.scope['method']} {getattr(route, 'path', None) or self.scope.get('path')}"
+
+
+_current: ContextVar[Optional[RequestTiming]] = ContextVar("request_timing", default=None)
+
+
+def current() -> Optional[RequestTiming]:
+    return _current.get()
+
+
+@contextmanager
+def span(name: str):
+    """Attribute the enclosed time to `name` in Server-Timing; no-op outside a request."""
+    timing = _current.get()
+    if timing is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.spans[name] = timing.spans.get(name, 0.0) + time.perf_counter() - t0
+
+
+# ---------- registry ----------
+class _Family:
+    def __init__(self, name: str, kind: str, help: str, labels: tuple[str, ...], bounds=None):
+        self.name, self.kind, self.help, self.labels, self.bounds = name, kind, help, labels, bounds
+        self.children: dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def inc(self, key: tuple, n: float = 1) -> None:
+        with self._lock:
+            self.children[key] = self.children.get(key, 0) + n
+
+    def observe(self, key: tuple, value: float) -> None:
+        hist = self.children.get(key)
+        if hist is None:
+            with self._lock:
+                hist = self.children.setdefault(key, Histogram(self.bounds))
+        hist.observe(value)
+
+    def render(self, out: list[str]) -> None:
+        out.append(f"# HELP {self.name} {self.help}")
+        out.append(f"# TYPE {self.name} {self.kind}")
+        for key, value in sorted(self.children.items()):
+            labels = _labels(zip(self.labels, key))
+            if self.kind == "histogram":
+                _render_histogram(out, self.name, labels, value.snapshot())
+            else:
+                out.append(f"{self.name}{{{labels}}} {_num(value)}" if labels else f"{self.name} {_num(value)}")
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels(pairs) -> str:
+    return ",".join(f'{k}="{_escape(v)}"' for k, v in pairs)
+
+
+def _num(value: float) -> str:
+    return str(int(value)) if float(value).is_integer() else repr(float(value))
+
+
+def _render_histogram(out: list[str], name: str, labels: str, snap: dict, scale: float = 1.0) -> None:
+    """Histogram.snapshot() (per-bucket counts) -> cumulative Prometheus buckets."""
+    sep = "," if labels else ""
+    running = 0
+    for bound, n in snap["buckets"].items():
+        running += n
+        le = "+Inf" if bound == "+Inf" else _num(float(bound) * scale)
+        out.append(f'{name}_bucket{{{labels}{sep}le="{le}"}} {running}')
+    out.append(f"{name}_sum{{{labels}}} {_num(snap['sum'] * scale)}" if labels else f"{name}_sum {_num(snap['sum'] * scale)}")
+    out.append(f"{name}_count{{{labels}}} {snap['count']}" if labels else f"{name}_count {snap['count']}")
+
+
+ROUTE = ("method", "route")
+requests_total = _Family("http_requests_total", "counter", "HTTP requests", ("method", "route", "status"))
+request_seconds = _Family("http_request_duration_seconds", "histogram", "Time to the last response byte", ROUTE, LATENCY_BUCKETS)
+response_bytes = _Family("http_response_size_bytes", "histogram", "Response body size", ROUTE, SIZE_BUCKETS)
+request_queries = _Family("http_request_db_queries", "histogram", "SQL statements per HTTP request", ROUTE, QUERY_COUNT_BUCKETS)
+request_db_seconds = _Family("http_request_db_seconds", "histogram", "SQL time per HTTP request", ROUTE, LATENCY_BUCKETS)
+db_queries = _Family("db_queries_total", "counter", "SQL statements executed (all, incl. background threads)", ())
+db_seconds = _Family("db_query_seconds_total", "counter", "Time spent in SQL statements", ())
+_FAMILIES = (requests_total, request_seconds, response_bytes, request_queries, request_db_seconds, db_queries, db_seconds)
+
+_in_flight = 0
+_engines: dict[str, object] = {}
+
+# fn(conn, statement, parameters, executemany, elapsed_seconds, timing or None)
+_statement_hooks: list[Callable] = []
+# fn(timing), once the HTTP request has finished
+_finish_hooks: list[Callable] = []
+_count_templates = False
+
+
+def add_hooks(on_statement: Optional[Callable] = None, on_finish: Optional[Callable] = None,
+              count_templates: bool = False) -> None:
+    """Register before install(); install() then runs even with metrics and Server-Timing off."""
+    global _count_templates
+    if on_statement is not None:
+        _statement_hooks.append(on_statement)
+    if on_finish is not None:
+        _finish_hooks.append(on_finish)
+    _count_templates = _count_templates or count_templates
+
+
+def render() -> str:
+    out: list[str] = [
+        "# HELP http_requests_in_flight HTTP requests being served",
+        "# TYPE http_requests_in_flight gauge",
+        f"http_requests_in_flight {_in_flight}",
+    ]
+    for family in _FAMILIES:
+        family.render(out)
+    if _engines:
+        pools = {name: pool_status(e) for name, e in _engines.items()}
+        for metric, key, help in (
+            ("db_pool_size", "size", "Pool size"),
+            ("db_pool_checked_out", "checked_out", "Connections in use"),
+            ("db_pool_overflow", "overflow", "Connections above pool size"),
+        ):
+            out += [f"# HELP {metric} {help}", f"# TYPE {metric} gauge"]
+            out += [f'{metric}{{pool="{name}"}} {p[key]}' for name, p in pools.items()]
+        out += ["# HELP db_pool_checkout_wait_seconds Wait for a pooled connection",
+                "# TYPE db_pool_checkout_wait_seconds histogram"]
+        for name, p in pools.items():
+            if p["stats"]:
+                _render_histogram(out, "db_pool_checkout_wait_seconds", f'pool="{name}"', p["stats"]["wait_ms"], 0.001)
+    return "\n".join(out) + "\n"
+
+
+# ---------- SQL hooks ----------
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info["query_start"].pop()
+    if METRICS_ENABLED:
+        db_queries.inc((), 1)
+        db_seconds.inc((), elapsed)
+    # sync mode: the threadpool runs with a copy of the request's context, so this is the same object
+    timing = _current.get()
+    if timing is not None:
+        timing.queries += 1
+        timing.db += elapsed
+        if _count_templates:
+            tpl = template(statement)
+            timing.templates[tpl] = timing.templates.get(tpl, 0) + 1
+    for hook in _statement_hooks:
+        hook(conn, statement, parameters, executemany, elapsed, timing)
+
+
+def _handle_error(ctx):
+    # a failed statement never reaches after_cursor_execute
+    starts = ctx.connection.info.get("query_start") if ctx.connection is not None else None
+    if starts:
+        starts.pop()
+
+
+# ---------- middleware ----------
+def _route(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", None) or "unmatched"
+
+
+def _server_timing(timing: RequestTiming, elapsed: float) -> bytes:
+    parts = [f'db;dur={timing.db * 1000:.2f};desc="{timing.queries} queries"']
+    other = elapsed - timing.db
+    for name, seconds in timing.spans.items():
+        parts.append(f"{name};dur={seconds * 1000:.2f}")
+        other -= seconds
+    parts.append(f"app;dur={max(other, 0) * 1000:.2f}")
+    return ", ".join(parts).encode()
+
+
+class MetricsMiddleware:
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            return await self.app(scope, receive, send)
+        global _in_flight
+        timing = RequestTiming(scope)
+        token = _current.set(timing)
+        t0 = time.perf_counter()
+        status = 500
+        size = 0
+
+        async def send_wrapper(message):
+            nonlocal status, size
+            if message["type"] == "http.response.start":
+                status = message["status"]
+                if SERVER_TIMING:
+                    headers = list(message.get("headers", []))
+                    headers.append((b"server-timing", _server_timing(timing, time.perf_counter() - t0)))
+                    message = {**message, "headers": headers}
+            elif message["type"] == "http.response.body":
+                size += len(message.get("body", b""))
+            await send(message)
+
+        _in_flight += 1
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            _in_flight -= 1
+            _current.reset(token)
+            if METRICS_ENABLED:
+                key = (scope["method"], _route(scope))
+                requests_total.inc((*key, str(status)))
+                request_seconds.observe(key, time.perf_counter() - t0)
+                response_bytes.observe(key, size)
+                request_queries.observe(key, timing.queries)
+                request_db_seconds.observe(key, timing.db)
+            for hook in _finish_hooks:
+                hook(timing)
+
+
+def install(app, engines: dict[str, object]) -> bool:
+    """Add the middleware and SQL hooks unless METRICS_ENABLED and SERVER_TIMING are off
+    and nothing called add_hooks()."""
+    if not (METRICS_ENABLED or SERVER_TIMING or _statement_hooks or _finish_hooks):
+        return False
+    for name, engine in engines.items():
+        if engine is None:
+            continue
+        _engines[name] = engine
+        sync_engine = getattr(engine, "sync_engine", engine)
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+        event.listen(sync_engine, "handle_error", _handle_error)
+    app.add_middleware(MetricsMiddleware)
+    return True
@@ -7,4 +7,9 @@ from . import article     # noqa: F401
 from . import request     # noqa: F401
 from . import payment     # noqa: F401
 from . import attachment  # noqa: F401
+from . import availability  # noqa: F401
+from . import otp         # noqa: F401
+from . import table_version  # noqa: F401
+from . import ingest      # noqa: F401
+from . import sql_plan    # noqa: F401
 # from app.schemas import RequestCreate, RequestOut
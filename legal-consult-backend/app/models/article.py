@@ -1,12 +1,29 @@
+import hashlib
 import uuid
 from datetime import datetime
-from sqlalchemy import Text, Integer, String, DateTime
-from sqlalchemy.dialects.postgresql import UUID, ARRAY
+from sqlalchemy import Text, Integer, String, DateTime, Index, Computed, event, inspect
+from sqlalchemy.dialects.postgresql import UUID, ARRAY, TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column
 from app.db import Base
 
 UUID_PK = UUID(as_uuid=True)
 
+# text search configuration used by search_vector and every query against it
+TS_CONFIG = "english"
+
+# weights: title (A) > summary (B) > court (C) > full_text (D)
+SEARCH_VECTOR_SQL = (
+    "setweight(to_tsvector('english', coalesce(title, '')), 'A') || "
+    "setweight(to_tsvector('english', coalesce(summary, '')), 'B') || "
+    "setweight(to_tsvector('english', coalesce(court, '')), 'C') || "
+    "setweight(to_tsvector('english', coalesce(full_text, '')), 'D')"
+)
+
+# dedupe key for ingestion; migration 0010 backfills existing rows with the same formula in SQL
+def content_hash(title, year, court, summary, full_text) -> str:
+    parts = (title or "", "" if year is None else str(year), court or "", summary or "", full_text or "")
+    return hashlib.sha256("\x1f".join(parts).encode()).hexdigest()
+
 class Article(Base):
     __tablename__ = "articles"
     id: Mapped[uuid.UUID] = mapped_column(UUID_PK, primary_key=True, default=uuid.uuid4)
@@ -16,4 +33,32 @@ class Article(Base):
     summary: Mapped[str | None] = mapped_column(Text, nullable=True)
     full_text: Mapped[str | None] = mapped_column(Text, nullable=True)
     tags: Mapped[list[str] | None] = mapped_column(ARRAY(String), nullable=True)
+    content_hash: Mapped[str | None] = mapped_column(String, nullable=True)
     created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    # maintained by Postgres (GENERATED ... STORED); deferred so plain loads skip it
+    search_vector: Mapped[str | None] = mapped_column(
+        TSVECTOR, Computed(SEARCH_VECTOR_SQL, persisted=True), deferred=True
+    )
+
+    __table_args__ = (
+        # keyset pagination: ORDER BY created_at DESC, id DESC + row-value seek
+        Index("ix_articles_created_at_id", "created_at", "id"),
+        Index("ix_articles_search_vector", "search_vector", postgresql_using="gin"),
+        Index("ux_articles_content_hash", "content_hash", unique=True),
+        # Article.tags.contains([tag])
+        Index("ix_articles_tags", "tags", postgresql_using="gin"),
+    )
+
+HASHED_COLUMNS = ("title", "year", "court", "summary", "full_text")
+
+@event.listens_for(Article, "before_insert")
+def _set_content_hash(_mapper, _conn, a: Article) -> None:
+    a.content_hash = content_hash(a.title, a.year, a.court, a.summary, a.full_text)
+
+@event.listens_for(Article, "before_update")
+def _update_content_hash(_mapper, _conn, a: Article) -> None:
+    # NULL marks a duplicate migration 0010 kept (the survivor holds the hash): leave it NULL,
+    # recomputing would collide with the survivor on ux_articles_content_hash
+    state = inspect(a)
+    if a.content_hash is not None and any(state.attrs[c].history.has_changes() for c in HASHED_COLUMNS):
+        _set_content_hash(_mapper, _conn, a)
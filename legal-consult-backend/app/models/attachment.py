@@ -1,7 +1,8 @@
 import uuid
 from typing import Optional
+from datetime import datetime
 
-from sqlalchemy import String, Text
+from sqlalchemy import BigInteger, DateTime, String, Text, Index
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
@@ -21,3 +22,12 @@ class Attachment(Base):
 
     s3_url: Mapped[Optional[str]] = mapped_column(Text, nullable=True)
     mime: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+
+    # filled by POST /attachments (app/services/storage.py); s3_url holds the backend url
+    filename: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    size: Mapped[Optional[int]] = mapped_column(BigInteger, nullable=True)
+    sha256: Mapped[Optional[str]] = mapped_column(String(64), nullable=True)
+    uploaded_by: Mapped[Optional[uuid.UUID]] = mapped_column(UUID_PK, nullable=True)  # users.id
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=True)
+
+    __table_args__ = (Index("ix_attachments_entity", "entity_type", "entity_id"),)
@@ -0,0 +1,29 @@
+# app/models/availability.py
+import uuid
+from datetime import datetime
+
+from sqlalchemy import BigInteger, ForeignKey, Index
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID, TSTZRANGE, Range
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+UUID_PK = PG_UUID(as_uuid=True)
+
+
+class LawyerSlot(Base):
+    """Concrete free ranges, expanded from Lawyer.availability_json for the next few weeks.
+
+    Derived data: rebuilt by `python -m app.services.lawyer_slots`.
+    """
+    __tablename__ = "lawyer_slots"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    lawyer_id: Mapped[uuid.UUID] = mapped_column(
+        UUID_PK, ForeignKey("lawyers.id", ondelete="CASCADE"), nullable=False, index=True
+    )
+    slot: Mapped[Range[datetime]] = mapped_column(TSTZRANGE, nullable=False)
+
+    __table_args__ = (
+        Index("ix_lawyer_slots_slot", "slot", postgresql_using="gist"),
+    )
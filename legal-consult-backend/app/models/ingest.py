@@ -0,0 +1,23 @@
+# app/models/ingest.py
+from datetime import datetime
+
+from sqlalchemy import String, BigInteger, DateTime
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class IngestCheckpoint(Base):
+    """How far `python -m app.services.article_ingest` got through a source file.
+
+    Written in the same transaction as each loaded chunk, so after a crash the
+    import resumes exactly after the last committed chunk.
+    """
+    __tablename__ = "ingest_checkpoints"
+
+    source: Mapped[str] = mapped_column(String, primary_key=True)        # absolute path
+    fingerprint: Mapped[str] = mapped_column(String, nullable=False)     # size:mtime; a changed file starts over
+    position: Mapped[int] = mapped_column(BigInteger, nullable=False)    # byte offset (JSONL) or record count (CSV)
+    records: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    inserted: Mapped[int] = mapped_column(BigInteger, nullable=False)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
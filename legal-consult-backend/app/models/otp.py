@@ -0,0 +1,25 @@
+# app/models/otp.py
+from datetime import datetime
+
+from sqlalchemy import String, DateTime, Index
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class OtpCode(Base):
+    """Pending login codes, shared by every worker (OTP_STORE=postgres).
+
+    UNLOGGED: no WAL, so writes are cheap and the table is emptied after a crash,
+    which for 10-minute codes is fine.
+    """
+    __tablename__ = "otp_codes"
+
+    phone: Mapped[str] = mapped_column(String, primary_key=True)
+    code: Mapped[str] = mapped_column(String, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime, nullable=False)  # naive UTC
+
+    __table_args__ = (
+        Index("ix_otp_codes_expires_at", "expires_at"),
+        {"prefixes": ["UNLOGGED"]},
+    )
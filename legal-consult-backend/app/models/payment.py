@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Numeric, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import String, Numeric, DateTime, CheckConstraint, ForeignKeyConstraint, Index
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -16,9 +16,9 @@ class Payment(Base):
 
     id: Mapped[uuid.UUID] = mapped_column(UUID_PK, primary_key=True, default=uuid.uuid4)
 
-    request_id: Mapped[Optional[uuid.UUID]] = mapped_column(
-        UUID_PK, ForeignKey("requests.id"), nullable=True
-    )
+    # requests is partitioned (0013) and its primary key is (id, created_at): the FK is composite
+    request_id: Mapped[Optional[uuid.UUID]] = mapped_column(UUID_PK, nullable=True)
+    request_created_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
     provider_ref: Mapped[Optional[str]] = mapped_column(String, nullable=True)
     amount: Mapped[float] = mapped_column(Numeric(10, 2), default=300.00)
 
@@ -28,7 +28,21 @@ class Payment(Base):
 
     __table_args__ = (
         CheckConstraint("status IN ('pending','paid','failed')", name="payments_status_chk"),
+        ForeignKeyConstraint(
+            ["request_id", "request_created_at"], ["requests.id", "requests.created_at"],
+            name="payments_request_fkey",
+        ),
+        # MATCH SIMPLE skips the FK when either column is NULL
+        CheckConstraint(
+            "request_id IS NULL OR request_created_at IS NOT NULL", name="payments_request_created_at_chk"
+        ),
+        Index("ix_payments_request_id", "request_id"),
     )
 
     # Relationships
-    request: Mapped["Request"] = relationship("Request", back_populates="payment")
+    request: Mapped["Request"] = relationship(
+        "Request",
+        primaryjoin="and_(foreign(Payment.request_id) == Request.id, "
+                    "foreign(Payment.request_created_at) == Request.created_at)",
+        back_populates="payment"
+    )
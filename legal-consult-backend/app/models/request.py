@@ -3,18 +3,22 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import String, Text, DateTime, ForeignKey, CheckConstraint
+from sqlalchemy import String, Text, DateTime, ForeignKey, CheckConstraint, Index, text
 from sqlalchemy.dialects.postgresql import UUID as PG_UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
+from app import request_ids
 from app.db import Base
 
 UUID_PK = PG_UUID(as_uuid=True)
 
 class Request(Base):
+    # Partitioned by month on created_at since migration 0013 (app/services/partitions.py);
+    # the table's primary key is (id, created_at), ids stay unique. New ids are UUIDv7
+    # carrying created_at, so lookups by id can be pruned (app/request_ids.py).
     __tablename__ = "requests"
 
-    id: Mapped[uuid.UUID] = mapped_column(UUID_PK, primary_key=True, default=uuid.uuid4)
+    id: Mapped[uuid.UUID] = mapped_column(UUID_PK, primary_key=True, default=request_ids.id_default)
 
     user_id: Mapped[Optional[uuid.UUID]] = mapped_column(
         UUID_PK, ForeignKey("users.id"), nullable=True
@@ -28,13 +32,32 @@ class Request(Base):
         UUID_PK, ForeignKey("lawyers.id"), nullable=True
     )
     preferred_window: Mapped[Optional[str]] = mapped_column(String, nullable=True)
-    created_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow)
+    created_at: Mapped[datetime] = mapped_column(DateTime, default=request_ids.created_at_default, nullable=False)
+
+    # work-queue lease (POST /requests/claim); an expired lease puts the row back to pending
+    claimed_by: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    lease_expires_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+    # assigned_lawyer as set by the claim (lawyer_id), cleared again only if the lease expires
+    claimed_lawyer: Mapped[Optional[uuid.UUID]] = mapped_column(UUID_PK, nullable=True)
 
     __table_args__ = (
         CheckConstraint(
             "status IN ('pending','assigned','calling','completed')",
             name="requests_status_chk",
         ),
+        Index("ix_requests_created_at_id", "created_at", "id"),
+        # GET /requests?status=... (filter + keyset order)
+        Index("ix_requests_status_created_at_id", "status", "created_at", "id"),
+        Index("ix_requests_user_id", "user_id"),
+        Index("ix_requests_assigned_lawyer", "assigned_lawyer"),
+        Index(
+            "ix_requests_pending_created_at", "created_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        Index(
+            "ix_requests_lease_expires_at", "lease_expires_at",
+            postgresql_where=text("lease_expires_at IS NOT NULL"),
+        ),
     )
 
     # relationships
@@ -43,5 +66,8 @@ class Request(Base):
         "Lawyer", back_populates="assigned_requests"
     )
     payment: Mapped[Optional["Payment"]] = relationship(
-        "Payment", back_populates="request", uselist=False, cascade="all,delete-orphan"
+        "Payment",
+        primaryjoin="and_(Request.id == foreign(Payment.request_id), "
+                    "Request.created_at == foreign(Payment.request_created_at))",
+        back_populates="request", uselist=False, cascade="all,delete-orphan"
     )
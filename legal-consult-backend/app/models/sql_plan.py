@@ -0,0 +1,30 @@
+# app/models/sql_plan.py
+from datetime import datetime
+from typing import Optional
+
+from sqlalchemy import BigInteger, String, Text, Float, DateTime, Index
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class SqlPlan(Base):
+    """EXPLAIN (ANALYZE, BUFFERS) of a sampled slow statement (app/services/sql_profiler.py).
+
+    Literals in the plan's expressions are redacted (sql_profiler.redact_plan), but the
+    table is still admin-only: review with GET /admin/sql, or directly:
+      SELECT template, duration_ms, plan->0->'Execution Time' FROM sql_plans ORDER BY captured_at DESC;
+    """
+    __tablename__ = "sql_plans"
+
+    id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
+    fingerprint: Mapped[str] = mapped_column(String, nullable=False)   # hash of the normalized template
+    template: Mapped[str] = mapped_column(Text, nullable=False)
+    params: Mapped[Optional[str]] = mapped_column(String, nullable=True)  # parameter shapes, never values
+    route: Mapped[Optional[str]] = mapped_column(String, nullable=True)
+    duration_ms: Mapped[float] = mapped_column(Float, nullable=False)  # as observed in the app
+    plan: Mapped[list] = mapped_column(JSONB, nullable=False)          # EXPLAIN ... FORMAT JSON
+    captured_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.utcnow, nullable=False)
+
+    __table_args__ = (Index("ix_sql_plans_fingerprint_captured_at", "fingerprint", "captured_at"),)
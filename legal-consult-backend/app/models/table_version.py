@@ -0,0 +1,17 @@
+# app/models/table_version.py
+from sqlalchemy import BigInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from app.db import Base
+
+
+class TableVersion(Base):
+    """Change counter per table, bumped by a statement-level trigger on every write.
+
+    Lets processes that cache a table's contents (the /articles response cache)
+    notice writes made anywhere, e.g. seed_articles.py, with one PK lookup.
+    """
+    __tablename__ = "table_versions"
+
+    table_name: Mapped[str] = mapped_column(String, primary_key=True)
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, default=0)
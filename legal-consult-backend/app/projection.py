@@ -0,0 +1,109 @@
+# app/projection.py
+# Load only the columns a response actually returns.
+#
+# The column list comes from the response schema's fields (optionally narrowed by a
+# `fields=id,title` query parameter) intersected with the ORM model's columns, and
+# is applied with load_only(). Narrowed responses are serialized through a
+# generated subset of the schema, so types and formats stay those of the schema.
+#
+# X-Projection-Saved-Bytes estimates what projection kept off the wire between
+# Postgres and the app: rows * avg_width (pg_stats) of the columns a plain entity
+# load would have fetched but this one didn't. A partitioned table (requests, since 0013)
+# only has stats of its own after a manual ANALYZE of the parent, which autovacuum never
+# runs; then its partitions' avg_width, weighted by their row counts, stands in.
+import time
+from functools import lru_cache
+from typing import Optional
+
+from fastapi import HTTPException
+from pydantic import BaseModel, ConfigDict, create_model
+from sqlalchemy import inspect as sa_inspect, text
+from sqlalchemy.orm import load_only
+
+WIDTHS_TTL_SECONDS = 600
+SAVED_BYTES_HEADER = "X-Projection-Saved-Bytes"
+
+
+def parse_fields(schema: type[BaseModel], fields: Optional[str]) -> tuple[str, ...]:
+    """Requested field names in schema order (all of them when `fields` is empty); id is always kept."""
+    names = tuple(schema.model_fields)
+    if not fields:
+        return names
+    wanted = {f.strip() for f in fields.split(",") if f.strip()}
+    unknown = wanted - set(names)
+    if unknown:
+        raise HTTPException(400, f"Unknown fields: {', '.join(sorted(unknown))}; available: {', '.join(names)}")
+    wanted.add("id")
+    return tuple(n for n in names if n in wanted)
+
+
+@lru_cache(maxsize=None)
+def subset(schema: type[BaseModel], names: tuple[str, ...]) -> type[BaseModel]:
+    """`schema` itself, or a copy with only `names`."""
+    if names == tuple(schema.model_fields):
+        return schema
+    fields = {n: (schema.model_fields[n].annotation, schema.model_fields[n]) for n in names}
+    return create_model(
+        f"{schema.__name__}Fields", __config__=ConfigDict(from_attributes=True), **fields
+    )
+
+
+def _column_attrs(model) -> dict:
+    return {attr.key: attr for attr in sa_inspect(model).column_attrs}
+
+
+def columns(model, names, extra=()) -> list:
+    """Model attributes backing `names` (plus `extra`, e.g. ORDER BY / cursor columns),
+    `names` first and in order."""
+    attrs = _column_attrs(model)
+    missing = [n for n in names if n not in attrs]
+    if missing:
+        raise ValueError(f"{model.__name__} has no columns for {missing}")
+    keys = dict.fromkeys(k for k in (*names, *extra) if k in attrs)
+    return [getattr(model, k) for k in keys]
+
+
+def load_only_for(model, names, extra=()):
+    return load_only(*columns(model, names, extra))
+
+
+# ---------- saved-bytes estimate ----------
+_widths: dict[str, tuple[float, dict[str, int]]] = {}
+
+
+def _skipped(model, loaded) -> list[str]:
+    """Columns a plain select(model) loads that this projection doesn't."""
+    keep = {c.key for c in loaded}
+    return [
+        attr.columns[0].name
+        for key, attr in _column_attrs(model).items()
+        if not attr.deferred and key not in keep
+    ]
+
+
+_OWN_WIDTHS = text("SELECT attname, avg_width FROM pg_stats WHERE schemaname = current_schema() AND tablename = :t")
+_PARTITION_WIDTHS = text("""
+    SELECT s.attname, sum(s.avg_width * greatest(c.reltuples, 1)) / sum(greatest(c.reltuples, 1))
+    FROM pg_inherits i
+    JOIN pg_class c ON c.oid = i.inhrelid
+    JOIN pg_namespace n ON n.oid = c.relnamespace
+    JOIN pg_stats s ON s.schemaname = n.nspname AND s.tablename = c.relname
+    WHERE i.inhparent = to_regclass(:t)
+    GROUP BY s.attname
+""")
+
+
+async def saved_bytes(db, model, loaded, rows: int) -> Optional[int]:
+    """Estimate from pg_stats avg_width (the partitions' for a partitioned table);
+    None until the table has been ANALYZEd."""
+    table = model.__table__.name
+    cached = _widths.get(table)
+    if cached is None or cached[0] < time.monotonic():
+        widths = dict((await db.execute(_OWN_WIDTHS, {"t": table})).all())
+        if not widths:
+            widths = {k: round(v) for k, v in (await db.execute(_PARTITION_WIDTHS, {"t": table})).all()}
+        cached = _widths[table] = (time.monotonic() + WIDTHS_TTL_SECONDS, widths)
+    widths = cached[1]
+    if not widths:
+        return None
+    return rows * sum(widths.get(c, 0) for c in _skipped(model, loaded))
@@ -0,0 +1,74 @@
+# app/request_ids.py
+# Request ids that carry their created_at, so lookups by id alone can be partition-pruned.
+#
+# requests is partitioned by month on created_at (migration 0013); WHERE id = :id alone
+# probes every attached partition. New requests get UUIDv7 ids (RFC 9562): the first 48
+# bits are a Unix timestamp in milliseconds, and the model defaults make it the row's
+# created_at (whichever of the two is given, the other follows). match() turns an id
+# into id = :id plus a created_at range around that timestamp, which the planner prunes
+# to the one or two partitions it overlaps.
+#
+# Ids without a timestamp (uuid4: rows from before, datagen, clients' own ids) still work,
+# matched by id alone, unpruned.
+import os
+import uuid
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+_EPOCH = datetime(1970, 1, 1)
+# slack either side of the id's timestamp; created_at should equal it to the millisecond
+WINDOW = timedelta(days=1)
+
+
+def new_id(at: Optional[datetime] = None) -> uuid.UUID:
+    """UUIDv7 whose timestamp is `at` (naive UTC, default now)."""
+    if at is None:
+        at = datetime.utcnow()
+    elif at.tzinfo is not None:
+        at = at.astimezone(timezone.utc).replace(tzinfo=None)
+    ms = (at - _EPOCH) // timedelta(milliseconds=1)
+    rand = int.from_bytes(os.urandom(10), "big")
+    value = (ms & (2**48 - 1)) << 80 | 0x7 << 76 | (rand >> 62 & 0xFFF) << 64 | 0b10 << 62 | rand & (2**62 - 1)
+    return uuid.UUID(int=value)
+
+
+def created_at_of(request_id) -> Optional[datetime]:
+    """The timestamp a UUIDv7 id carries (naive UTC, millisecond precision); None for other ids."""
+    if not isinstance(request_id, uuid.UUID):
+        try:
+            request_id = uuid.UUID(str(request_id))
+        except ValueError:
+            return None
+    if request_id.version != 7:
+        return None
+    return _EPOCH + timedelta(milliseconds=request_id.int >> 80)
+
+
+# ---------- model defaults (context-sensitive: each sees the other's value) ----------
+def id_default(context) -> uuid.UUID:
+    return new_id(context.get_current_parameters().get("created_at"))
+
+
+def created_at_default(context) -> datetime:
+    at = created_at_of(context.get_current_parameters().get("id"))
+    return at if at is not None else datetime.utcnow()
+
+
+# ---------- lookups ----------
+def match(model, request_id) -> list:
+    """WHERE clauses for one request by id, with created_at bounds when the id has them."""
+    clauses = [model.id == request_id]
+    at = created_at_of(request_id)
+    if at is not None:
+        clauses += [model.created_at >= at - WINDOW, model.created_at < at + WINDOW]
+    return clauses
+
+
+def match_any(model, request_ids: Iterable) -> list:
+    """match() for a list: bounded by the ids' earliest/latest timestamps if every id has one."""
+    ids = list(request_ids)
+    clauses = [model.id.in_(ids)]
+    stamps = [created_at_of(i) for i in ids]
+    if stamps and None not in stamps:
+        clauses += [model.created_at >= min(stamps) - WINDOW, model.created_at < max(stamps) + WINDOW]
+    return clauses
@@ -0,0 +1,61 @@
+# app/routers/admin.py
+import hmac
+import os
+
+from fastapi import APIRouter, Depends, HTTPException, Header, Query
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.models.sql_plan import SqlPlan
+from app.schemas import DispatchOut
+from app.services import dispatch as dispatch_service, request_events, sql_profiler
+from app.services.response_cache import articles_cache
+
+router = APIRouter(prefix="/admin", tags=["admin"])
+
+ADMIN_TOKEN = os.getenv("ADMIN_TOKEN")
+
+def require_admin(x_admin_token: str | None = Header(None)):
+    # no ADMIN_TOKEN configured -> admin routes are closed
+    # constant-time; bytes, since compare_digest rejects non-ASCII str
+    if not ADMIN_TOKEN or not hmac.compare_digest((x_admin_token or "").encode(), ADMIN_TOKEN.encode()):
+        raise HTTPException(status_code=403, detail="Admin only")
+
+@router.post("/dispatch", response_model=DispatchOut, dependencies=[Depends(require_admin)])
+def run_dispatch(
+    dry_run: bool = Query(False, description="Solve and report without writing"),
+    limit: int | None = Query(None, ge=1, description="Oldest N pending requests only"),
+    db: Session = Depends(get_db),
+):
+    return dispatch_service.dispatch(db, dry_run=dry_run, limit=limit)
+
+@router.get("/cache", dependencies=[Depends(require_admin)])
+def cache_stats():
+    return {"articles": articles_cache.report()}
+
+@router.get("/events", dependencies=[Depends(require_admin)])
+def events_stats():
+    # this worker's listener and GET /requests/{id}/events subscribers
+    return {"requests": request_events.broker.report()}
+
+@router.get("/sql", dependencies=[Depends(require_admin)])
+def sql_report(
+    plans: int = Query(20, ge=0, le=200, description="Most recent captured plans to list"),
+    db: Session = Depends(get_db),
+):
+    rows = db.execute(
+        select(SqlPlan.id, SqlPlan.fingerprint, SqlPlan.route, SqlPlan.duration_ms, SqlPlan.captured_at, SqlPlan.template)
+        .order_by(SqlPlan.captured_at.desc()).limit(plans)
+    ).all()
+    return {**sql_profiler.report(), "plans": [r._asdict() for r in rows]}
+
+@router.get("/sql/plans/{plan_id}", dependencies=[Depends(require_admin)])
+def sql_plan(plan_id: int, db: Session = Depends(get_db)):
+    plan = db.get(SqlPlan, plan_id)
+    if plan is None:
+        raise HTTPException(status_code=404, detail="Plan not found")
+    return {
+        "id": plan.id, "fingerprint": plan.fingerprint, "template": plan.template, "params": plan.params,
+        "route": plan.route, "duration_ms": plan.duration_ms, "captured_at": plan.captured_at, "plan": plan.plan,
+    }
@@ -1,35 +1,162 @@
-from typing import List, Optional
-from fastapi import APIRouter, Depends, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import select, or_
+from functools import lru_cache
+from typing import List, Optional, Union
+from fastapi import APIRouter, Depends, Query, Request
+from pydantic import TypeAdapter
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, tuple_, func, cast
+from sqlalchemy.dialects.postgresql import REGCONFIG
 
-from app.db import get_db
-from app.models.article import Article
-from app.schemas import ArticleOut
+from app import fastjson, metrics, projection
+from app.db import get_async_db
+from app.models.article import Article, TS_CONFIG
+from app.pagination import encode_cursor, decode_cursor
+from app.services import article_index
+from app.services.response_cache import articles_cache
+from app.schemas import ArticleOut, ArticlePage, ArticleSearchHit
 
 router = APIRouter(prefix="/articles", tags=["articles"])
 
-@router.get("/", response_model=List[ArticleOut])
-def list_articles(
+# responses are serialized here (not by FastAPI) so the cache can keep the bytes
+_search_hits = TypeAdapter(List[ArticleSearchHit])
+
+@lru_cache(maxsize=None)
+def _list_adapter(names: tuple[str, ...]) -> TypeAdapter:
+    """List of ArticleOut narrowed to `names` (in-memory index hits are dicts)."""
+    return TypeAdapter(List[projection.subset(ArticleOut, names)])
+
+@router.get("/", response_model=Union[List[ArticleOut], ArticlePage])
+async def list_articles(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
-    query: Optional[str] = Query(None),
+    query: Optional[str] = Query(
+        None,
+        description="Full-text match (web-style syntax, as /articles/search); ranked in page mode, newest first with a cursor",
+    ),
     tag: Optional[str] = Query(None),
-    db: Session = Depends(get_db),
+    cursor: Optional[str] = Query(
+        None,
+        description="Keyset mode: pass the previous next_cursor, or an empty value for the first page",
+    ),
+    fields: Optional[str] = Query(None, description="Comma-separated subset of fields, e.g. id,title,year"),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    stmt = select(Article)
+    names = projection.parse_fields(ArticleOut, fields)
+    cached, key, version = articles_cache.lookup(request)
+    if cached is not None:
+        return cached
+
+    # ARTICLE_SEARCH_BACKEND=memory: answer query/tag lookups without touching the DB
+    index = article_index.get_index()
+    if index is not None and cursor is None and (query or tag):
+        hits = index.search(query, tag, (page - 1) * page_size, page_size)
+        if hits is not None:
+            adapter = _list_adapter(names)
+            with metrics.span("serialize"):
+                body = adapter.dump_json(adapter.validate_python(hits))
+            return articles_cache.store(request, key, version, body)
+
+    # only the columns the response needs (+ created_at for ordering / cursors); skips full_text.
+    # Plain tuples, encoded by orjson: no ORM objects, no per-row pydantic validation.
+    loaded = projection.columns(Article, names, extra=("created_at",))
+    rows, next_cursor = await _list_articles(page, page_size, query, tag, cursor, loaded, db)
+    with metrics.span("serialize"):
+        if cursor is None:
+            body = fastjson.dump_list(names, rows)
+        else:
+            body = fastjson.dump_page(names, rows, next_cursor)
+    headers = {}
+    saved = await projection.saved_bytes(db, Article, loaded, len(rows))
+    if saved is not None:
+        headers[projection.SAVED_BYTES_HEADER] = str(saved)
+    return articles_cache.store(request, key, version, body, headers)
+
+async def _list_articles(page, page_size, query, tag, cursor, loaded, db):
+    """(rows, next_cursor); next_cursor is only meaningful in keyset mode."""
+    stmt = select(*loaded)
+    # id breaks ties between rows created in the same instant, so the order is total
+    order = (Article.created_at.desc(), Article.id.desc())
     if query:
-        like = f"%{query.lower()}%"
-        stmt = stmt.where(
-            or_(
-                Article.title.ilike(like),
-                Article.summary.ilike(like),
-                Article.court.ilike(like),
-            )
-        )
+        # GIN-backed search_vector match, as /articles/search (no unindexed ILIKE scan)
+        tsq = func.websearch_to_tsquery(cast(TS_CONFIG, REGCONFIG), query)
+        stmt = stmt.where(Article.search_vector.op("@@")(tsq))
+        if cursor is None:
+            # keyset cursors seek on (created_at, id), so only page mode ranks
+            order = (func.ts_rank(Article.search_vector, tsq).desc(), *order)
     if tag:
         stmt = stmt.where(Article.tags.contains([tag]))
 
-    offset = (page - 1) * page_size
-    stmt = stmt.order_by(Article.created_at.desc()).offset(offset).limit(page_size)
-    return db.execute(stmt).scalars().all()
+    stmt = stmt.order_by(*order)
+
+    if cursor is None:
+        # legacy page/page_size contract: plain list, OFFSET-based
+        offset = (page - 1) * page_size
+        return (await db.execute(stmt.offset(offset).limit(page_size))).all(), None
+
+    # keyset mode: seek past the last row seen (served by ix_articles_created_at_id)
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        stmt = stmt.where(tuple_(Article.created_at, Article.id) < tuple_(created_at, last_id))
+
+    rows = (await db.execute(stmt.limit(page_size + 1))).all()
+    next_cursor = None
+    if len(rows) > page_size:
+        rows = rows[:page_size]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    return rows, next_cursor
+
+
+# ts_headline re-parses the text it highlights, so cap how much of full_text it sees
+SNIPPET_SOURCE_CHARS = 20000
+SNIPPET_OPTIONS = "StartSel=<mark>, StopSel=</mark>, MaxFragments=2, MaxWords=30, MinWords=10"
+
+@router.get("/search", response_model=List[ArticleSearchHit])
+async def search_articles(
+    request: Request,
+    q: str = Query(..., min_length=1, description="Web-style query: words, \"phrases\", -exclude, or"),
+    limit: int = Query(10, ge=1, le=50),
+    offset: int = Query(0, ge=0, le=1000),
+    tag: Optional[str] = Query(None),
+    db: AsyncSession = Depends(get_async_db),
+):
+    cached, key, version = articles_cache.lookup(request)
+    if cached is not None:
+        return cached
+
+    config = cast(TS_CONFIG, REGCONFIG)
+    tsq = func.websearch_to_tsquery(config, q)
+    rank = func.ts_rank(Article.search_vector, tsq)
+
+    # rank only GIN matches, then build snippets for the page we return
+    top = select(Article.id, rank.label("rank")).where(Article.search_vector.op("@@")(tsq))
+    if tag:
+        top = top.where(Article.tags.contains([tag]))
+    top = (
+        top.order_by(rank.desc(), Article.created_at.desc())
+        .offset(offset)
+        .limit(limit)
+        .subquery()
+    )
+
+    source = func.concat_ws(
+        " ", Article.summary, func.left(Article.full_text, SNIPPET_SOURCE_CHARS)
+    )
+    snippet = func.ts_headline(config, source, tsq, SNIPPET_OPTIONS)
+    stmt = (
+        select(Article, top.c.rank, snippet.label("snippet"))
+        .join(top, top.c.id == Article.id)
+        # full_text only feeds ts_headline in SQL; don't ship it back to Python
+        .options(projection.load_only_for(Article, tuple(ArticleOut.model_fields)))
+        .order_by(top.c.rank.desc(), Article.created_at.desc())
+    )
+
+    result = await db.execute(stmt)
+    with metrics.span("serialize"):
+        hits = [
+            ArticleSearchHit(
+                **ArticleOut.model_validate(article).model_dump(), rank=score, snippet=fragment
+            )
+            for article, score, fragment in result
+        ]
+        body = _search_hits.dump_json(hits)
+    return articles_cache.store(request, key, version, body)
@@ -0,0 +1,191 @@
+# app/routers/attachments.py
+import uuid
+from typing import Optional
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request as HttpRequest
+from fastapi.responses import Response
+from sqlalchemy import and_, exists, or_, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from starlette.requests import ClientDisconnect
+
+from app import request_ids
+from app.db import get_async_db, async_session
+from app.models.article import Article
+from app.models.attachment import Attachment
+from app.models.lawyer import Lawyer
+from app.models.request import Request
+from app.models.user import User
+from app.schemas import AttachmentOut
+from app.security import Principal, get_current_user
+from app.services import storage
+
+router = APIRouter(prefix="/attachments", tags=["attachments"])
+
+ENTITY_TYPES = {"request": Request, "article": Article, "lawyer": Lawyer, "user": User}
+
+
+async def _principal(authorization: Optional[str] = Header(None)) -> Principal:
+    """get_current_user on a short-lived session: an upload or download may take minutes
+    and get_async_db would hold its connection for all of them."""
+    async with async_session() as db:
+        return await get_current_user(authorization, db)
+
+
+async def _owns_entity(db: AsyncSession, user: Principal, entity_type: str, entity_id: UUID) -> bool:
+    """The user a request/lawyer/user entity belongs to (a request also to its assigned
+    lawyer). Articles are the public catalogue: any signed-in user may read theirs."""
+    if entity_type == "article":
+        return True
+    if entity_type == "user":
+        return entity_id == user.id
+    if entity_type == "lawyer":
+        cond = (Lawyer.id == entity_id) & (Lawyer.user_id == user.id)
+    elif entity_type == "request":
+        lawyers_of_user = select(Lawyer.id).where(Lawyer.user_id == user.id)
+        cond = and_(*request_ids.match(Request, entity_id)) & or_(
+            Request.user_id == user.id, Request.assigned_lawyer.in_(lawyers_of_user)
+        )
+    else:
+        return False
+    return bool(await db.scalar(select(exists().where(cond))))
+
+
+async def _can_read(db: AsyncSession, user: Principal, att: Attachment) -> bool:
+    return (
+        user.role == "admin" or att.uploaded_by == user.id
+        or await _owns_entity(db, user, att.entity_type, att.entity_id)
+    )
+
+
+@router.post("/", response_model=AttachmentOut, status_code=201)
+async def upload_attachment(
+    request: HttpRequest,
+    entity_type: str = Query(..., description="request | article | lawyer | user"),
+    entity_id: UUID = Query(...),
+    filename: Optional[str] = Query(None, max_length=255),
+    content_type: Optional[str] = Header(None),
+    content_length: Optional[int] = Header(None),
+    user: Principal = Depends(_principal),
+):
+    """Raw request body (not multipart), streamed to the storage backend as it arrives.
+    No DB session is held during the upload; the row is written once the bytes are stored."""
+    model = ENTITY_TYPES.get(entity_type)
+    if model is None:
+        raise HTTPException(422, f"entity_type must be one of {', '.join(ENTITY_TYPES)}")
+    if content_length is not None and content_length > storage.ATTACHMENT_MAX_BYTES:
+        raise HTTPException(413, f"attachments are limited to {storage.ATTACHMENT_MAX_BYTES} bytes")
+    async with async_session() as db:
+        found = request_ids.match(Request, entity_id) if model is Request else [model.id == entity_id]
+        if not await db.scalar(select(exists().where(*found))):
+            raise HTTPException(404, f"{entity_type} {entity_id} not found")
+
+    backend = storage.backend()
+    attachment_id = uuid.uuid4()
+    key = storage.object_key(attachment_id)
+    try:
+        stored = await backend.save(key, request.stream(), content_type)
+    except storage.TooLarge:
+        raise HTTPException(413, f"attachments are limited to {storage.ATTACHMENT_MAX_BYTES} bytes")
+    except ClientDisconnect:
+        raise HTTPException(400, "upload interrupted")
+    if content_length is not None and stored.size != content_length:
+        await backend.delete(key)
+        raise HTTPException(400, "body shorter than Content-Length")
+
+    att = Attachment(
+        id=attachment_id, entity_type=entity_type, entity_id=entity_id, s3_url=backend.url(key),
+        mime=content_type, filename=filename, size=stored.size, sha256=stored.sha256, uploaded_by=user.id,
+    )
+    try:
+        async with async_session() as db:
+            db.add(att)
+            await db.commit()
+    except BaseException:
+        await backend.delete(key)  # no row, no orphaned object
+        raise
+    return att
+
+
+@router.get("/", response_model=list[AttachmentOut])
+async def list_attachments(
+    entity_type: str = Query(...),
+    entity_id: UUID = Query(...),
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    """All of the entity's attachments for its owner or an admin; otherwise only the caller's own."""
+    stmt = (
+        select(Attachment)
+        .where(Attachment.entity_type == entity_type, Attachment.entity_id == entity_id)
+        .order_by(Attachment.created_at)
+    )
+    if user.role != "admin" and not await _owns_entity(db, user, entity_type, entity_id):
+        stmt = stmt.where(Attachment.uploaded_by == user.id)
+    res = await db.execute(stmt)
+    return res.scalars().all()
+
+
+@router.get("/{attachment_id}", response_model=AttachmentOut)
+async def get_attachment(
+    attachment_id: UUID,
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    att = await db.get(Attachment, attachment_id)
+    # 404 rather than 403: don't confirm the id exists to someone who can't read it
+    if not att or not await _can_read(db, user, att):
+        raise HTTPException(404, "Attachment not found")
+    return att
+
+
+async def _load(attachment_id: UUID, user: Principal) -> Attachment:
+    # short-lived session: the body may stream for minutes
+    async with async_session() as db:
+        att = await db.get(Attachment, attachment_id)
+        if not att or att.size is None or not await _can_read(db, user, att):
+            raise HTTPException(404, "Attachment not found")
+    return att
+
+
+@router.api_route("/{attachment_id}/content", methods=["GET", "HEAD"])
+async def download_attachment(
+    attachment_id: UUID,
+    range_: Optional[str] = Header(None, alias="range"),
+    if_range: Optional[str] = Header(None),
+    if_none_match: Optional[str] = Header(None),
+    user: Principal = Depends(_principal),
+):
+    att = await _load(attachment_id, user)
+    etag = f'"{att.sha256}"'
+    headers = {"etag": etag, "cache-control": "private, max-age=0, must-revalidate"}
+    if if_none_match and etag in (t.strip() for t in if_none_match.split(",")):
+        return Response(status_code=304, headers=headers)
+    if if_range and if_range != etag:
+        range_ = None  # the client's copy is stale: send the whole thing
+    try:
+        return await storage.backend().response(
+            storage.object_key(att.id), att.size, range_, att.mime or "application/octet-stream", headers, att.filename
+        )
+    except storage.RangeNotSatisfiable:
+        return Response(status_code=416, headers={"content-range": f"bytes */{att.size}"})
+    except storage.ObjectMissing:
+        raise HTTPException(404, "Attachment content not found")
+
+
+@router.delete("/{attachment_id}", status_code=204)
+async def delete_attachment(
+    attachment_id: UUID,
+    user: Principal = Depends(get_current_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    att = await db.get(Attachment, attachment_id)
+    if not att:
+        raise HTTPException(404, "Attachment not found")
+    if att.uploaded_by != user.id and user.role != "admin":
+        raise HTTPException(403, "Only the uploader can delete an attachment")
+    await db.delete(att)
+    await db.commit()
+    if att.size is not None:
+        await storage.backend().delete(storage.object_key(att.id))
+    return Response(status_code=204)
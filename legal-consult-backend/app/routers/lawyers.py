@@ -0,0 +1,36 @@
+# app/routers/lawyers.py
+import os
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from sqlalchemy.orm import Session
+
+from app.db import get_db
+from app.schemas import LawyerOut
+from app.services import matching, lawyer_slots
+
+router = APIRouter(prefix="/lawyers", tags=["lawyers"])
+
+# memory: interval tree on the matcher snapshot | sql: lawyer_slots tstzrange + GiST
+AVAILABILITY_BACKEND = os.getenv("AVAILABILITY_BACKEND", "memory")
+
+@router.get("/available", response_model=list[LawyerOut])
+def available_lawyers(
+    from_: datetime = Query(..., alias="from", description="Start; naive times are in AVAILABILITY_TZ"),
+    to: datetime = Query(...),
+    specialty: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=200),
+    db: Session = Depends(get_db),
+):
+    if to <= from_:
+        raise HTTPException(400, "'to' must be after 'from'")
+
+    if AVAILABILITY_BACKEND == "sql":
+        return lawyer_slots.available(db, from_, to, specialty, limit)
+
+    m = matching.get_matcher(db)
+    return [
+        LawyerOut(id=m.ids[i], specialties=m.specialties[i], rating=m.ratings[i])
+        for i in m.available(from_, to, specialty, limit)
+    ]
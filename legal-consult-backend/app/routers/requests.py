@@ -1,58 +1,334 @@
 # app/routers/requests.py
+import asyncio
 from uuid import UUID
-from fastapi import APIRouter, Depends, HTTPException, Query
-from sqlalchemy.orm import Session
-from sqlalchemy import select
-from app.db import get_db
+from fastapi import APIRouter, Body, Depends, HTTPException, Query, Header, WebSocket, WebSocketDisconnect
+from pydantic import ValidationError
+from fastapi.responses import Response, StreamingResponse
+from starlette.concurrency import run_in_threadpool
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy import select, insert, tuple_
+from app import fastjson, metrics, projection, request_ids
+from app.db import get_async_db, async_session
 from app.models.request import Request
-from app.schemas import RequestCreate, RequestOut
+from app.models.user import User
+from app.models.lawyer import Lawyer
+from app.pagination import encode_cursor, decode_cursor
+from app.security import Principal, get_optional_user
+from app.schemas import (
+    RequestCreate, RequestOut, RequestPage, RequestBatchOut, BatchItemError, LawyerCandidate, ClaimIn,
+    StatusBulkIn, StatusBulkOut, StatusConflict,
+)
+from app.services import matching, claims, request_status, request_events
 
 router = APIRouter(prefix="/requests", tags=["requests"])
 
-@router.get("/", response_model=list[RequestOut])
-def list_requests(
+NDJSON = "application/x-ndjson"
+STREAM_BATCH = 500
+BATCH_MAX_ITEMS = 10_000
+
+@router.get("/", response_model=RequestPage)
+async def list_requests(
     status: str | None = Query(None, description="Filter by status"),
-    db: Session = Depends(get_db),
+    limit: int = Query(50, ge=1, le=500),
+    cursor: str | None = Query(None, description="next_cursor from the previous page"),
+    fields: str | None = Query(None, description="Comma-separated subset of fields, e.g. id,status"),
+    accept: str | None = Header(None),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    stmt = select(Request).order_by(Request.created_at.desc())
+    names = projection.parse_fields(RequestOut, fields)
+    # created_at is always needed for the ORDER BY / cursor
+    loaded = projection.columns(Request, names, extra=("created_at",))
+    # newest first; (created_at, id) keeps the order total so keyset pages never skip rows.
+    # Plain column tuples encoded by orjson (app.fastjson): no ORM objects, no per-row validation
+    stmt = select(*loaded).order_by(Request.created_at.desc(), Request.id.desc())
     if status:
         stmt = stmt.filter(Request.status == status)
-    rows = db.execute(stmt).scalars().all()
-    return rows
+    if cursor:
+        created_at, last_id = decode_cursor(cursor)
+        stmt = stmt.where(
+            tuple_(Request.created_at, Request.id) < tuple_(created_at, last_id),
+            # implied by the row comparison, but only a plain bound on created_at lets
+            # Postgres prune the monthly partitions newer than the cursor
+            Request.created_at <= created_at,
+        )
+
+    if accept and NDJSON in accept:
+        # full export: every matching row (from the cursor on), no limit
+        return StreamingResponse(_stream_ndjson(stmt, names), media_type=NDJSON)
+
+    rows = (await db.execute(stmt.limit(limit + 1))).all()
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor(rows[-1].created_at, rows[-1].id)
+    headers = {}
+    saved = await projection.saved_bytes(db, Request, loaded, len(rows))
+    if saved is not None:
+        headers[projection.SAVED_BYTES_HEADER] = str(saved)
+    with metrics.span("serialize"):
+        body = fastjson.dump_page(names, rows, next_cursor)
+    return Response(body, media_type="application/json", headers=headers)
+
+async def _stream_ndjson(stmt, names):
+    # plain column rows (no ORM identity map) fetched through a server-side cursor,
+    # one batch in memory at a time however large the table is
+    rows_stmt = stmt.execution_options(stream_results=True, max_row_buffer=STREAM_BATCH)
+    async with async_session() as db:
+        result = await db.stream(rows_stmt)
+        try:
+            async for batch in result.partitions(STREAM_BATCH):
+                yield fastjson.dump_lines(names, batch)
+        finally:
+            await result.close()
+
+async def _fresh_matcher() -> None:
+    # in async mode run_sync runs on the event loop: rebuild a stale matcher in a thread first
+    if matching.is_stale():
+        await run_in_threadpool(matching.refresh)
 
 @router.post("/", response_model=RequestOut, status_code=201)
-def create_request(payload: RequestCreate, db: Session = Depends(get_db)):
+async def create_request(
+    payload: RequestCreate,
+    auto_assign: bool = Query(False, description="Assign the best-matching lawyer if none is given"),
+    user: Principal | None = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_async_db),
+):
     rec = Request(
-        user_id=payload.user_id,
+        user_id=payload.user_id or (user.id if user else None),
         description=payload.description,
         preferred_window=payload.preferred_window,
         status="pending",
         assigned_lawyer=payload.assigned_lawyer,
     )
+    if auto_assign and rec.assigned_lawyer is None:
+        # matcher/claims services are sync: run them on the session's sync facade
+        await _fresh_matcher()
+        rec.assigned_lawyer = await db.run_sync(matching.pick_lawyer, rec)
+        if rec.assigned_lawyer:
+            rec.status = "assigned"
     db.add(rec)
-    db.commit()
-    db.refresh(rec)
+    await db.commit()
+    await db.refresh(rec)
+    return rec
+
+@router.post("/batch", response_model=RequestBatchOut, status_code=201)
+async def create_requests_batch(
+    items: list[dict] = Body(..., max_length=BATCH_MAX_ITEMS),
+    user: Principal | None = Depends(get_optional_user),
+    db: AsyncSession = Depends(get_async_db),
+):
+    # validate per item so one bad row doesn't reject the whole burst
+    valid: list[tuple[int, RequestCreate]] = []
+    errors: list[BatchItemError] = []
+    for i, raw in enumerate(items):
+        try:
+            valid.append((i, RequestCreate.model_validate(raw)))
+        except ValidationError as e:
+            errors.append(BatchItemError(index=i, errors=e.errors(include_url=False, include_context=False)))
+
+    # dangling user/lawyer ids would fail the INSERT for everyone: check them up front
+    user_ids = {p.user_id for _, p in valid if p.user_id}
+    lawyer_ids = {p.assigned_lawyer for _, p in valid if p.assigned_lawyer}
+    known_users = set((await db.execute(select(User.id).where(User.id.in_(user_ids)))).scalars()) if user_ids else set()
+    known_lawyers = set((await db.execute(select(Lawyer.id).where(Lawyer.id.in_(lawyer_ids)))).scalars()) if lawyer_ids else set()
+
+    rows = []
+    for i, p in valid:
+        missing = []
+        if p.user_id and p.user_id not in known_users:
+            missing.append({"loc": ["user_id"], "msg": "Unknown user", "type": "foreign_key"})
+        if p.assigned_lawyer and p.assigned_lawyer not in known_lawyers:
+            missing.append({"loc": ["assigned_lawyer"], "msg": "Unknown lawyer", "type": "foreign_key"})
+        if missing:
+            errors.append(BatchItemError(index=i, errors=missing))
+            continue
+        rows.append({
+            "user_id": p.user_id or (user.id if user else None),
+            "description": p.description,
+            "preferred_window": p.preferred_window,
+            "status": "pending",
+            "assigned_lawyer": p.assigned_lawyer,
+        })
+
+    created = []
+    if rows:
+        # one transaction; SQLAlchemy sends multi-row INSERT ... RETURNING, 1000 rows per statement.
+        # render_nulls: bulk INSERT otherwise drops None keys and splits the rows into one
+        # statement per run of identical key sets (items with and without preferred_window)
+        stmt = insert(Request).returning(Request, sort_by_parameter_order=True).execution_options(render_nulls=True)
+        created = (await db.execute(stmt, rows)).scalars().all()
+        await db.commit()
+    errors.sort(key=lambda e: e.index)
+    return RequestBatchOut(created=created, errors=errors)
+
+@router.post("/claim", response_model=list[RequestOut])
+async def claim_requests(payload: ClaimIn, db: AsyncSession = Depends(get_async_db)):
+    # FOR UPDATE SKIP LOCKED: concurrent workers never receive the same row
+    return await db.run_sync(
+        claims.claim,
+        worker=payload.worker,
+        n=payload.n,
+        lease_seconds=payload.lease_seconds,
+        to_status=payload.status,
+        lawyer_id=payload.lawyer_id,
+    )
+
+@router.post("/{request_id}/heartbeat", response_model=RequestOut)
+async def extend_lease(
+    request_id: UUID,
+    worker: str = Query(...),
+    lease_seconds: int = Query(300, ge=10, le=3600),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rec = await db.run_sync(claims.heartbeat, request_id, worker, lease_seconds)
+    if not rec:
+        raise HTTPException(409, "Lease expired or held by another worker")
     return rec
 
+async def _get(db: AsyncSession, request_id: UUID) -> Request | None:
+    # not db.get(): that looks up by id alone, across every partition
+    return (await db.execute(select(Request).where(*request_ids.match(Request, request_id)))).scalar_one_or_none()
+
 @router.get("/{request_id}", response_model=RequestOut)
-def get_request(request_id: UUID, db: Session = Depends(get_db)):
-    rec = db.get(Request, request_id)
+async def get_request(request_id: UUID, db: AsyncSession = Depends(get_async_db)):
+    rec = await _get(db, request_id)
     if not rec:
         raise HTTPException(404, "Request not found")
     return rec
 
+# ---------- status push (LISTEN/NOTIFY, app/services/request_events.py) ----------
+async def _status_snapshot(request_id: UUID) -> dict | None:
+    # short-lived session: a stream may stay open for hours, its connection must not
+    async with async_session() as db:
+        row = (await db.execute(
+            select(Request.id, Request.status, Request.assigned_lawyer).where(*request_ids.match(Request, request_id))
+        )).first()
+    if row is None:
+        return None
+    return {"event": "status", "id": str(row.id), "status": row.status,
+            "assigned_lawyer": str(row.assigned_lawyer) if row.assigned_lawyer else None}
+
+async def _watch(request_id: UUID, sub: request_events.Subscription, state: dict):
+    """Current state, then each change until completed (or the stream's time is up);
+    None on every heartbeat tick."""
+    yield state
+    deadline = asyncio.get_running_loop().time() + request_events.MAX_STREAM_SECONDS
+    while state["status"] != "completed":
+        left = deadline - asyncio.get_running_loop().time()
+        if left <= 0:
+            return
+        event = await sub.next(min(left, request_events.HEARTBEAT_SECONDS))
+        if event is None:
+            yield None
+            continue
+        if event is request_events.RESYNC:
+            event = await _status_snapshot(request_id)
+            if event is None:
+                return
+        if (event["status"], event["assigned_lawyer"]) != (state["status"], state["assigned_lawyer"]):
+            state = event
+            yield state
+
+async def _sse(request_id: UUID, sub: request_events.Subscription, state: dict):
+    try:
+        yield b"retry: 2000\n\n"  # EventSource reconnect delay after a timed-out stream
+        async for event in _watch(request_id, sub, state):
+            if event is None:
+                yield b": ping\n\n"  # keeps proxies from closing an idle stream
+            else:
+                yield b"event: status\ndata: " + fastjson.dumps(event) + b"\n\n"
+    finally:
+        sub.close()
+
+@router.get("/{request_id}/events")
+async def request_events_sse(request_id: UUID):
+    """Server-sent events: the current status, then every change. Ends after completed
+    (clients should close then) or after REQUEST_EVENTS_MAX_SECONDS (clients reconnect).
+    The same stream is available as a WebSocket on this path."""
+    if not request_events.REQUEST_EVENTS_ENABLED:
+        raise HTTPException(503, "Status events are disabled")
+    sub = request_events.broker.subscribe(request_id)  # before the snapshot, so nothing falls in between
+    state = await _status_snapshot(request_id)
+    if state is None:
+        sub.close()
+        raise HTTPException(404, "Request not found")
+    return StreamingResponse(
+        _sse(request_id, sub, state), media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.websocket("/{request_id}/events")
+async def request_events_ws(websocket: WebSocket, request_id: UUID):
+    if not request_events.REQUEST_EVENTS_ENABLED:
+        await websocket.close(code=1013, reason="Status events are disabled")
+        return
+    sub = request_events.broker.subscribe(request_id)
+    try:
+        state = await _status_snapshot(request_id)
+        if state is None:
+            await websocket.close(code=4404, reason="Request not found")
+            return
+        await websocket.accept()
+        # clients don't send anything; this only completes when they go away
+        gone = asyncio.ensure_future(websocket.receive())
+        try:
+            async for event in _watch(request_id, sub, state):
+                if gone.done():
+                    return
+                if event is not None:
+                    await websocket.send_text(fastjson.dumps(event).decode())
+        finally:
+            gone.cancel()
+        await websocket.close()
+    except WebSocketDisconnect:
+        pass
+    finally:
+        sub.close()
+
+@router.get("/{request_id}/candidates", response_model=list[LawyerCandidate])
+async def request_candidates(
+    request_id: UUID,
+    k: int = Query(5, ge=1, le=50),
+    specialty: list[str] | None = Query(None, description="Override specialties inferred from the description"),
+    db: AsyncSession = Depends(get_async_db),
+):
+    rec = await _get(db, request_id)
+    if not rec:
+        raise HTTPException(404, "Request not found")
+    await _fresh_matcher()
+    return await db.run_sync(matching.candidates_for, rec, k=k, specialties=specialty)
+
+@router.patch("/status", response_model=StatusBulkOut)
+async def update_status_bulk(payload: StatusBulkIn, db: AsyncSession = Depends(get_async_db)):
+    ids = list(dict.fromkeys(payload.ids))
+    updated = (await db.execute(request_status.transition(ids, payload.status))).scalars().all()
+    await db.commit()
+    conflicts, missing = [], []
+    if len(updated) < len(ids):
+        done = {r.id for r in updated}
+        current = dict((await db.execute(request_status.current_statuses(i for i in ids if i not in done))).all())
+        for i in ids:
+            if i in done:
+                continue
+            if i in current:
+                conflicts.append(StatusConflict(id=i, status=current[i]))
+            else:
+                missing.append(i)
+    return StatusBulkOut(updated=updated, conflicts=conflicts, missing=missing)
+
 @router.patch("/{request_id}/status", response_model=RequestOut)
-def update_status(
+async def update_status(
     request_id: UUID,
     status: str = Query(..., description="pending|assigned|calling|completed"),
-    db: Session = Depends(get_db),
+    db: AsyncSession = Depends(get_async_db),
 ):
-    if status not in ("pending", "assigned", "calling", "completed"):
+    if status not in request_status.STATUSES:
         raise HTTPException(400, "Invalid status")
-    rec = db.get(Request, request_id)
-    if not rec:
+    rec = (await db.execute(request_status.transition([request_id], status))).scalar_one_or_none()
+    await db.commit()
+    if rec:
+        return rec
+    current = (await db.execute(request_status.current_statuses([request_id]))).first()
+    if not current:
         raise HTTPException(404, "Request not found")
-    rec.status = status
-    db.commit()
-    db.refresh(rec)
-    return rec
+    raise HTTPException(409, f"Cannot change status from {current.status} to {status}")
@@ -1,6 +1,6 @@
 # app/schemas/request.py
-from typing import Optional
-from pydantic import BaseModel
+from typing import Literal, Optional
+from pydantic import BaseModel, Field
 from uuid import UUID
 from datetime import datetime
 
@@ -17,6 +17,16 @@ class ArticleOut(BaseModel):
         from_attributes = True
 
 
+class ArticlePage(BaseModel):
+    items: list[ArticleOut]
+    next_cursor: Optional[str] = None
+
+
+class ArticleSearchHit(ArticleOut):
+    rank: float
+    snippet: Optional[str] = None  # ts_headline fragment, matches wrapped in <mark>
+
+
 # --- New Request schemas ---
 class RequestBase(BaseModel):
     description: Optional[str] = None
@@ -34,6 +44,97 @@ class RequestOut(RequestBase):
     assigned_lawyer: Optional[UUID] = None
     status: str
     created_at: datetime
+    claimed_by: Optional[str] = None
+    lease_expires_at: Optional[datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
+class RequestPage(BaseModel):
+    items: list[RequestOut]
+    next_cursor: Optional[str] = None
+
+
+class BatchItemError(BaseModel):
+    index: int                 # position in the submitted list
+    errors: list[dict]         # pydantic-style [{loc, msg, type}, ...]
+
+
+class RequestBatchOut(BaseModel):
+    created: list[RequestOut]  # in submission order, invalid items skipped
+    errors: list[BatchItemError]
+
+
+class StatusBulkIn(BaseModel):
+    ids: list[UUID] = Field(..., min_length=1, max_length=1000)
+    status: Literal["pending", "assigned", "calling", "completed"]
+
+
+class StatusConflict(BaseModel):
+    id: UUID
+    status: str                # current status, which can't move to the requested one
+
+
+class StatusBulkOut(BaseModel):
+    updated: list[RequestOut]
+    conflicts: list[StatusConflict]
+    missing: list[UUID]
+
+
+class ClaimIn(BaseModel):
+    worker: str = Field(..., min_length=1, description="Stable id of the claiming agent/lawyer")
+    n: int = Field(1, ge=1, le=50)
+    lease_seconds: int = Field(300, ge=10, le=3600)
+    status: Literal["assigned", "calling"] = "assigned"
+    lawyer_id: Optional[UUID] = None  # claim only rows naming no lawyer or this one, and assign it
+
+
+# --- Lawyer matching ---
+class LawyerCandidate(BaseModel):
+    lawyer_id: UUID
+    score: float
+    rating: Optional[float] = None
+    specialties: list[str] = []
+    matched_specialties: list[str] = []
+    open_requests: int = 0
+    available: Optional[bool] = None
+
+    class Config:
+        from_attributes = True
+
+
+class LawyerOut(BaseModel):
+    id: UUID
+    specialties: Optional[list[str]] = None
+    rating: Optional[float] = None
+
+    class Config:
+        from_attributes = True
+
+
+class DispatchOut(BaseModel):
+    pending: int
+    assigned: int
+    rounds: int
+    score: float
+    build_ms: float
+    solve_ms: float
+
+    class Config:
+        from_attributes = True
+
+
+class AttachmentOut(BaseModel):
+    id: UUID
+    entity_type: Optional[str] = None
+    entity_id: Optional[UUID] = None
+    filename: Optional[str] = None
+    mime: Optional[str] = None
+    size: Optional[int] = None
+    sha256: Optional[str] = None
+    uploaded_by: Optional[UUID] = None
+    created_at: Optional[datetime] = None
 
     class Config:
         from_attributes = True
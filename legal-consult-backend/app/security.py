@@ -0,0 +1,150 @@
+# app/security.py
+# JWT issue/verify and the get_current_user dependency for any router.
+#
+# Two caches keep the signature check and the users lookup off the hot path:
+#   claims:     sha256(token) -> verified claims, LRU-bounded, valid until the token's exp
+#   principals: user id -> Principal, short TTL, dropped as soon as the ORM writes that user
+# The principal TTL bounds staleness for changes made by other workers or outside the ORM.
+import hashlib
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Optional
+
+import jwt
+from fastapi import Depends, Header, HTTPException
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.db import get_async_db
+from app.models.user import User
+
+JWT_SECRET = os.getenv("JWT_SECRET", "dev_secret")
+JWT_EXPIRES_MIN = int(os.getenv("JWT_EXPIRES_MIN", "43200"))
+AUTH_CLAIMS_CACHE_SIZE = int(os.getenv("AUTH_CLAIMS_CACHE_SIZE", "10000"))
+AUTH_PRINCIPAL_TTL_SECONDS = float(os.getenv("AUTH_PRINCIPAL_TTL_SECONDS", "30"))
+
+
+@dataclass(frozen=True)
+class Principal:
+    id: uuid.UUID
+    phone: Optional[str]
+    name: Optional[str]
+    role: Optional[str]
+
+
+class _ExpiringLRU:
+    """OrderedDict LRU whose entries also carry an absolute expiry (time.time())."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self._data: OrderedDict = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            hit = self._data.get(key)
+            if hit is None:
+                return None
+            value, expires = hit
+            if expires <= time.time():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def put(self, key, value, expires: float) -> None:
+        with self._lock:
+            self._data[key] = (value, expires)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key) -> None:
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_claims = _ExpiringLRU(AUTH_CLAIMS_CACHE_SIZE)
+_principals = _ExpiringLRU(AUTH_CLAIMS_CACHE_SIZE)
+
+
+def make_jwt(user_id: str, phone: str) -> str:
+    now = int(time.time())
+    exp = now + JWT_EXPIRES_MIN * 60
+    return jwt.encode({"sub": user_id, "phone": phone, "iat": now, "exp": exp}, JWT_SECRET, algorithm="HS256")
+
+
+def decode_token(token: str) -> dict:
+    """Verified claims; raises HTTPException 401. Cached by token hash until exp."""
+    key = hashlib.sha256(token.encode()).digest()
+    claims = _claims.get(key)
+    if claims is not None:
+        return claims
+    try:
+        claims = jwt.decode(token, JWT_SECRET, algorithms=["HS256"], options={"require": ["exp", "sub"]})
+        uuid.UUID(claims["sub"])
+    except Exception:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    _claims.put(key, claims, float(claims["exp"]))
+    return claims
+
+
+def invalidate_user(user_id: uuid.UUID) -> None:
+    _principals.pop(user_id)
+
+
+def _on_user_write(_mapper, _conn, target: User) -> None:
+    invalidate_user(target.id)
+
+
+for _evt in ("after_update", "after_delete"):
+    event.listen(User, _evt, _on_user_write)
+
+
+def _bearer(authorization: Optional[str]) -> Optional[str]:
+    if not authorization or not authorization.lower().startswith("bearer "):
+        return None
+    return authorization.split(" ", 1)[1].strip()
+
+
+async def _principal(token: str, db: AsyncSession) -> Principal:
+    claims = decode_token(token)
+    user_id = uuid.UUID(claims["sub"])
+    principal = _principals.get(user_id)
+    if principal is not None:
+        return principal
+    user = await db.get(User, user_id)
+    if not user:
+        raise HTTPException(status_code=401, detail="User not found")
+    principal = Principal(id=user.id, phone=user.phone, name=user.name, role=user.role)
+    # never cache past the token's own expiry
+    _principals.put(user_id, principal, min(time.time() + AUTH_PRINCIPAL_TTL_SECONDS, float(claims["exp"])))
+    return principal
+
+
+async def get_current_user(
+    authorization: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)
+) -> Principal:
+    token = _bearer(authorization)
+    if not token:
+        raise HTTPException(status_code=401, detail="Missing Authorization")
+    return await _principal(token, db)
+
+
+async def get_optional_user(
+    authorization: Optional[str] = Header(None), db: AsyncSession = Depends(get_async_db)
+) -> Optional[Principal]:
+    """Like get_current_user for routes that also serve anonymous callers; a bad token is still a 401."""
+    token = _bearer(authorization)
+    return await _principal(token, db) if token else None
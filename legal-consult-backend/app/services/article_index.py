@@ -0,0 +1,223 @@
+# app/services/article_index.py
+# In-process inverted index over articles (title/summary/court/tags) with BM25 scoring.
+#
+# Enabled with ARTICLE_SEARCH_BACKEND=memory; anything else keeps /articles on SQL.
+# Built once at startup, then a daemon thread polls for rows newer than the
+# created_at watermark and appends them. Edits/deletes of existing rows are only
+# picked up by rebuild() (articles are effectively append-only today).
+import math
+import os
+import re
+import threading
+import heapq
+import logging
+from array import array
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models.article import Article
+
+log = logging.getLogger(__name__)
+
+ARTICLE_SEARCH_BACKEND = os.getenv("ARTICLE_SEARCH_BACKEND", "sql")  # sql | memory
+ARTICLE_INDEX_POLL_SECONDS = float(os.getenv("ARTICLE_INDEX_POLL_SECONDS", "30"))
+
+# rows can commit with a created_at slightly behind the watermark; re-scan this much
+WATERMARK_OVERLAP = timedelta(seconds=60)
+
+# term-frequency boosts per field (title hits matter most)
+FIELD_BOOST = {"title": 3, "summary": 1, "court": 1, "tags": 2}
+BM25_K1 = 1.2
+BM25_B = 0.75
+MAX_TF = 0xFFFF
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+")
+
+
+def tokenize(text: Optional[str]) -> list[str]:
+    return _TOKEN_RE.findall(text.lower()) if text else []
+
+
+class _Postings:
+    """Doc ids (ascending) with a parallel array of weighted term frequencies."""
+    __slots__ = ("ids", "tfs")
+
+    def __init__(self):
+        self.ids = array("I")
+        self.tfs = array("H")
+
+
+class ArticleIndex:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._terms: dict[str, _Postings] = {}
+        self._tags: dict[str, array] = {}
+        self._doc_len = array("I")
+        self._created = array("d")             # created_at as POSIX seconds, by doc id
+        self._docs: list[tuple] = []           # ArticleOut fields, by doc id
+        self._by_uuid: dict = {}
+        self._total_len = 0
+        self.watermark: Optional[datetime] = None
+        self.ready = False
+
+    # ---------- building ----------
+    def _add(self, a: Article) -> None:
+        if a.id in self._by_uuid:
+            return
+        doc = len(self._docs)
+        self._docs.append((a.id, a.title, a.year, a.court, a.summary, list(a.tags or [])))
+        self._by_uuid[a.id] = doc
+        self._created.append(a.created_at.timestamp() if a.created_at else 0.0)
+
+        tf: dict[str, int] = {}
+        length = 0
+        fields = {"title": a.title, "summary": a.summary, "court": a.court, "tags": " ".join(a.tags or [])}
+        for field, text in fields.items():
+            for tok in tokenize(text):
+                tf[tok] = tf.get(tok, 0) + FIELD_BOOST[field]
+                length += 1
+        self._doc_len.append(length)
+        self._total_len += length
+
+        # doc ids only grow, so appending keeps every postings list sorted
+        for tok, n in tf.items():
+            p = self._terms.get(tok)
+            if p is None:
+                p = self._terms[tok] = _Postings()
+            p.ids.append(doc)
+            p.tfs.append(min(n, MAX_TF))
+        for tag in set(a.tags or []):
+            self._tags.setdefault(tag, array("I")).append(doc)
+
+        if a.created_at and (self.watermark is None or a.created_at > self.watermark):
+            self.watermark = a.created_at
+
+    def load(self, db: Session, batch: int = 2000) -> int:
+        """Index rows newer than the watermark (all rows on first call)."""
+        stmt = select(Article).order_by(Article.created_at, Article.id).execution_options(yield_per=batch)
+        if self.watermark is not None:
+            stmt = stmt.where(Article.created_at >= self.watermark - WATERMARK_OVERLAP)
+        added = 0
+        for a in db.execute(stmt).scalars():
+            with self._lock:
+                before = len(self._docs)
+                self._add(a)
+                added += len(self._docs) - before
+        self.ready = True
+        return added
+
+    # ---------- querying ----------
+    def search(self, query: Optional[str], tag: Optional[str], offset: int, limit: int) -> Optional[list[dict]]:
+        """BM25-ranked page for `query` (all terms must match), newest-first when only `tag`.
+
+        Returns None when the index can't answer and the caller should use SQL.
+        """
+        terms = list(dict.fromkeys(tokenize(query))) if query else []
+        if query and not terms:
+            return None
+
+        with self._lock:
+            allowed = None
+            if tag:
+                tag_docs = self._tags.get(tag)
+                if tag_docs is None:
+                    return []
+                allowed = set(tag_docs)
+
+            if not terms:
+                top = heapq.nlargest(offset + limit, allowed, key=self._created.__getitem__)
+                return [self._out(d) for d in top[offset:]]
+
+            postings = []
+            for t in terms:
+                p = self._terms.get(t)
+                if p is None:
+                    return []
+                postings.append(p)
+            postings.sort(key=lambda p: len(p.ids))
+
+            n_docs = len(self._docs)
+            avg_len = (self._total_len / n_docs) or 1.0
+            scores: dict[int, float] = {}
+            for i, p in enumerate(postings):
+                idf = math.log(1 + (n_docs - len(p.ids) + 0.5) / (len(p.ids) + 0.5))
+                nxt: dict[int, float] = {}
+                for doc, tf in zip(p.ids, p.tfs):
+                    if i == 0:
+                        if allowed is not None and doc not in allowed:
+                            continue
+                        acc = 0.0
+                    else:
+                        acc = scores.get(doc)
+                        if acc is None:
+                            continue
+                    norm = BM25_K1 * (1 - BM25_B + BM25_B * self._doc_len[doc] / avg_len)
+                    nxt[doc] = acc + idf * tf * (BM25_K1 + 1) / (tf + norm)
+                scores = nxt
+                if not scores:
+                    return []
+
+            top = heapq.nlargest(offset + limit, scores, key=lambda d: (scores[d], self._created[d]))
+            return [self._out(d) for d in top[offset:]]
+
+    def _out(self, doc: int) -> dict:
+        id_, title, year, court, summary, tags = self._docs[doc]
+        return {"id": id_, "title": title, "year": year, "court": court, "summary": summary, "tags": tags}
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "docs": len(self._docs),
+                "terms": len(self._terms),
+                "postings": sum(len(p.ids) for p in self._terms.values()),
+                "watermark": self.watermark.isoformat() if self.watermark else None,
+            }
+
+
+# ---------- process-wide instance + refresher ----------
+_index: Optional[ArticleIndex] = None
+_stop = threading.Event()
+
+
+def get_index() -> Optional[ArticleIndex]:
+    """The live index, or None when /articles should stay on SQL."""
+    if _index is not None and _index.ready:
+        return _index
+    return None
+
+
+def rebuild() -> ArticleIndex:
+    global _index
+    fresh = ArticleIndex()
+    with SessionLocal() as db:
+        fresh.load(db)
+    _index = fresh  # swap atomically; readers keep using the old one until then
+    return fresh
+
+
+def _poll() -> None:
+    while not _stop.wait(ARTICLE_INDEX_POLL_SECONDS):
+        try:
+            with SessionLocal() as db:
+                added = _index.load(db)
+            if added:
+                log.info("article index: +%d docs (watermark %s)", added, _index.watermark)
+        except Exception:
+            log.exception("article index refresh failed; keeping previous snapshot")
+
+
+def start() -> None:
+    if ARTICLE_SEARCH_BACKEND != "memory":
+        return
+    _stop.clear()
+    index = rebuild()
+    log.info("article index built: %s", index.stats())
+    threading.Thread(target=_poll, name="article-index-refresh", daemon=True).start()
+
+
+def stop() -> None:
+    _stop.set()
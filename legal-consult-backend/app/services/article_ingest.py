@@ -0,0 +1,328 @@
+# app/services/article_ingest.py
+# Streaming bulk import of articles from JSONL / CSV dumps.
+#
+#   python -m app.services.article_ingest judgments.jsonl [more.csv ...] [--workers 4] [--chunk 5000]
+#
+# Pipeline:
+#   reader (generator, main process) -> chunks of raw lines / CSV rows
+#   process pool: parse + normalize + content hash -> COPY-ready CSV text per chunk
+#   loader (main process), one transaction per chunk:
+#       COPY into a temp staging table
+#       INSERT INTO articles SELECT ... FROM staging ON CONFLICT (content_hash) DO NOTHING
+#       upsert ingest_checkpoints(source, position)
+# Duplicates (within the dump or against the table) are dropped by the unique
+# content_hash index. Chunks are loaded in input order and the checkpoint commits
+# with its chunk, so rerunning the same command after a crash resumes right after
+# the last loaded chunk. Memory is bounded by --chunk * in-flight chunks.
+#
+# Records: {"title", "year", "court", "summary", "full_text", "tags"}; tags may be
+# a list or a ";"/","-separated string. Records without a title are counted as bad.
+import argparse
+import csv
+import gzip
+import io
+import json
+import logging
+import os
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass
+from typing import Iterable, Iterator, Optional
+
+from sqlalchemy import text
+
+from app.db import engine
+from app.models.article import content_hash
+
+log = logging.getLogger(__name__)
+
+COLUMNS = ("title", "year", "court", "summary", "full_text", "tags", "content_hash")
+CHUNK_RECORDS = 5000
+PROGRESS_SECONDS = 5.0
+
+_WS_RE = re.compile(r"\s+")
+_TAG_SPLIT_RE = re.compile(r"[;,]")
+
+
+@dataclass
+class IngestStats:
+    records: int = 0
+    inserted: int = 0
+    bad: int = 0
+    bytes_read: int = 0
+
+    @property
+    def duplicates(self) -> int:
+        return self.records - self.bad - self.inserted
+
+
+# ---------- parse + normalize (runs in worker processes) ----------
+def _clean(value, collapse: bool = False) -> Optional[str]:
+    if value is None:
+        return None
+    s = str(value).replace("\x00", "").strip()
+    if collapse:
+        s = _WS_RE.sub(" ", s)
+    return s or None
+
+
+def _year(value) -> Optional[int]:
+    try:
+        y = int(str(value).strip()[:4])
+    except (TypeError, ValueError):
+        return None
+    return y if 1000 <= y <= 2999 else None
+
+
+def _tags(value) -> Optional[list[str]]:
+    items = value if isinstance(value, list) else _TAG_SPLIT_RE.split(value or "")
+    tags = dict.fromkeys(t for t in (_clean(i, collapse=True) for i in items) if t)
+    return [t.lower() for t in tags] or None
+
+
+def normalize(rec: dict) -> Optional[tuple]:
+    """Row in COLUMNS order, or None when the record is unusable."""
+    title = _clean(rec.get("title"), collapse=True)
+    if not title:
+        return None
+    year = _year(rec.get("year"))
+    court = _clean(rec.get("court"), collapse=True)
+    summary = _clean(rec.get("summary"))
+    full_text = _clean(rec.get("full_text"))
+    tags = _tags(rec.get("tags"))
+    return title, year, court, summary, full_text, tags, content_hash(title, year, court, summary, full_text)
+
+
+def _pg_array(items: Optional[list[str]]) -> Optional[str]:
+    if not items:
+        return None
+    return "{" + ",".join('"' + t.replace("\\", "\\\\").replace('"', '\\"') + '"' for t in items) + "}"
+
+
+def prepare(kind: str, items: list) -> tuple[str, int, int]:
+    """Raw chunk -> (COPY ... FORMAT csv payload, good rows, bad records)."""
+    buf = io.StringIO()
+    out = csv.writer(buf, lineterminator="\n")
+    good = bad = 0
+    for item in items:
+        try:
+            rec = json.loads(item) if kind == "jsonl" else item
+            row = normalize(rec) if isinstance(rec, dict) else None
+        except ValueError:
+            row = None
+        if row is None:
+            bad += 1
+            continue
+        # None -> empty unquoted field -> NULL (normalize never yields "")
+        out.writerow(row[:5] + (_pg_array(row[5]), row[6]))
+        good += 1
+    return buf.getvalue(), good, bad
+
+
+# ---------- readers (main process) ----------
+def _kind(path: str) -> str:
+    name = path[:-3] if path.endswith(".gz") else path
+    return "csv" if name.endswith(".csv") else "jsonl"
+
+
+def read_chunks(path: str, start: int, chunk: int) -> Iterator[tuple[list, int, int]]:
+    """(items, position after the chunk, bytes consumed). Position is a byte offset
+    for plain JSONL (resume = seek) and a record count otherwise (resume = skip)."""
+    kind = _kind(path)
+    if kind == "jsonl" and not path.endswith(".gz"):
+        with open(path, "rb") as f:
+            f.seek(start)
+            lines: list = []
+            for line in iter(f.readline, b""):
+                if line.strip():
+                    lines.append(line)
+                if len(lines) == chunk:
+                    pos = f.tell()
+                    yield lines, pos, pos - start
+                    start, lines = pos, []
+            if lines:
+                pos = f.tell()
+                yield lines, pos, pos - start
+        return
+
+    opener = gzip.open if path.endswith(".gz") else open
+    with opener(path, "rt", encoding="utf-8", newline="") as f:
+        records = csv.DictReader(f) if kind == "csv" else (line for line in f if line.strip())
+        pos = 0
+        items: list = []
+        for rec in records:
+            pos += 1
+            if pos <= start:
+                continue
+            items.append(rec)
+            if len(items) == chunk:
+                yield items, pos, 0
+                items = []
+        if items:
+            yield items, pos, 0
+
+
+# ---------- loader ----------
+STAGING_DDL = """
+    CREATE TEMP TABLE IF NOT EXISTS articles_staging (
+        title text, year integer, court text, summary text, full_text text,
+        tags varchar[], content_hash text
+    ) ON COMMIT DELETE ROWS
+"""
+COPY_SQL = f"COPY articles_staging ({', '.join(COLUMNS)}) FROM STDIN WITH (FORMAT csv)"
+MERGE_SQL = f"""
+    INSERT INTO articles (id, {', '.join(COLUMNS)}, created_at)
+    SELECT gen_random_uuid(), {', '.join(COLUMNS)}, timezone('utc', now()) FROM articles_staging
+    ON CONFLICT (content_hash) DO NOTHING
+"""
+CHECKPOINT_SQL = """
+    INSERT INTO ingest_checkpoints (source, fingerprint, position, records, inserted, updated_at)
+    VALUES (%s, %s, %s, %s, %s, timezone('utc', now()))
+    ON CONFLICT (source) DO UPDATE SET fingerprint = EXCLUDED.fingerprint, position = EXCLUDED.position,
+        records = EXCLUDED.records, inserted = EXCLUDED.inserted, updated_at = EXCLUDED.updated_at
+"""
+
+
+class _Loader:
+    def __init__(self):
+        self.conn = engine.raw_connection()  # psycopg2: COPY via copy_expert
+        with self.conn.cursor() as cur:
+            cur.execute(STAGING_DDL)
+        self.conn.commit()
+
+    def load(self, payload: str, checkpoint: Optional[tuple] = None) -> int:
+        try:
+            with self.conn.cursor() as cur:
+                inserted = 0
+                if payload:
+                    cur.copy_expert(COPY_SQL, io.StringIO(payload))
+                    cur.execute(MERGE_SQL)
+                    inserted = cur.rowcount
+                if checkpoint is not None:
+                    cur.execute(CHECKPOINT_SQL, checkpoint[:4] + (checkpoint[4] + inserted,))
+            self.conn.commit()
+            return inserted
+        except Exception:
+            self.conn.rollback()
+            raise
+
+    def close(self) -> None:
+        self.conn.close()
+
+
+def _fingerprint(path: str) -> str:
+    st = os.stat(path)
+    return f"{st.st_size}:{int(st.st_mtime)}"
+
+
+def _resume_point(path: str, fresh: bool) -> tuple[int, int, int]:
+    """(position, records, inserted) to continue from."""
+    with engine.connect() as conn:
+        row = conn.execute(
+            text("SELECT fingerprint, position, records, inserted FROM ingest_checkpoints WHERE source = :s"),
+            {"s": path},
+        ).first()
+    if row is None or fresh:
+        return 0, 0, 0
+    if row.fingerprint != _fingerprint(path):
+        log.warning("%s changed since the last run; starting over (duplicates are skipped)", path)
+        return 0, 0, 0
+    return row.position, row.records, row.inserted
+
+
+class _Progress:
+    def __init__(self, stats: IngestStats, every: float):
+        self.stats = stats
+        self.every = every
+        self.t0 = self.last = time.perf_counter()
+
+    def tick(self, force: bool = False) -> None:
+        now = time.perf_counter()
+        if not force and now - self.last < self.every:
+            return
+        self.last = now
+        s, dt = self.stats, max(now - self.t0, 1e-9)
+        line = f"records={s.records} inserted={s.inserted} duplicates={s.duplicates} bad={s.bad} {s.records / dt:,.0f} rec/s"
+        if s.bytes_read:  # known for plain JSONL only
+            line += f" {s.bytes_read / dt / 1e6:.1f} MB/s"
+        print(line, file=sys.stderr)
+
+
+def ingest_file(path: str, workers: int = 0, chunk: int = CHUNK_RECORDS, fresh: bool = False,
+                progress_every: float = PROGRESS_SECONDS) -> IngestStats:
+    path = os.path.abspath(path)
+    kind = _kind(path)
+    position, done_records, done_inserted = _resume_point(path, fresh)
+    if position:
+        print(f"{path}: resuming at {'byte' if kind == 'jsonl' and not path.endswith('.gz') else 'record'} {position} "
+              f"({done_records} records already processed)", file=sys.stderr)
+    fingerprint = _fingerprint(path)
+    stats = IngestStats()
+    progress = _Progress(stats, progress_every)
+    loader = _Loader()
+    workers = workers or os.cpu_count() or 1
+
+    def finish(fut, pos, nbytes, n):
+        payload, good, bad = fut.result()
+        stats.records += n
+        stats.bad += bad
+        stats.bytes_read += nbytes
+        ck = (path, fingerprint, pos, done_records + stats.records, done_inserted + stats.inserted)
+        stats.inserted += loader.load(payload, ck)
+        progress.tick()
+
+    try:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            in_flight: deque = deque()
+            for items, pos, nbytes in read_chunks(path, position, chunk):
+                in_flight.append((pool.submit(prepare, kind, items), pos, nbytes, len(items)))
+                # bounded look-ahead keeps memory flat however large the file is
+                if len(in_flight) >= 2 * workers:
+                    finish(*in_flight.popleft())
+            while in_flight:
+                finish(*in_flight.popleft())
+    finally:
+        loader.close()
+    progress.tick(force=True)
+    return stats
+
+
+def load_records(records: Iterable[dict]) -> IngestStats:
+    """In-process load of already-parsed records (seed scripts); no pool, no checkpoint."""
+    stats = IngestStats()
+    loader = _Loader()
+    try:
+        batch: list = []
+        for rec in records:
+            batch.append(rec)
+            if len(batch) == CHUNK_RECORDS:
+                stats.records += len(batch)
+                payload, _, bad = prepare("dict", batch)
+                stats.bad += bad
+                stats.inserted += loader.load(payload)
+                batch = []
+        if batch:
+            stats.records += len(batch)
+            payload, _, bad = prepare("dict", batch)
+            stats.bad += bad
+            stats.inserted += loader.load(payload)
+    finally:
+        loader.close()
+    return stats
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Stream JSONL/CSV article dumps into the articles table")
+    ap.add_argument("paths", nargs="+", help=".jsonl / .csv, optionally .gz")
+    ap.add_argument("--workers", type=int, default=0, help="parser processes (default: CPU count)")
+    ap.add_argument("--chunk", type=int, default=CHUNK_RECORDS, help="records per COPY/transaction")
+    ap.add_argument("--fresh", action="store_true", help="ignore saved checkpoints")
+    ap.add_argument("--progress", type=float, default=PROGRESS_SECONDS, help="seconds between progress lines")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO)
+    for p in args.paths:
+        s = ingest_file(p, workers=args.workers, chunk=args.chunk, fresh=args.fresh, progress_every=args.progress)
+        print(f"{p}: records={s.records} inserted={s.inserted} duplicates={s.duplicates} bad={s.bad}")
@@ -0,0 +1,280 @@
+# app/services/availability.py
+# Weekly availability as minute-of-week intervals [start, end), Monday 00:00 = 0,
+# in the service timezone (AVAILABILITY_TZ).
+#
+# Lawyer.availability_json, canonical form:
+#   {"tz": "Asia/Kolkata",
+#    "weekly": {"mon": ["09:00-13:00", "14:00-18:00"], "sat": ["10:00-12:00"]},
+#    "off": ["2026-12-25"]}
+# Older rows that put the day keys at the top level are read as {"weekly": row}.
+#
+# Request.preferred_window: free text, e.g. "weekday evenings", "sat 10am-1pm",
+# "mon 09:00-11:00", "2026-10-20 afternoon".
+import os
+import re
+from datetime import date, datetime, timedelta
+from typing import Optional
+from zoneinfo import ZoneInfo
+
+DAY_MINUTES = 24 * 60
+WEEK_MINUTES = 7 * DAY_MINUTES
+DAYS = ["mon", "tue", "wed", "thu", "fri", "sat", "sun"]
+DAY_NAMES = ["monday", "tuesday", "wednesday", "thursday", "friday", "saturday", "sunday"]
+
+# matched against words with a trailing plural "s" stripped
+DAY_ALIASES = {
+    **{d: [i] for i, d in enumerate(DAYS)},
+    **{d: [i] for i, d in enumerate(DAY_NAMES)},
+    "tues": [1], "thur": [3], "thurs": [3],
+    "weekday": [0, 1, 2, 3, 4],
+    "weekend": [5, 6],
+}
+PARTS_OF_DAY = {
+    "morning": (9 * 60, 12 * 60),
+    "afternoon": (12 * 60, 17 * 60),
+    "evening": (17 * 60, 21 * 60),
+    "night": (20 * 60, 23 * 60),
+}
+
+AVAILABILITY_TZ = ZoneInfo(os.getenv("AVAILABILITY_TZ", "Asia/Kolkata"))
+
+Interval = tuple[int, int]
+
+_DATE_RE = re.compile(r"\b(\d{4})-(\d{2})-(\d{2})\b")
+
+_TIME_RANGE_RE = re.compile(
+    r"(\d{1,2})(?::(\d{2}))?\s*(am|pm)?\s*(?:-|–|to)\s*(\d{1,2})(?::(\d{2}))?\s*(am|pm)?"
+)
+
+
+def _minutes(hour: str, minute: Optional[str], meridiem: Optional[str]) -> int:
+    h = int(hour) % 24
+    if meridiem == "pm" and h < 12:
+        h += 12
+    elif meridiem == "am" and h == 12:
+        h = 0
+    return h * 60 + int(minute or 0)
+
+
+def _time_ranges(text: str) -> list[Interval]:
+    out = []
+    for m in _TIME_RANGE_RE.finditer(text):
+        h1, m1, ap1, h2, m2, ap2 = m.groups()
+        end = _minutes(h2, m2, ap2)
+        if ap1 or not ap2:
+            start = _minutes(h1, m1, ap1)
+        else:
+            # "10-1pm", "11-1am": read the start as am or pm, whichever gives the shorter slot
+            start = min(
+                (_minutes(h1, m1, ap) for ap in ("am", "pm")),
+                key=lambda s: (end - s) % DAY_MINUTES or DAY_MINUTES,
+            )
+        if not ap1 and not ap2 and end <= start and not h2.startswith("0") and int(h2) < 12:
+            # "9-5" means 09:00-17:00; "22:00-01:00" (zero-padded: 24h clock) still wraps
+            if end + 12 * 60 > start:
+                end += 12 * 60
+        if end <= start:
+            end += DAY_MINUTES  # "22:00-01:00" wraps past midnight
+        out.append((start, end))
+    return out
+
+
+def merge(intervals: list[Interval]) -> list[Interval]:
+    out: list[Interval] = []
+    for s, e in sorted(intervals):
+        if out and s <= out[-1][1]:
+            out[-1] = (out[-1][0], max(out[-1][1], e))
+        else:
+            out.append((s, e))
+    return out
+
+
+def _spread(days: list[int], ranges: list[Interval]) -> list[Interval]:
+    out = []
+    for d in days:
+        for s, e in ranges:
+            s, e = d * DAY_MINUTES + s, d * DAY_MINUTES + e
+            if e > WEEK_MINUTES:  # Sunday night running into Monday
+                out.append((0, e - WEEK_MINUTES))
+                e = WEEK_MINUTES
+            out.append((s, e))
+    return merge(out)
+
+
+def _weekly_section(availability) -> dict:
+    if not isinstance(availability, dict):
+        return {}
+    if "weekly" in availability:
+        return availability["weekly"] if isinstance(availability["weekly"], dict) else {}
+    return {k: v for k, v in availability.items() if k not in ("tz", "off")}
+
+
+def _parse_days(weekly: dict) -> list[Interval]:
+    out = []
+    for day, slots in weekly.items():
+        days = DAY_ALIASES.get(str(day).lower().rstrip("s"))
+        if not days:
+            continue
+        if isinstance(slots, str):
+            slots = [slots]
+        for slot in slots or []:
+            text = "-".join(slot) if isinstance(slot, (list, tuple)) else str(slot)
+            out.extend(_spread(days, _time_ranges(text.lower())))
+    return merge(out)
+
+
+def _tz(availability) -> ZoneInfo:
+    try:
+        return ZoneInfo(availability["tz"])
+    except Exception:
+        return AVAILABILITY_TZ
+
+
+def _shift(intervals: list[Interval], minutes: int) -> list[Interval]:
+    """Rotate week intervals by `minutes`, splitting anything that wraps past Sunday."""
+    if not minutes:
+        return intervals
+    out = []
+    for s, e in intervals:
+        s, e = s + minutes, e + minutes
+        for lo, hi in ((s, e), (s - WEEK_MINUTES, e - WEEK_MINUTES), (s + WEEK_MINUTES, e + WEEK_MINUTES)):
+            lo, hi = max(lo, 0), min(hi, WEEK_MINUTES)
+            if hi > lo:
+                out.append((lo, hi))
+    return merge(out)
+
+
+def parse_weekly(availability: Optional[dict]) -> list[Interval]:
+    """availability_json -> sorted, merged week intervals in AVAILABILITY_TZ ([] when missing/garbled)."""
+    intervals = _parse_days(_weekly_section(availability))
+    if intervals and isinstance(availability, dict) and "tz" in availability:
+        # fixed offset between the lawyer's zone and ours, taken now (no DST in IST)
+        now = datetime.now(AVAILABILITY_TZ)
+        delta = now.utcoffset() - now.astimezone(_tz(availability)).utcoffset()
+        intervals = _shift(intervals, int(delta.total_seconds() // 60))
+    return intervals
+
+
+def off_dates(availability: Optional[dict]) -> frozenset[date]:
+    out = set()
+    for raw in (availability or {}).get("off", []) if isinstance(availability, dict) else []:
+        try:
+            out.add(date.fromisoformat(str(raw)))
+        except ValueError:
+            continue
+    return frozenset(out)
+
+
+def parse_window(window: Optional[str]) -> Optional[list[Interval]]:
+    """preferred_window -> week intervals, or None if nothing in it looks like a time."""
+    if not window:
+        return None
+    text = _DATE_RE.sub(" ", window.lower())
+    days: set[int] = set()
+    for word in re.findall(r"[a-z]+", text):
+        days.update(DAY_ALIASES.get(word.rstrip("s"), []))
+    ranges = _time_ranges(text)
+    ranges += [rng for part, rng in PARTS_OF_DAY.items() if part in text]
+    if not days and not ranges:
+        return None
+    return _spread(sorted(days) or list(range(7)), ranges or [(0, DAY_MINUTES)])
+
+
+def overlap_minutes(a: list[Interval], b: list[Interval]) -> int:
+    """Total overlap of two sorted, merged interval lists (linear merge)."""
+    i = j = total = 0
+    while i < len(a) and j < len(b):
+        s = max(a[i][0], b[j][0])
+        e = min(a[i][1], b[j][1])
+        if e > s:
+            total += e - s
+        if a[i][1] < b[j][1]:
+            i += 1
+        else:
+            j += 1
+    return total
+
+
+# ---------- concrete times ----------
+def to_local(dt: datetime) -> datetime:
+    """Aware datetime in AVAILABILITY_TZ (naive input is taken to already be local)."""
+    return dt.replace(tzinfo=AVAILABILITY_TZ) if dt.tzinfo is None else dt.astimezone(AVAILABILITY_TZ)
+
+
+def dates_between(start: datetime, end: datetime) -> set[date]:
+    """Local calendar days touched by [start, end)."""
+    d, last = to_local(start).date(), (to_local(end) - timedelta(microseconds=1)).date()
+    out = set()
+    while d <= last:
+        out.add(d)
+        d += timedelta(days=1)
+    return out
+
+
+def week_minute(dt: datetime) -> int:
+    dt = to_local(dt)
+    return dt.weekday() * DAY_MINUTES + dt.hour * 60 + dt.minute
+
+
+def to_week_intervals(start: datetime, end: datetime) -> list[Interval]:
+    """[start, end) folded onto the week; a range of a week or more covers all of it."""
+    start, end = to_local(start), to_local(end)
+    if end - start >= timedelta(days=7):
+        return [(0, WEEK_MINUTES)]
+    s = week_minute(start)
+    e = s + int((end - start).total_seconds() // 60)
+    if e <= WEEK_MINUTES:
+        return [(s, e)]
+    return [(0, e - WEEK_MINUTES), (s, WEEK_MINUTES)]
+
+
+# ---------- interval tree ----------
+class IntervalTree:
+    """Static centered interval tree over (start, end, payload) triples.
+
+    covering(s, e) returns the payloads whose interval contains [s, e): a stabbing
+    query at s (O(log n + k)) filtered on end >= e.
+    """
+
+    __slots__ = ("_root",)
+
+    def __init__(self, items: list[tuple[int, int, object]]):
+        self._root = self._build(sorted(items))
+
+    def _build(self, items):
+        if not items:
+            return None
+        center = items[len(items) // 2][0]
+        left, right, here = [], [], []
+        for it in items:
+            if it[1] <= center:
+                left.append(it)
+            elif it[0] > center:
+                right.append(it)
+            else:
+                here.append(it)
+        by_start = sorted(here)                              # ascending start
+        by_end = sorted(here, key=lambda it: -it[1])         # descending end
+        return (center, by_start, by_end, self._build(left), self._build(right))
+
+    def covering(self, start: int, end: int) -> list:
+        out = []
+        node = self._root
+        while node is not None:
+            center, by_start, by_end, left, right = node
+            if start < center:
+                # every interval here ends after center > start; take those starting by `start`
+                for s, e, payload in by_start:
+                    if s > start:
+                        break
+                    if e >= end:
+                        out.append(payload)
+                node = left
+            else:
+                for s, e, payload in by_end:
+                    if e <= start:
+                        break
+                    if s <= start and e >= end:
+                        out.append(payload)
+                node = right
+        return out
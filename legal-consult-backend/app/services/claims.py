@@ -0,0 +1,120 @@
+# app/services/claims.py
+# "Claim next request" work queue on the requests table.
+#
+# claim() is a single statement:
+#   WITH picked AS (SELECT id FROM requests WHERE status = 'pending'
+#                   ORDER BY created_at LIMIT :n FOR UPDATE SKIP LOCKED)
+#   UPDATE requests SET status = :to, claimed_by = :worker, lease_expires_at = ...
+#   FROM picked WHERE requests.id = picked.id RETURNING requests.*
+# Concurrent workers skip each other's locked rows instead of queueing on them,
+# so a row is handed to exactly one worker and claim latency doesn't grow with
+# the number of workers.
+#
+# A claim is a lease: the worker either acts on the request (any status PATCH
+# clears the lease), extends it with heartbeat(), or lets it expire, after which
+# release_expired() puts the row back to 'pending'. A lawyer the claim itself assigned
+# (claimed_lawyer) is unassigned again; one the request already named is kept.
+import uuid
+from datetime import timedelta
+from typing import Optional
+
+from sqlalchemy import case, or_, select, update, func
+from sqlalchemy.orm import Session
+
+from app import request_ids
+from app.models.request import Request
+
+CLAIM_TARGETS = ("assigned", "calling")
+REAP_BATCH = 100
+
+
+def _utcnow():
+    # created_at / lease_expires_at are naive UTC
+    return func.timezone("utc", func.now())
+
+
+def release_expired(db: Session, batch: int = REAP_BATCH) -> int:
+    """Return up to `batch` expired claims to the queue. Safe to call from every worker."""
+    expired = (
+        select(Request.id)
+        .where(Request.lease_expires_at.is_not(None), Request.lease_expires_at < _utcnow())
+        .limit(batch)
+        .with_for_update(skip_locked=True)
+        .cte("expired")
+    )
+    res = db.execute(
+        update(Request)
+        .where(Request.id == expired.c.id)
+        # undo only the claim's own assignment: a pending row naming a lawyer the claim
+        # picked would otherwise be skipped by dispatch (assigned_lawyer IS NULL)
+        .values(
+            status="pending", claimed_by=None, lease_expires_at=None, claimed_lawyer=None,
+            assigned_lawyer=case(
+                (Request.assigned_lawyer == Request.claimed_lawyer, None), else_=Request.assigned_lawyer
+            ),
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return res.rowcount
+
+
+def claim(
+    db: Session,
+    worker: str,
+    n: int = 1,
+    lease_seconds: int = 300,
+    to_status: str = "assigned",
+    lawyer_id: Optional[uuid.UUID] = None,
+) -> list[Request]:
+    """Atomically take up to `n` of the oldest pending requests. Commits.
+
+    With `lawyer_id`, only requests that name no lawyer or that one are taken."""
+    if to_status not in CLAIM_TARGETS:
+        raise ValueError(f"claims move requests to one of {CLAIM_TARGETS}")
+    release_expired(db)
+
+    pending = select(Request.id).where(Request.status == "pending")
+    if lawyer_id is not None:
+        pending = pending.where(or_(Request.assigned_lawyer.is_(None), Request.assigned_lawyer == lawyer_id))
+    picked = (
+        pending
+        .order_by(Request.created_at)
+        .limit(n)
+        .with_for_update(skip_locked=True)
+        .cte("picked")
+    )
+    changes = {
+        "status": to_status,
+        "claimed_by": worker,
+        "lease_expires_at": _utcnow() + timedelta(seconds=lease_seconds),
+    }
+    if lawyer_id is not None:
+        changes["assigned_lawyer"] = lawyer_id
+        # only an assignment the claim made is undone when its lease expires
+        changes["claimed_lawyer"] = case((Request.assigned_lawyer.is_(None), lawyer_id), else_=None)
+    rows = db.execute(
+        update(Request)
+        .where(Request.id == picked.c.id)
+        .values(**changes)
+        .returning(Request)
+        .execution_options(synchronize_session=False)
+    ).scalars().all()
+    db.commit()
+    return rows
+
+
+def heartbeat(db: Session, request_id: uuid.UUID, worker: str, lease_seconds: int = 300) -> Optional[Request]:
+    """Extend a lease the worker still holds; None if it expired or belongs to someone else."""
+    rec = db.execute(
+        update(Request)
+        .where(
+            *request_ids.match(Request, request_id),
+            Request.claimed_by == worker,
+            Request.lease_expires_at > _utcnow(),
+        )
+        .values(lease_expires_at=_utcnow() + timedelta(seconds=lease_seconds))
+        .returning(Request)
+        .execution_options(synchronize_session=False)
+    ).scalar_one_or_none()
+    db.commit()
+    return rec
@@ -0,0 +1,182 @@
+# app/services/dispatch.py
+# Batch assignment of pending requests to lawyers.
+#
+# Scores every (request, lawyer) pair at once as NumPy matrices, using the same
+# terms and weights as app/services/matching.py:
+#   specialty fit  = R (requests x specialties) @ L.T / requested count
+#   availability   = W (requests x week slots)  @ A.T / window slots
+#   rating, load   = per-lawyer vectors broadcast over rows
+# then solves the assignment with the Hungarian method (scipy's
+# linear_sum_assignment) in rounds: each round gives every lawyer with spare
+# capacity at most one request, and the load penalty is recomputed in between.
+# Results are written with one UPDATE ... FROM (VALUES ...).
+#
+#   python -m app.services.dispatch [--dry-run]
+import argparse
+import logging
+import time
+import uuid
+from dataclasses import dataclass, field
+from typing import Optional
+
+import numpy as np
+from scipy.optimize import linear_sum_assignment
+from sqlalchemy import select, update, values, column
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models.request import Request
+from app.services import matching
+from app.services.availability import WEEK_MINUTES, parse_window
+from app.services.matching import LawyerMatcher, W_SPECIALTY, W_RATING, W_AVAIL, W_LOAD, LOAD_CAP
+
+log = logging.getLogger(__name__)
+
+SLOT_MINUTES = 30
+WEEK_SLOTS = WEEK_MINUTES // SLOT_MINUTES
+
+
+@dataclass
+class DispatchResult:
+    pending: int = 0
+    assigned: int = 0
+    rounds: int = 0
+    score: float = 0.0                 # sum of pair scores actually assigned
+    build_ms: float = 0.0
+    solve_ms: float = 0.0
+    pairs: list[tuple[uuid.UUID, uuid.UUID]] = field(default_factory=list)  # (request id, lawyer id)
+
+
+def _slot_mask(intervals: list[tuple[int, int]]) -> np.ndarray:
+    mask = np.zeros(WEEK_SLOTS, dtype=np.float32)
+    for s, e in intervals:
+        mask[s // SLOT_MINUTES:-(-e // SLOT_MINUTES)] = 1
+    return mask
+
+
+def score_matrix(
+    matcher: LawyerMatcher, descriptions: list[Optional[str]], windows: list[Optional[str]]
+) -> tuple[np.ndarray, np.ndarray]:
+    """(scores without the load term, eligibility) — both requests x lawyers."""
+    n, m, s = len(descriptions), len(matcher.ids), len(matcher.specialty_bit)
+
+    lawyer_specs = np.zeros((m, s), dtype=np.float32)
+    for j, bits in enumerate(matcher.bits):
+        while bits:
+            low = bits & -bits
+            lawyer_specs[j, low.bit_length() - 1] = 1
+            bits ^= low
+    request_specs = np.zeros((n, s), dtype=np.float32)
+    for i, text in enumerate(descriptions):
+        for name in matcher.infer_specialties(text):
+            request_specs[i, matcher.specialty_bit[name]] = 1
+
+    wanted = request_specs.sum(axis=1, keepdims=True)
+    overlap = request_specs @ lawyer_specs.T
+    spec = np.divide(overlap, wanted, out=np.zeros_like(overlap), where=wanted > 0)
+    # a request that names specialties only goes to lawyers sharing one of them
+    eligible = (wanted == 0) | (overlap > 0)
+
+    lawyer_slots = np.stack([_slot_mask(w) for w in matcher.weekly]) if m else np.zeros((0, WEEK_SLOTS), np.float32)
+    request_slots = np.zeros((n, WEEK_SLOTS), dtype=np.float32)
+    for i, text in enumerate(windows):
+        window = parse_window(text)
+        if window:
+            request_slots[i] = _slot_mask(window)
+    window_len = request_slots.sum(axis=1, keepdims=True)
+    free = request_slots @ lawyer_slots.T
+    avail = np.divide(free, window_len, out=np.zeros_like(free), where=window_len > 0)
+
+    ratings = np.asarray(matcher.ratings, dtype=np.float32)
+    scores = W_SPECIALTY * spec + W_AVAIL * avail + (W_RATING / 5) * ratings[None, :]
+    return scores, eligible
+
+
+def solve(scores: np.ndarray, eligible: np.ndarray, loads: np.ndarray) -> tuple[list[tuple[int, int]], float, int]:
+    """Hungarian assignment in capacity rounds. Returns ([(row, col)], total score, rounds)."""
+    loads = loads.astype(np.float32).copy()
+    open_rows = np.arange(scores.shape[0])
+    pairs: list[tuple[int, int]] = []
+    total = 0.0
+    rounds = 0
+    while open_rows.size:
+        cols = np.flatnonzero(loads < LOAD_CAP)
+        if not cols.size:
+            break
+        sub = scores[np.ix_(open_rows, cols)] - W_LOAD * loads[cols] / LOAD_CAP
+        ok = eligible[np.ix_(open_rows, cols)]
+        # ineligible pairs get a cost no real pair can reach; dropped after solving
+        cost = np.where(ok, -sub, 1e6)
+        r, c = linear_sum_assignment(cost)
+        keep = ok[r, c]
+        r, c = r[keep], c[keep]
+        if not r.size:
+            break
+        rounds += 1
+        total += float(sub[r, c].sum())
+        rows, lawyers = open_rows[r], cols[c]
+        pairs.extend(zip(rows.tolist(), lawyers.tolist()))
+        loads[lawyers] += 1
+        open_rows = np.setdiff1d(open_rows, rows, assume_unique=True)
+    return pairs, total, rounds
+
+
+def dispatch(db: Session, dry_run: bool = False, limit: Optional[int] = None) -> DispatchResult:
+    matcher = matching.get_matcher(db)
+    stmt = (
+        select(Request.id, Request.description, Request.preferred_window)
+        .where(Request.status == "pending", Request.assigned_lawyer.is_(None))
+        .order_by(Request.created_at)
+    )
+    if limit:
+        stmt = stmt.limit(limit)
+    pending = db.execute(stmt).all()
+    result = DispatchResult(pending=len(pending))
+    if not pending or not matcher.ids:
+        return result
+
+    t0 = time.perf_counter()
+    scores, eligible = score_matrix(
+        matcher, [p.description for p in pending], [p.preferred_window for p in pending]
+    )
+    result.build_ms = (time.perf_counter() - t0) * 1000
+
+    t0 = time.perf_counter()
+    pairs, result.score, result.rounds = solve(scores, eligible, np.asarray(matcher.loads))
+    result.solve_ms = (time.perf_counter() - t0) * 1000
+    result.pairs = [(pending[r].id, matcher.ids[c]) for r, c in pairs]
+
+    if result.pairs and not dry_run:
+        v = values(
+            column("id", PG_UUID(as_uuid=True)), column("lawyer", PG_UUID(as_uuid=True)), name="v"
+        ).data(result.pairs)
+        res = db.execute(
+            update(Request)
+            .where(Request.id == v.c.id, Request.status == "pending")  # skip rows changed meanwhile
+            .values(assigned_lawyer=v.c.lawyer, status="assigned")
+            .execution_options(synchronize_session=False)
+        )
+        db.commit()
+        result.assigned = res.rowcount
+        matching.mark_dirty()  # loads changed
+    else:
+        result.assigned = len(result.pairs)
+    log.info(
+        "dispatch: %d/%d assigned in %d rounds (build %.0f ms, solve %.0f ms)",
+        result.assigned, result.pending, result.rounds, result.build_ms, result.solve_ms,
+    )
+    return result
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Assign all pending requests to lawyers in one batch")
+    ap.add_argument("--dry-run", action="store_true", help="solve and report, don't write")
+    ap.add_argument("--limit", type=int, default=None, help="oldest N pending requests only")
+    args = ap.parse_args()
+    with SessionLocal() as db:
+        r = dispatch(db, dry_run=args.dry_run, limit=args.limit)
+    print(
+        f"pending={r.pending} assigned={r.assigned} rounds={r.rounds} score={r.score:.1f} "
+        f"build={r.build_ms:.0f}ms solve={r.solve_ms:.0f}ms"
+    )
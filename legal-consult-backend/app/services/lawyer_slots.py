@@ -0,0 +1,85 @@
+# app/services/lawyer_slots.py
+# SQL backend for "who is free": lawyer availability expanded into tstzrange rows
+# (lawyer_slots, GiST-indexed), queried with `slot @> tstzrange(from, to)`.
+#
+# Selected with AVAILABILITY_BACKEND=sql; refresh from cron after lawyer edits:
+#   python -m app.services.lawyer_slots --weeks 4
+import argparse
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import select, delete, insert, func
+from sqlalchemy.dialects.postgresql import Range
+from sqlalchemy.orm import Session
+
+from app import projection
+from app.db import SessionLocal
+from app.models.availability import LawyerSlot
+from app.models.lawyer import Lawyer
+from app.schemas import LawyerOut
+from app.services.availability import (
+    AVAILABILITY_TZ, DAY_MINUTES, parse_weekly, off_dates, to_local,
+)
+
+
+def expand(availability: Optional[dict], start: datetime, weeks: int) -> list[tuple[datetime, datetime]]:
+    """Concrete local ranges for `weeks` weeks from the Monday of `start`, minus "off" days."""
+    weekly = parse_weekly(availability)
+    blocked = off_dates(availability)
+    start = to_local(start)
+    monday = datetime.combine(start.date() - timedelta(days=start.weekday()), datetime.min.time(), AVAILABILITY_TZ)
+
+    out: list[tuple[datetime, datetime]] = []
+    for w in range(weeks):
+        base = monday + timedelta(days=7 * w)
+        for s, e in weekly:
+            # walk day by day so "off" dates can be cut out, re-joining across midnight
+            while s < e:
+                day_end = (s // DAY_MINUTES + 1) * DAY_MINUTES
+                lo, hi = base + timedelta(minutes=s), base + timedelta(minutes=min(e, day_end))
+                if lo.date() not in blocked:
+                    if out and out[-1][1] == lo:
+                        out[-1] = (out[-1][0], hi)
+                    else:
+                        out.append((lo, hi))
+                s = day_end
+    return out
+
+
+def materialize(db: Session, weeks: int = 4, now: Optional[datetime] = None) -> int:
+    """Replace lawyer_slots with the next `weeks` weeks of availability. Returns rows written."""
+    now = now or datetime.now(AVAILABILITY_TZ)
+    rows = []
+    for lawyer_id, availability in db.execute(select(Lawyer.id, Lawyer.availability_json)):
+        for lo, hi in expand(availability, now, weeks):
+            rows.append({"lawyer_id": lawyer_id, "slot": Range(lo, hi, bounds="[)")})
+    db.execute(delete(LawyerSlot))
+    if rows:
+        db.execute(insert(LawyerSlot), rows)
+    db.commit()
+    return len(rows)
+
+
+def available(
+    db: Session, start: datetime, end: datetime, specialty: Optional[str] = None, limit: int = 50
+) -> list[Lawyer]:
+    wanted = func.tstzrange(to_local(start), to_local(end), "[)")
+    free = select(LawyerSlot.lawyer_id).where(LawyerSlot.slot.contains(wanted))
+    # callers serialize LawyerOut: leave availability_json and the rest in the DB
+    stmt = select(Lawyer).where(Lawyer.id.in_(free)).options(
+        projection.load_only_for(Lawyer, tuple(LawyerOut.model_fields))
+    )
+    if specialty:
+        # case-insensitive like the memory matcher: stored specialties aren't normalized
+        spec = func.unnest(Lawyer.specialties).column_valued("spec")
+        stmt = stmt.where(select(spec).where(func.lower(spec) == specialty.strip().lower()).exists())
+    stmt = stmt.order_by(Lawyer.rating.desc().nulls_last()).limit(limit)
+    return db.execute(stmt).scalars().all()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Rebuild lawyer_slots from lawyers.availability_json")
+    ap.add_argument("--weeks", type=int, default=4)
+    args = ap.parse_args()
+    with SessionLocal() as db:
+        print(f"lawyer_slots: {materialize(db, args.weeks)} rows")
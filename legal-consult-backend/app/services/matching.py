@@ -0,0 +1,270 @@
+# app/services/matching.py
+# Ranks lawyers for a consultation request.
+#
+# score = W_SPECIALTY * (matched specialties / requested)
+#       + W_RATING    * rating / 5
+#       + W_AVAIL     * (preferred_window minutes the lawyer is free / window minutes)
+#       - W_LOAD      * min(open assignments, LOAD_CAP) / LOAD_CAP
+#
+# The index is a snapshot of the lawyers table: one int bitset of specialties per
+# lawyer, lawyers grouped by bitset and a global list, all sorted by rating.
+# ORM writes to Lawyer mark it dirty; it is also rebuilt after MATCHER_MAX_AGE_SECONDS
+# so rows changed outside the app are picked up.
+import heapq
+import os
+import re
+import threading
+import time
+import uuid
+from dataclasses import dataclass
+from typing import Optional
+
+from sqlalchemy import select, func, event
+from sqlalchemy.orm import Session
+
+from app.db import SessionLocal
+from app.models.lawyer import Lawyer
+from app.models.request import Request
+from app.services.availability import (
+    IntervalTree, parse_weekly, parse_window, overlap_minutes, off_dates, to_week_intervals, dates_between,
+)
+
+W_SPECIALTY = 0.5
+W_RATING = 0.25
+W_AVAIL = 0.15
+W_LOAD = 0.10
+LOAD_CAP = 5
+OPEN_STATUSES = ("assigned", "calling")
+
+MATCHER_MAX_AGE_SECONDS = float(os.getenv("MATCHER_MAX_AGE_SECONDS", "60"))
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _words(text: str) -> frozenset[str]:
+    return frozenset(_WORD_RE.findall(text.lower()))
+
+
+@dataclass
+class Candidate:
+    lawyer_id: uuid.UUID
+    score: float
+    rating: Optional[float]
+    specialties: list[str]
+    matched_specialties: list[str]
+    open_requests: int
+    available: Optional[bool]  # None when the request has no parseable window
+
+
+class LawyerMatcher:
+    def __init__(self, lawyers: list[Lawyer], loads: dict[uuid.UUID, int]):
+        self.built_at = time.monotonic()
+        self.specialty_bit: dict[str, int] = {}
+        self.ids: list[uuid.UUID] = []
+        self.ratings: list[float] = []
+        self.bits: list[int] = []
+        self.specialties: list[list[str]] = []
+        self.weekly: list[list[tuple[int, int]]] = []
+        self.weekly_total: list[int] = []     # free minutes per week, bounds the availability term
+        self.loads: list[int] = []
+        self.off: dict[int, frozenset] = {}   # lawyer index -> dates marked "off"
+        self._pos: dict[uuid.UUID, int] = {}
+
+        for law in lawyers:
+            specs = [s.strip().lower() for s in (law.specialties or []) if s and s.strip()]
+            mask = 0
+            for s in specs:
+                mask |= 1 << self.specialty_bit.setdefault(s, len(self.specialty_bit))
+            self._pos[law.id] = len(self.ids)
+            self.ids.append(law.id)
+            self.ratings.append(float(law.rating or 0))
+            self.bits.append(mask)
+            self.specialties.append(specs)
+            weekly = parse_weekly(law.availability_json)
+            self.weekly.append(weekly)
+            self.weekly_total.append(sum(e - s for s, e in weekly))
+            self.loads.append(loads.get(law.id, 0))
+            blocked = off_dates(law.availability_json)
+            if blocked:
+                self.off[len(self.ids) - 1] = blocked
+
+        self.max_weekly_total = max(self.weekly_total, default=0)
+        # lawyers grouped by their exact specialty bitset, each group rating-sorted:
+        # within a group the specialty term is a constant, so a group can be cut off
+        # as soon as its best remaining rating can't reach the k-th best score
+        self.by_rating = sorted(range(len(self.ids)), key=lambda i: -self.ratings[i])
+        self.groups: dict[int, list[int]] = {}
+        for i in self.by_rating:
+            self.groups.setdefault(self.bits[i], []).append(i)
+        # every weekly slot of every lawyer, for "who is free from..to" lookups
+        self.free = IntervalTree([(s, e, i) for i, week in enumerate(self.weekly) for s, e in week])
+        # specialty name -> words, for spotting specialties mentioned in a description
+        self.specialty_words = {s: _words(s.replace("-", " ")) for s in self.specialty_bit}
+
+    # ---------- request features ----------
+    def infer_specialties(self, description: Optional[str]) -> list[str]:
+        words = _words(description or "")
+        return [s for s, sw in self.specialty_words.items() if sw and sw <= words]
+
+    def mask_for(self, specialties: list[str]) -> int:
+        mask = 0
+        for s in specialties:
+            bit = self.specialty_bit.get(s.strip().lower())
+            if bit is not None:
+                mask |= 1 << bit
+        return mask
+
+    # ---------- ranking ----------
+    def top_k(
+        self,
+        k: int,
+        specialties: list[str],
+        window: Optional[list[tuple[int, int]]],
+    ) -> list[Candidate]:
+        want = self.mask_for(specialties)
+        want_n = bin(want).count("1")
+        window_len = sum(e - s for s, e in window) if window else 0
+        avail_max = W_AVAIL * min(1.0, self.max_weekly_total / window_len) if window_len else 0.0
+
+        # (upper bound, specialty term, members) per group worth visiting
+        plan = []
+        for mask, members in self.groups.items():
+            spec = W_SPECIALTY * bin(mask & want).count("1") / want_n if want_n else 0.0
+            if want and not spec:
+                continue
+            plan.append((spec + W_RATING * self.ratings[members[0]] / 5 + avail_max, spec, members))
+        if not plan:  # nobody shares a specialty: rank everyone on rating/availability/load
+            plan = [(W_RATING * self.ratings[self.by_rating[0]] / 5 + avail_max, 0.0, self.by_rating)] if self.ids else []
+        plan.sort(key=lambda g: -g[0])
+
+        best: list[tuple[float, int]] = []
+        for bound, spec, members in plan:
+            if len(best) == k and bound <= best[0][0]:
+                break
+            for i in members:
+                rating_term = W_RATING * self.ratings[i] / 5
+                if len(best) == k and spec + rating_term + avail_max <= best[0][0]:
+                    break  # rest of this group is rated lower still
+                s = spec + rating_term - W_LOAD * min(self.loads[i], LOAD_CAP) / LOAD_CAP
+                if window_len:
+                    # interval overlap is the expensive part; skip it when it can't matter
+                    avail_cap = W_AVAIL * min(1.0, self.weekly_total[i] / window_len)
+                    if len(best) == k and s + avail_cap <= best[0][0]:
+                        continue
+                    s += W_AVAIL * overlap_minutes(self.weekly[i], window) / window_len
+                if len(best) < k:
+                    heapq.heappush(best, (s, i))
+                elif s > best[0][0]:
+                    heapq.heapreplace(best, (s, i))
+
+        out = []
+        for s, i in sorted(best, reverse=True):
+            matched = [sp for sp in self.specialties[i] if want >> self.specialty_bit[sp] & 1]
+            out.append(
+                Candidate(
+                    lawyer_id=self.ids[i],
+                    score=round(s, 4),
+                    rating=self.ratings[i],
+                    specialties=self.specialties[i],
+                    matched_specialties=matched,
+                    open_requests=self.loads[i],
+                    available=(overlap_minutes(self.weekly[i], window) > 0) if window else None,
+                )
+            )
+        return out
+
+    def available(self, start, end, specialty: Optional[str] = None, limit: int = 50) -> list[int]:
+        """Indexes of lawyers free for all of [start, end), best rated first."""
+        found: Optional[set[int]] = None
+        for s, e in to_week_intervals(start, end):
+            hits = set(self.free.covering(s, e))
+            found = hits if found is None else found & hits
+            if not found:
+                return []
+        if specialty:
+            bit = self.specialty_bit.get(specialty.strip().lower())
+            if bit is None:
+                return []
+            found = {i for i in found if self.bits[i] >> bit & 1}
+        if self.off:
+            days = dates_between(start, end)
+            found = {i for i in found if not (self.off.get(i, frozenset()) & days)}
+        return heapq.nsmallest(limit, found, key=lambda i: (-self.ratings[i], -self.weekly_total[i]))
+
+    def bump_load(self, lawyer_id: uuid.UUID, delta: int = 1) -> None:
+        i = self._pos.get(lawyer_id)
+        if i is not None:
+            self.loads[i] = max(0, self.loads[i] + delta)
+
+
+# ---------- process-wide snapshot ----------
+_matcher: Optional[LawyerMatcher] = None
+_dirty = True
+_lock = threading.Lock()
+
+
+def mark_dirty(*_args) -> None:
+    """Force a rebuild on next use (ORM events call this; so do bulk writers)."""
+    global _dirty
+    _dirty = True
+
+
+for _evt in ("after_insert", "after_update", "after_delete"):
+    event.listen(Lawyer, _evt, mark_dirty)
+
+
+def _load(db: Session) -> LawyerMatcher:
+    lawyers = db.execute(select(Lawyer)).scalars().all()
+    loads = dict(
+        db.execute(
+            select(Request.assigned_lawyer, func.count())
+            .where(Request.assigned_lawyer.is_not(None), Request.status.in_(OPEN_STATUSES))
+            .group_by(Request.assigned_lawyer)
+        ).all()
+    )
+    return LawyerMatcher(lawyers, loads)
+
+
+def is_stale() -> bool:
+    m = _matcher
+    return m is None or _dirty or time.monotonic() - m.built_at >= MATCHER_MAX_AGE_SECONDS
+
+
+def get_matcher(db: Session) -> LawyerMatcher:
+    global _matcher, _dirty
+    m = _matcher
+    if not is_stale():
+        return m
+    with _lock:
+        m = _matcher
+        if is_stale():
+            _dirty = False
+            m = _matcher = _load(db)
+    return m
+
+
+def refresh() -> LawyerMatcher:
+    """get_matcher() on its own sync session. Async callers run this in the threadpool
+    first: AsyncSession.run_sync executes on the event loop, and a rebuild there
+    (query + CPU-bound index build) would stall every other request."""
+    with SessionLocal() as db:
+        return get_matcher(db)
+
+
+def candidates_for(
+    db: Session, req: Request, k: int = 5, specialties: Optional[list[str]] = None
+) -> list[Candidate]:
+    matcher = get_matcher(db)
+    wanted = specialties or matcher.infer_specialties(req.description)
+    return matcher.top_k(k, wanted, parse_window(req.preferred_window))
+
+
+def pick_lawyer(db: Session, req: Request) -> Optional[uuid.UUID]:
+    """Best lawyer for a new request; counts it against their load right away."""
+    matcher = get_matcher(db)
+    wanted = matcher.infer_specialties(req.description)
+    best = matcher.top_k(1, wanted, parse_window(req.preferred_window))
+    if not best:
+        return None
+    matcher.bump_load(best[0].lawyer_id)
+    return best[0].lawyer_id
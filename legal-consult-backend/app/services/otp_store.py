@@ -0,0 +1,139 @@
+# app/services/otp_store.py
+# Where /auth/request-code keeps codes until /auth/verify consumes them.
+#
+# OTP_STORE=memory   (default) per-process dict + expiry heap; fine for one worker
+# OTP_STORE=postgres shared UNLOGGED otp_codes table; any worker can verify any code
+#
+# Both are single-use: a successful verify() deletes the code, so a replayed
+# request fails. Re-requesting a code replaces the previous one.
+import heapq
+import hmac
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timedelta
+from typing import Optional
+
+from sqlalchemy import delete, func
+from sqlalchemy.dialects.postgresql import insert
+
+from app.db import async_session
+from app.models.otp import OtpCode
+
+OTP_STORE = os.getenv("OTP_STORE", "memory")  # memory | postgres
+OTP_TTL_SECONDS = int(os.getenv("OTP_TTL_SECONDS", "600"))
+OTP_MEMORY_MAX_ENTRIES = int(os.getenv("OTP_MEMORY_MAX_ENTRIES", "100000"))
+
+
+class OTPStore(ABC):
+    @abstractmethod
+    async def put(self, phone: str, code: str, ttl: int = OTP_TTL_SECONDS) -> None:
+        ...
+
+    @abstractmethod
+    async def verify(self, phone: str, code: str) -> bool:
+        """True (and the code is consumed) iff `code` is the live code for `phone`."""
+
+
+class MemoryOTPStore(OTPStore):
+    """dict of live codes + min-heap of expiry times.
+
+    Expired entries are dropped from the heap head on every call, so memory tracks
+    the codes issued in the last TTL, and never exceeds `max_entries`: past that,
+    the codes closest to expiry are evicted first. Heap entries made stale by a
+    re-request or a verify are skipped via the per-entry sequence number.
+    """
+
+    def __init__(self, max_entries: int = OTP_MEMORY_MAX_ENTRIES, clock=time.monotonic):
+        self.max_entries = max_entries
+        self._clock = clock
+        self._codes: dict[str, tuple[str, float, int]] = {}   # phone -> (code, expires, seq)
+        self._heap: list[tuple[float, int, str]] = []          # (expires, seq, phone)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._codes)
+
+    def _pop_head(self) -> None:
+        _, seq, phone = heapq.heappop(self._heap)
+        live = self._codes.get(phone)
+        if live is not None and live[2] == seq:
+            del self._codes[phone]
+
+    def _expire(self, now: float) -> None:
+        while self._heap and (self._heap[0][0] <= now or len(self._codes) > self.max_entries):
+            self._pop_head()
+        # stale entries deeper in the heap: rebuild once they outnumber live ones
+        if len(self._heap) > 2 * len(self._codes) + 64:
+            self._heap = [(exp, seq, phone) for phone, (_, exp, seq) in self._codes.items()]
+            heapq.heapify(self._heap)
+
+    async def put(self, phone: str, code: str, ttl: int = OTP_TTL_SECONDS) -> None:
+        now = self._clock()
+        with self._lock:
+            self._seq += 1
+            expires = now + ttl
+            self._codes[phone] = (code, expires, self._seq)
+            heapq.heappush(self._heap, (expires, self._seq, phone))
+            self._expire(now)
+
+    async def verify(self, phone: str, code: str) -> bool:
+        now = self._clock()
+        with self._lock:
+            self._expire(now)
+            live = self._codes.get(phone)
+            if live is None or live[1] <= now or not hmac.compare_digest(live[0].encode(), code.encode()):
+                return False
+            del self._codes[phone]
+            return True
+
+
+class PostgresOTPStore(OTPStore):
+    """otp_codes (UNLOGGED): upsert on put, DELETE ... RETURNING on verify."""
+
+    PURGE_EVERY = 100  # puts between sweeps of expired rows
+
+    def __init__(self):
+        self._puts = 0
+
+    async def put(self, phone: str, code: str, ttl: int = OTP_TTL_SECONDS) -> None:
+        expires = datetime.utcnow() + timedelta(seconds=ttl)
+        stmt = insert(OtpCode).values(phone=phone, code=code, expires_at=expires)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[OtpCode.phone], set_={"code": stmt.excluded.code, "expires_at": stmt.excluded.expires_at}
+        )
+        self._puts += 1
+        async with async_session() as db:
+            await db.execute(stmt)
+            if self._puts % self.PURGE_EVERY == 0:
+                await db.execute(delete(OtpCode).where(OtpCode.expires_at <= func.timezone("utc", func.now())))
+            await db.commit()
+
+    async def verify(self, phone: str, code: str) -> bool:
+        # one statement: concurrent verifies of the same code can't both succeed
+        async with async_session() as db:
+            hit = (
+                await db.execute(
+                    delete(OtpCode)
+                    .where(
+                        OtpCode.phone == phone,
+                        OtpCode.code == code,
+                        OtpCode.expires_at > func.timezone("utc", func.now()),
+                    )
+                    .returning(OtpCode.phone)
+                )
+            ).first()
+            await db.commit()
+        return hit is not None
+
+
+_store: Optional[OTPStore] = None
+
+
+def get_store() -> OTPStore:
+    global _store
+    if _store is None:
+        _store = PostgresOTPStore() if OTP_STORE == "postgres" else MemoryOTPStore()
+    return _store
@@ -0,0 +1,224 @@
+# app/services/partitions.py
+# Monthly range partitions of requests (on created_at) and archival of old months.
+#
+# Migration 0013 turns requests into a table partitioned by RANGE (created_at):
+# everything before the cutover month lives in the partition requests_legacy,
+# later months in requests_yYYYYmMM. This module keeps that going:
+#   ensure_partitions()  creates the partitions for the current month and the next
+#                        REQUESTS_PARTITION_MONTHS_AHEAD months (no DEFAULT partition, so
+#                        a missing month fails inserts; the app runs this at startup
+#                        and every REQUESTS_PARTITION_CHECK_SECONDS)
+#   archive()            detaches partitions that ended more than N months ago and hold
+#                        only completed requests (DETACH ... CONCURRENTLY), moves them
+#                        to the REQUESTS_ARCHIVE_SCHEMA schema (optionally onto
+#                        REQUESTS_ARCHIVE_TABLESPACE), together with their payments
+#
+#   python -m app.services.partitions                        # ensure partitions, list them
+#   python -m app.services.partitions --archive --dry-run    # what would be archived
+#   python -m app.services.partitions --archive --months 12  # run from cron
+#
+# Only queries with a created_at bound are pruned. New request ids are UUIDv7 carrying
+# their created_at, and the id lookups (GET /requests/{id}, status updates, heartbeats,
+# the /events snapshot) add that bound via app/request_ids.py; ids from before (uuid4)
+# still probe every attached partition, which archive() keeps bounded.
+#
+# On an unpartitioned requests table (before 0013, or created by RUN_SYNC_DDL)
+# everything here is a no-op.
+import argparse
+import logging
+import os
+import re
+import threading
+from datetime import date, datetime
+from typing import Optional
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db import engine
+
+log = logging.getLogger(__name__)
+
+PARTITION_MONTHS_AHEAD = int(os.getenv("REQUESTS_PARTITION_MONTHS_AHEAD", "3"))
+PARTITION_CHECK_SECONDS = float(os.getenv("REQUESTS_PARTITION_CHECK_SECONDS", "21600"))
+ARCHIVE_AFTER_MONTHS = int(os.getenv("REQUESTS_ARCHIVE_AFTER_MONTHS", "12"))
+ARCHIVE_SCHEMA = os.getenv("REQUESTS_ARCHIVE_SCHEMA", "archive")
+ARCHIVE_TABLESPACE = os.getenv("REQUESTS_ARCHIVE_TABLESPACE") or None
+
+PARENT = "requests"
+_BOUND_RE = re.compile(r"FROM \((.+)\) TO \((.+)\)")
+
+
+def month_start(d: date) -> date:
+    return date(d.year, d.month, 1)
+
+
+def add_months(d: date, n: int) -> date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT}_y{month.year}m{month.month:02d}"
+
+
+def is_partitioned(conn: Connection) -> bool:
+    return conn.execute(text(
+        "SELECT c.relkind = 'p' FROM pg_class c WHERE c.oid = to_regclass(:t)"
+    ), {"t": PARENT}).scalar() or False
+
+
+def _bound(expr: str) -> Optional[date]:
+    expr = expr.strip()
+    return None if expr.upper() == "MINVALUE" else datetime.fromisoformat(expr.strip("'")).date()
+
+
+def partitions(conn: Connection) -> list[dict]:
+    """Attached partitions, oldest first: {name, lower, upper} (lower None = MINVALUE)."""
+    rows = conn.execute(text(
+        "SELECT c.relname, pg_get_expr(c.relpartbound, c.oid) FROM pg_inherits i "
+        "JOIN pg_class c ON c.oid = i.inhrelid WHERE i.inhparent = to_regclass(:t)"
+    ), {"t": PARENT}).all()
+    out = []
+    for name, bound in rows:
+        m = _BOUND_RE.search(bound)
+        if m:
+            out.append({"name": name, "lower": _bound(m.group(1)), "upper": _bound(m.group(2))})
+    return sorted(out, key=lambda p: p["upper"])
+
+
+def ensure_partitions(conn: Connection, months_ahead: int = PARTITION_MONTHS_AHEAD,
+                      today: Optional[date] = None) -> list[str]:
+    """Create monthly partitions, contiguous from the newest one, through today + months_ahead."""
+    if not is_partitioned(conn):
+        return []
+    existing = partitions(conn)
+    start = existing[-1]["upper"] if existing else month_start(today or datetime.utcnow().date())
+    until = add_months(month_start(today or datetime.utcnow().date()), months_ahead + 1)
+    created = []
+    month = start
+    while month < until:
+        name = partition_name(month)
+        conn.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {PARENT} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')"
+        ))
+        created.append(name)
+        month = add_months(month, 1)
+    conn.commit()
+    if created:
+        log.info("requests partitions created: %s", ", ".join(created))
+    return created
+
+
+def archive_candidates(conn: Connection, older_than_months: int = ARCHIVE_AFTER_MONTHS,
+                       today: Optional[date] = None) -> list[dict]:
+    """Partitions ending at least `older_than_months` months before this month, all rows completed."""
+    if not is_partitioned(conn):
+        return []
+    cutoff = add_months(month_start(today or datetime.utcnow().date()), -older_than_months)
+    out = []
+    for p in partitions(conn):
+        if p["upper"] > cutoff:
+            continue
+        open_rows = conn.execute(text(
+            f"SELECT count(*) FROM {p['name']} WHERE status <> 'completed'"
+        )).scalar()
+        rows = conn.execute(text(f"SELECT count(*) FROM {p['name']}")).scalar()
+        conn.rollback()
+        if open_rows:
+            log.info("archive: %s still has %d open requests, skipped", p["name"], open_rows)
+            continue
+        out.append({**p, "rows": rows})
+    return out
+
+
+def archive(older_than_months: int = ARCHIVE_AFTER_MONTHS, dry_run: bool = False,
+            today: Optional[date] = None) -> list[dict]:
+    """Detach old completed partitions into ARCHIVE_SCHEMA, moving their payments along."""
+    with engine.connect() as conn:
+        candidates = archive_candidates(conn, older_than_months, today)
+    if dry_run:
+        return candidates
+    for p in candidates:
+        name = p["name"]
+        # payments reference requests (0017): DETACH fails while any row of the partition
+        # is still referenced, so its payments move first
+        with engine.begin() as conn:
+            conn.execute(text(f"CREATE SCHEMA IF NOT EXISTS {ARCHIVE_SCHEMA}"))
+            conn.execute(text(
+                f"CREATE TABLE IF NOT EXISTS {ARCHIVE_SCHEMA}.payments (LIKE public.payments INCLUDING ALL)"
+            ))
+            # archive.payments created before 0017
+            conn.execute(text(
+                f"ALTER TABLE {ARCHIVE_SCHEMA}.payments ADD COLUMN IF NOT EXISTS request_created_at timestamp"
+            ))
+            p["payments"] = conn.execute(text(
+                f"WITH moved AS (DELETE FROM public.payments p USING {name} r "
+                f"WHERE p.request_id = r.id AND p.request_created_at = r.created_at RETURNING p.*) "
+                f"INSERT INTO {ARCHIVE_SCHEMA}.payments SELECT * FROM moved"
+            )).rowcount
+        # CONCURRENTLY can't run inside a transaction; only takes SHARE UPDATE EXCLUSIVE on requests
+        with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as conn:
+            conn.execute(text(f"ALTER TABLE {PARENT} DETACH PARTITION {name} CONCURRENTLY"))
+        with engine.begin() as conn:
+            conn.execute(text(f"ALTER TABLE {name} SET SCHEMA {ARCHIVE_SCHEMA}"))
+        if ARCHIVE_TABLESPACE:
+            # rewrites the table, but nothing reads it any more
+            with engine.begin() as conn:
+                conn.execute(text(f"ALTER TABLE {ARCHIVE_SCHEMA}.{name} SET TABLESPACE {ARCHIVE_TABLESPACE}"))
+        log.info("archived %s: %d requests, %d payments -> %s", name, p["rows"], p["payments"], ARCHIVE_SCHEMA)
+    return candidates
+
+
+# ---------- background maintenance ----------
+_stop = threading.Event()
+
+
+def _ensure() -> None:
+    with engine.connect() as conn:
+        ensure_partitions(conn)
+
+
+def _poll() -> None:
+    while not _stop.wait(PARTITION_CHECK_SECONDS):
+        try:
+            _ensure()
+        except Exception:
+            log.exception("requests partition maintenance failed")
+
+
+def start() -> None:
+    _stop.clear()
+    try:
+        _ensure()
+    except Exception:
+        log.exception("requests partitions: initial check failed; retrying in the background")
+    threading.Thread(target=_poll, name="requests-partitions", daemon=True).start()
+
+
+def stop() -> None:
+    _stop.set()
+
+
+if __name__ == "__main__":
+    ap = argparse.ArgumentParser(description="Create upcoming requests partitions; archive old ones")
+    ap.add_argument("--months-ahead", type=int, default=PARTITION_MONTHS_AHEAD)
+    ap.add_argument("--archive", action="store_true", help="detach old, fully completed partitions")
+    ap.add_argument("--months", type=int, default=ARCHIVE_AFTER_MONTHS, help="archive partitions older than this")
+    ap.add_argument("--dry-run", action="store_true", help="with --archive: list candidates only")
+    args = ap.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+    with engine.connect() as conn:
+        if not is_partitioned(conn):
+            raise SystemExit("requests is not partitioned (alembic upgrade to 0013_requests_partitioned)")
+        ensure_partitions(conn, args.months_ahead)
+        for p in partitions(conn):
+            print(f"{p['name']:<24} {p['lower'] or 'MINVALUE'} .. {p['upper']}")
+    if args.archive:
+        done = archive(args.months, dry_run=args.dry_run)
+        verb = "would archive" if args.dry_run else "archived"
+        for p in done:
+            print(f"{verb} {p['name']} ({p['rows']} requests)")
+        if not done:
+            print("nothing to archive")
@@ -0,0 +1,157 @@
+# app/services/pool_metrics.py
+# Connection pool instrumentation for GET /health/db.
+#
+# Engines are created with pool_class(): a QueuePool subclass that times how long
+# each checkout waited for a connection. instrument(engine) then hooks pool events
+# to sample how many connections were checked out / in overflow at that moment. It also implements the "idle"
+# pre-ping strategy (see app/settings.py): ping only connections that sat unused
+# long enough for the server or a proxy to have dropped them.
+import bisect
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import event, exc
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+
+WAIT_BUCKETS_MS = (1, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000)
+
+
+class Histogram:
+    """Per-bucket (non-cumulative) counts; each bound is its bucket's inclusive upper edge."""
+
+    def __init__(self, bounds):
+        self.bounds = tuple(bounds)
+        self.counts = [0] * (len(self.bounds) + 1)  # last bucket is +Inf
+        self.total = 0
+        self.sum = 0.0
+        self.max = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        i = bisect.bisect_left(self.bounds, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.total += 1
+            self.sum += value
+            if value > self.max:
+                self.max = value
+
+    def snapshot(self) -> dict:
+        with self._lock:
+            buckets = {str(b): n for b, n in zip(self.bounds, self.counts)}
+            buckets["+Inf"] = self.counts[-1]
+            return {
+                "count": self.total,
+                "sum": round(self.sum, 3),
+                "max": round(self.max, 3),
+                "buckets": buckets,
+            }
+
+
+class PoolStats:
+    def __init__(self, capacity: int):
+        self.wait_ms = Histogram(WAIT_BUCKETS_MS)
+        self.checked_out = Histogram(range(1, capacity + 1))
+        self.overflow = Histogram(range(0, capacity + 1))
+        self.timeouts = 0
+        self.connects = 0
+        self.invalidations = 0
+        self.pings = 0
+
+    def snapshot(self) -> dict:
+        return {
+            "wait_ms": self.wait_ms.snapshot(),
+            "checked_out": self.checked_out.snapshot(),
+            "overflow": self.overflow.snapshot(),
+            "timeouts": self.timeouts,
+            "connects": self.connects,
+            "invalidations": self.invalidations,
+            "pings": self.pings,
+        }
+
+
+class _TimedCheckout:
+    """Mixin for QueuePool variants: times the wait for a connection in _do_get."""
+    stats: Optional[PoolStats] = None
+
+    def _do_get(self):
+        t0 = time.perf_counter()
+        try:
+            return super()._do_get()
+        except exc.TimeoutError:
+            if self.stats is not None:
+                self.stats.timeouts += 1
+            raise
+        finally:
+            if self.stats is not None:
+                self.stats.wait_ms.observe((time.perf_counter() - t0) * 1000)
+
+    def recreate(self):
+        new = super().recreate()
+        new.stats = self.stats
+        return new
+
+
+class TimedQueuePool(_TimedCheckout, QueuePool):
+    pass
+
+
+class TimedAsyncQueuePool(_TimedCheckout, AsyncAdaptedQueuePool):
+    pass
+
+
+def pool_class(is_async: bool):
+    return TimedAsyncQueuePool if is_async else TimedQueuePool
+
+
+def instrument(engine, ping_idle_seconds: Optional[float] = None) -> PoolStats:
+    """Attach stats and event hooks to `engine` (created with pool_class())."""
+    engine = getattr(engine, "sync_engine", engine)  # AsyncEngine: events live on the sync side
+    pool = engine.pool
+    stats = PoolStats(pool.size() + max(pool._max_overflow, 0))
+    pool.stats = stats
+
+    @event.listens_for(engine, "connect")
+    def _connect(dbapi_conn, record):
+        stats.connects += 1
+
+    @event.listens_for(engine, "invalidate")
+    def _invalidate(dbapi_conn, record, exception):
+        stats.invalidations += 1
+
+    @event.listens_for(engine, "checkin")
+    def _checkin(dbapi_conn, record):
+        record.info["checked_in_at"] = time.monotonic()
+
+    @event.listens_for(engine, "checkout")
+    def _checkout(dbapi_conn, record, proxy):
+        p = engine.pool
+        stats.checked_out.observe(p.checkedout())
+        stats.overflow.observe(max(p.overflow(), 0))
+        if ping_idle_seconds is None:
+            return
+        idle_since = record.info.get("checked_in_at")
+        if idle_since is None or time.monotonic() - idle_since < ping_idle_seconds:
+            return
+        stats.pings += 1
+        try:
+            engine.dialect.do_ping(dbapi_conn)
+        except Exception as e:
+            # the pool discards this connection and retries with a fresh one
+            raise exc.DisconnectionError() from e
+
+    return stats
+
+
+def pool_status(engine) -> dict:
+    pool = getattr(engine, "sync_engine", engine).pool
+    return {
+        "size": pool.size(),
+        "checked_in": pool.checkedin(),
+        "checked_out": pool.checkedout(),
+        "overflow": max(pool.overflow(), 0),
+        "max_overflow": pool._max_overflow,
+        "timeout": pool.timeout(),
+        "stats": pool.stats.snapshot() if getattr(pool, "stats", None) else None,
+    }
@@ -0,0 +1,201 @@
+# app/services/request_events.py
+# Request status push: one LISTEN connection per worker, fanned out to subscribers.
+#
+# Migration 0014's trigger sends NOTIFY request_events with {id, status,
+# assigned_lawyer} whenever a request's status or lawyer changes, whoever wrote it.
+# Each worker keeps a single asyncpg connection LISTENing on that channel (outside
+# the pools) and hands every notification to the asyncio queues subscribed to that
+# request id, so thousands of open GET /requests/{id}/events streams cost one DB
+# connection and no polling.
+#
+# Subscriber queues are small and keep the newest events: a client that can't keep
+# up skips intermediate states, never the last one. NOTIFYs sent while the listener
+# is reconnecting are lost, so after a reconnect every subscriber gets RESYNC and
+# should re-read the row. Streams last at most REQUEST_EVENTS_MAX_SECONDS.
+#
+# A LISTEN connection only reads, so a half-open TCP connection (server gone, no
+# FIN/RST) would never be noticed: every REQUEST_EVENTS_PING_SECONDS the listener runs
+# SELECT 1 and treats no answer within PING_TIMEOUT_SECONDS as a lost connection.
+import asyncio
+import json
+import logging
+import os
+from typing import Optional
+
+import asyncpg
+from sqlalchemy.engine import make_url
+
+from app.db import DATABASE_URL
+
+log = logging.getLogger(__name__)
+
+CHANNEL = "request_events"
+REQUEST_EVENTS_ENABLED = os.getenv("REQUEST_EVENTS_ENABLED", "1") == "1"
+HEARTBEAT_SECONDS = float(os.getenv("REQUEST_EVENTS_HEARTBEAT_SECONDS", "15"))
+# streams end after this long and clients reconnect: open streams would otherwise hold
+# up a graceful shutdown (uvicorn waits for them) indefinitely
+MAX_STREAM_SECONDS = float(os.getenv("REQUEST_EVENTS_MAX_SECONDS", "300"))
+PING_SECONDS = float(os.getenv("REQUEST_EVENTS_PING_SECONDS", "30"))
+PING_TIMEOUT_SECONDS = 10.0
+RECONNECT_SECONDS = 2.0
+QUEUE_SIZE = 8
+
+RESYNC = {"event": "resync"}
+
+# InterfaceError (e.g. ConnectionDoesNotExistError) is neither an OSError nor a PostgresError
+_CONNECTION_ERRORS = (OSError, asyncpg.PostgresError, asyncpg.InterfaceError)
+
+
+def listen_dsn(url: str = DATABASE_URL) -> str:
+    """postgresql+psycopg2://...?sslmode=require -> plain libpq-style DSN for asyncpg.connect."""
+    u = make_url(url)
+    query = {k: v for k, v in u.query.items() if k not in ("channel_binding", "options")}
+    return u.set(drivername="postgresql", query=query).render_as_string(hide_password=False)
+
+
+class Subscription:
+    def __init__(self, broker: "Broker", key: str):
+        self.broker, self.key = broker, key
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize=QUEUE_SIZE)
+
+    def put(self, event: dict) -> None:
+        if self.queue.full():
+            self.queue.get_nowait()  # drop the oldest; the newest state is what matters
+            self.broker.stats["dropped"] += 1
+        self.queue.put_nowait(event)
+
+    async def next(self, timeout: float = HEARTBEAT_SECONDS) -> Optional[dict]:
+        """Next event, or None after `timeout` seconds without one."""
+        try:
+            return await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    def __init__(self, dsn: str):
+        self.dsn = dsn
+        self._subs: dict[str, set[Subscription]] = {}
+        self._task: Optional[asyncio.Task] = None
+        self.connected = False
+        self.stats = {"notifications": 0, "delivered": 0, "dropped": 0, "reconnects": 0, "pings_failed": 0}
+
+    # ---------- subscribers ----------
+    def subscribe(self, request_id) -> Subscription:
+        sub = Subscription(self, str(request_id))
+        self._subs.setdefault(sub.key, set()).add(sub)
+        return sub
+
+    def unsubscribe(self, sub: Subscription) -> None:
+        subs = self._subs.get(sub.key)
+        if subs is not None:
+            subs.discard(sub)
+            if not subs:
+                del self._subs[sub.key]
+
+    def publish(self, event: dict) -> None:
+        for sub in self._subs.get(event["id"], ()):
+            sub.put(event)
+            self.stats["delivered"] += 1
+
+    def _resync_all(self) -> None:
+        for subs in self._subs.values():
+            for sub in subs:
+                sub.put(RESYNC)
+
+    # ---------- listener ----------
+    def _on_notify(self, conn, pid, channel, payload) -> None:
+        self.stats["notifications"] += 1
+        try:
+            event = json.loads(payload)
+        except ValueError:
+            log.warning("request_events: bad payload %r", payload)
+            return
+        self.publish({"event": "status", **event})
+
+    async def _watch(self, conn, lost: asyncio.Event) -> None:
+        """Return once the connection is closed or stops answering SELECT 1."""
+        while True:
+            try:
+                await asyncio.wait_for(lost.wait(), PING_SECONDS)
+                return
+            except asyncio.TimeoutError:
+                pass
+            try:
+                await asyncio.wait_for(conn.execute("SELECT 1"), PING_TIMEOUT_SECONDS)
+            except (asyncio.TimeoutError, *_CONNECTION_ERRORS) as e:
+                self.stats["pings_failed"] += 1
+                log.warning("request_events: listener ping failed (%s)", str(e) or type(e).__name__)
+                return
+
+    async def _listen(self) -> None:
+        first = True
+        while True:
+            try:
+                conn = await asyncpg.connect(self.dsn)
+            except _CONNECTION_ERRORS as e:
+                log.warning("request_events: listener connect failed (%s); retrying", e)
+                await asyncio.sleep(RECONNECT_SECONDS)
+                continue
+            except Exception:
+                log.exception("request_events: listener connect failed; retrying")
+                await asyncio.sleep(RECONNECT_SECONDS)
+                continue
+            lost = asyncio.Event()
+            conn.add_termination_listener(lambda c: lost.set())
+            try:
+                await conn.add_listener(CHANNEL, self._on_notify)
+                self.connected = True
+                if not first:
+                    self.stats["reconnects"] += 1
+                first = False
+                # anything sent before this LISTEN (a lost connection, a failed attempt) is gone
+                self._resync_all()
+                await self._watch(conn, lost)
+                log.warning("request_events: listener connection lost; reconnecting")
+            except _CONNECTION_ERRORS as e:
+                log.warning("request_events: listener failed (%s); reconnecting", e)
+            except Exception:
+                # anything else must not end the task: every subscriber would only get heartbeats
+                log.exception("request_events: listener failed unexpectedly; reconnecting")
+            finally:
+                self.connected = False
+                if not conn.is_closed():
+                    conn.terminate()
+            await asyncio.sleep(RECONNECT_SECONDS)
+
+    async def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._listen(), name="request-events-listener")
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def report(self) -> dict:
+        return {
+            "connected": self.connected,
+            "requests": len(self._subs),
+            "subscribers": sum(len(s) for s in self._subs.values()),
+            **self.stats,
+        }
+
+
+broker = Broker(listen_dsn())
+
+
+async def start() -> None:
+    if REQUEST_EVENTS_ENABLED:
+        await broker.start()
+
+
+async def stop() -> None:
+    await broker.stop()
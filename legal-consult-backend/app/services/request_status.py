@@ -0,0 +1,48 @@
+# app/services/request_status.py
+# Request status state machine: pending -> assigned -> calling -> completed.
+#
+# A transition is one statement:
+#   UPDATE requests SET status = :to, <lease cleared>
+#   WHERE id IN (:ids) AND status IN (<allowed predecessors of :to>) RETURNING *
+# so two agents racing on the same request can't both win, and a stale client
+# can't move a request backwards. Rows that didn't match are either missing or
+# in a state the transition doesn't start from; callers look those up only
+# when something failed.
+#
+# Claims (app/services/claims.py) and lease expiry move rows outside this path.
+import uuid
+from typing import Iterable
+
+from sqlalchemy import update, select
+from sqlalchemy.sql import Update, Select
+
+from app import request_ids
+from app.models.request import Request
+
+STATUSES = ("pending", "assigned", "calling", "completed")
+
+PREDECESSORS: dict[str, tuple[str, ...]] = {
+    "pending": (),
+    "assigned": ("pending",),
+    "calling": ("assigned",),
+    "completed": ("calling",),
+}
+
+
+def transition(ids: Iterable[uuid.UUID], to_status: str) -> Update:
+    """UPDATE ... RETURNING Request for every id whose current status may move to `to_status`."""
+    if to_status not in PREDECESSORS:
+        raise ValueError(f"unknown status {to_status!r}")
+    return (
+        update(Request)
+        .where(*request_ids.match_any(Request, ids), Request.status.in_(PREDECESSORS[to_status]))
+        # whoever held a claim acted on it: the row no longer goes back to the queue
+        .values(status=to_status, claimed_by=None, lease_expires_at=None, claimed_lawyer=None)
+        .returning(Request)
+        .execution_options(synchronize_session=False)
+    )
+
+
+def current_statuses(ids: Iterable[uuid.UUID]) -> Select:
+    """(id, status) of the given ids, to explain failed transitions."""
+    return select(Request.id, Request.status).where(*request_ids.match_any(Request, ids))
@@ -0,0 +1,178 @@
+# app/services/response_cache.py
+# In-memory cache of serialized /articles responses, with ETag revalidation.
+#
+# Freshness comes from the table_versions row for "articles", which a trigger bumps
+# on every write from any process (seed_articles.py, other workers, psql). Each
+# worker polls that row every ARTICLE_CACHE_POLL_SECONDS and also bumps a local
+# generation on its own ORM writes, so its own inserts are visible immediately.
+#
+# ETag = "<table_versions value>-<hash of the body>": the same body gets the same
+# tag from every worker, and different bodies never share one. A matching
+# If-None-Match is answered with 304 from the cache entry (no DB access), or after
+# recomputing the body when this worker has no entry. Writes from other processes
+# can be served stale for up to one poll interval.
+import hashlib
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Optional
+from urllib.parse import urlencode
+
+from fastapi import Request
+from fastapi.responses import Response
+from sqlalchemy import event, select
+
+from app.db import SessionLocal
+from app.models.article import Article
+from app.models.table_version import TableVersion
+
+log = logging.getLogger(__name__)
+
+ARTICLE_CACHE_MAX_ENTRIES = int(os.getenv("ARTICLE_CACHE_MAX_ENTRIES", "2048"))
+ARTICLE_CACHE_TTL_SECONDS = float(os.getenv("ARTICLE_CACHE_TTL_SECONDS", "300"))
+ARTICLE_CACHE_POLL_SECONDS = float(os.getenv("ARTICLE_CACHE_POLL_SECONDS", "2"))
+
+
+class ResponseCache:
+    def __init__(self, table: str, max_entries: int, ttl: float):
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.db_version = 0
+        self.generation = 0
+        self._entries: OrderedDict[str, tuple[tuple[int, int], bytes, str, float]] = OrderedDict()
+        self._lock = threading.Lock()
+        self.stats = {"hits": 0, "misses": 0, "not_modified": 0, "evictions": 0, "expired": 0, "invalidations": 0}
+
+    # ---------- versioning ----------
+    @property
+    def version(self) -> tuple[int, int]:
+        return self.db_version, self.generation
+
+    def invalidate(self, *_args) -> None:
+        """Local write: bump the generation and drop everything."""
+        with self._lock:
+            self.generation += 1
+            self._entries.clear()
+            self.stats["invalidations"] += 1
+
+    def set_db_version(self, version: int) -> None:
+        if version != self.db_version:
+            with self._lock:
+                self.db_version = version
+                self._entries.clear()
+                self.stats["invalidations"] += 1
+
+    # ---------- keys ----------
+    @staticmethod
+    def key(request: Request) -> str:
+        # same parameters in any order share an entry; re-encoded, so an escaped '&' or
+        # '=' inside a value can't make one query's key collide with another's
+        return request.url.path + "?" + urlencode(sorted(request.query_params.multi_items()))
+
+    @staticmethod
+    def etag(version: tuple[int, int], body: bytes) -> str:
+        # the shared db version only, not the per-worker generation: workers agree on tags
+        return f'"{version[0]}-{hashlib.blake2b(body, digest_size=12).hexdigest()}"'
+
+    @staticmethod
+    def _matches(request_etags: Optional[str], etag: str) -> bool:
+        return bool(request_etags) and etag in (t.strip().removeprefix("W/") for t in request_etags.split(","))
+
+    # ---------- lookup / store ----------
+    def lookup(self, request: Request) -> tuple[Optional[Response], str, tuple[int, int]]:
+        """(response to return or None, cache key, version to pass to store())."""
+        key = self.key(request)
+        version = self.version
+        with self._lock:
+            hit = self._entries.get(key)
+            if hit is not None:
+                entry_version, body, etag, expires = hit
+                if entry_version == version and expires > time.monotonic():
+                    self._entries.move_to_end(key)
+                    if self._matches(request.headers.get("if-none-match"), etag):
+                        self.stats["not_modified"] += 1
+                        return Response(status_code=304, headers=self._headers(etag, "REVALIDATED")), key, version
+                    self.stats["hits"] += 1
+                    return self._response(body, etag, "HIT"), key, version
+                del self._entries[key]
+                self.stats["expired"] += 1
+            self.stats["misses"] += 1
+        return None, key, version
+
+    def store(self, request: Request, key: str, version: tuple[int, int], body: bytes,
+              headers: Optional[dict] = None) -> Response:
+        """Cache `body` under the version seen before it was computed; a write in
+        between leaves the entry behind the current version, i.e. never served."""
+        etag = self.etag(version, body)
+        with self._lock:
+            if version == self.version:
+                self._entries[key] = (version, body, etag, time.monotonic() + self.ttl)
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+                    self.stats["evictions"] += 1
+        if self._matches(request.headers.get("if-none-match"), etag):
+            self.stats["not_modified"] += 1
+            return Response(status_code=304, headers=self._headers(etag, "REVALIDATED"))
+        response = self._response(body, etag, "MISS")
+        response.headers.update(headers or {})  # this response only, not cached
+        return response
+
+    def _headers(self, etag: str, state: str) -> dict:
+        return {"ETag": etag, "Cache-Control": "no-cache", "X-Cache": state}
+
+    def _response(self, body: bytes, etag: str, state: str) -> Response:
+        return Response(content=body, media_type="application/json", headers=self._headers(etag, state))
+
+    def report(self) -> dict:
+        served = self.stats["hits"] + self.stats["not_modified"]
+        total = served + self.stats["misses"]
+        return {
+            **self.stats,
+            "entries": len(self._entries),
+            "hit_rate": round(served / total, 4) if total else None,
+            "db_version": self.db_version,
+            "generation": self.generation,
+        }
+
+
+articles_cache = ResponseCache("articles", ARTICLE_CACHE_MAX_ENTRIES, ARTICLE_CACHE_TTL_SECONDS)
+
+for _evt in ("after_insert", "after_update", "after_delete"):
+    event.listen(Article, _evt, articles_cache.invalidate)
+
+
+# ---------- version poller ----------
+_stop = threading.Event()
+
+
+def refresh_version(cache: ResponseCache = articles_cache) -> None:
+    with SessionLocal() as db:
+        version = db.execute(
+            select(TableVersion.version).where(TableVersion.table_name == cache.table)
+        ).scalar_one_or_none()
+    cache.set_db_version(version or 0)
+
+
+def _poll() -> None:
+    while not _stop.wait(ARTICLE_CACHE_POLL_SECONDS):
+        try:
+            refresh_version()
+        except Exception:
+            log.exception("article cache version poll failed")
+
+
+def start() -> None:
+    _stop.clear()
+    try:
+        refresh_version()
+    except Exception:
+        log.exception("article cache: could not read table_versions; polling anyway")
+    threading.Thread(target=_poll, name="article-cache-version", daemon=True).start()
+
+
+def stop() -> None:
+    _stop.set()
@@ -0,0 +1,272 @@
+# app/services/sql_profiler.py
+# SQL profiling: slow-query log, N+1 detector, sampled EXPLAIN capture.
+#
+# No listeners or middleware of its own: install() registers hooks with app/metrics.py,
+# whose cursor hooks time every statement and whose RequestTiming counts each
+# request's statements per template.
+#
+#   slow log    statements over SQL_SLOW_MS are logged (and kept in a ring for
+#               GET /admin/sql) with their parameter shapes: names and types, never values
+#   N+1         per HTTP request, statements are grouped by template (placeholders and
+#               IN-lists collapsed); a template run SQL_N1_THRESHOLD+ times in one request
+#               is reported with the route and, where the stack shows it, the app line
+#   EXPLAIN     a SQL_EXPLAIN_SAMPLE fraction of slow read-only statements is re-run as
+#               EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) on a background thread, at most once
+#               per template per SQL_EXPLAIN_INTERVAL_SECONDS, and stored in sql_plans
+#
+# Only SELECT/WITH statements without FOR UPDATE or data-modifying CTEs are
+# explained: ANALYZE executes the statement again (inside a rolled-back transaction).
+# The EXPLAIN thread's own statements are not profiled.
+#
+# EXPLAIN runs with the real parameter values, so conditions in the plan ("Index Cond",
+# "Filter", ...) contain them as literals. redact_plan() replaces every quoted or
+# numeric literal in the plan's text fields with '?' / ? before the row is written;
+# sql_plans is still only exposed through the admin-token routes (GET /admin/sql).
+import hashlib
+import logging
+import os
+import queue
+import random
+import re
+import threading
+import time
+import traceback
+import uuid
+from collections import deque
+from contextvars import ContextVar
+from typing import Optional
+
+from app import metrics
+from app.db import SessionLocal, engine as sync_engine
+from app.metrics import RequestTiming, template
+from app.models.sql_plan import SqlPlan
+
+log = logging.getLogger(__name__)
+
+SQL_SLOW_MS = float(os.getenv("SQL_SLOW_MS", "500"))                  # 0 = off
+SQL_N1_THRESHOLD = int(os.getenv("SQL_N1_THRESHOLD", "10"))            # 0 = off
+SQL_EXPLAIN_SAMPLE = float(os.getenv("SQL_EXPLAIN_SAMPLE", "0"))       # 0..1 of slow statements
+SQL_EXPLAIN_INTERVAL_SECONDS = float(os.getenv("SQL_EXPLAIN_INTERVAL_SECONDS", "600"))
+SQL_EXPLAIN_TIMEOUT_MS = int(os.getenv("SQL_EXPLAIN_TIMEOUT_MS", "30000"))
+
+RECENT_SLOW = 100
+EXPLAIN_QUEUE = 32
+APP_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__))) + os.sep
+_SKIP_FRAMES = (os.path.join(APP_DIR, "services", "sql_profiler.py"), os.path.join(APP_DIR, "metrics.py"),
+                os.path.join(APP_DIR, "db.py"))
+
+_WRITES_RE = re.compile(r"\b(INSERT|UPDATE|DELETE|MERGE)\b|\bFOR\s+(NO\s+KEY\s+)?(UPDATE|SHARE)\b", re.I)
+_STRING_LITERAL_RE = re.compile(r"'(?:[^']|'')*'")
+_NUMBER_LITERAL_RE = re.compile(r"(?<![\w.$])-?\d+(?:\.\d+)?(?:e[+-]?\d+)?(?![\w.])", re.I)
+# plan fields that name things rather than carry expressions: left as they are
+_PLAN_NAME_KEYS = frozenset((
+    "Node Type", "Parent Relationship", "Relation Name", "Schema", "Alias", "Index Name", "Subplan Name",
+    "CTE Name", "Function Name", "Strategy", "Join Type", "Scan Direction", "Partial Mode", "Operation",
+    "Sort Method", "Sort Space Type",
+))
+
+
+def fingerprint(tpl: str) -> str:
+    return hashlib.blake2b(tpl.encode(), digest_size=8).hexdigest()
+
+
+def _shape(value) -> str:
+    if value is None:
+        return "null"
+    if isinstance(value, (list, tuple)):
+        return f"{type(value).__name__}[{len(value)}]"
+    return type(value).__name__
+
+
+def param_shape(parameters, executemany: bool = False) -> str:
+    """Names/positions and types of the bound parameters; values are never included."""
+    if executemany:
+        rows = list(parameters or ())
+        return f"{len(rows)} x {param_shape(rows[0]) if rows else '()'}"
+    if isinstance(parameters, dict):
+        return "{" + ", ".join(f"{k}: {_shape(v)}" for k, v in parameters.items()) + "}"
+    if isinstance(parameters, (list, tuple)):
+        return "(" + ", ".join(_shape(v) for v in parameters) + ")"
+    return "()"
+
+
+def redact_plan(node, key: Optional[str] = None):
+    """EXPLAIN ... FORMAT JSON with the literals in its expressions replaced by ? ('?' for strings)."""
+    if isinstance(node, dict):
+        return {k: redact_plan(v, k) for k, v in node.items()}
+    if isinstance(node, list):
+        return [redact_plan(v, key) for v in node]
+    if isinstance(node, str) and key not in _PLAN_NAME_KEYS:
+        return _NUMBER_LITERAL_RE.sub("?", _STRING_LITERAL_RE.sub("'?'", node))
+    return node
+
+
+def _explainable(tpl: str) -> bool:
+    head = tpl.split(" ", 1)[0].upper()
+    return head in ("SELECT", "WITH") and not _WRITES_RE.search(tpl)
+
+
+def _app_location() -> Optional[str]:
+    """Innermost app frame that issued the statement (not visible from async greenlets)."""
+    for frame in reversed(traceback.extract_stack()):
+        if frame.filename.startswith(APP_DIR) and frame.filename not in _SKIP_FRAMES:
+            return f"{os.path.relpath(frame.filename, os.path.dirname(APP_DIR))}:{frame.lineno} in {frame.name}"
+    return None
+
+
+# ---------- state ----------
+_internal: ContextVar[bool] = ContextVar("sql_profile_internal", default=False)
+
+_lock = threading.Lock()
+_recent_slow: deque = deque(maxlen=RECENT_SLOW)
+_n_plus_one: dict[tuple[str, str], dict] = {}
+_last_explained: dict[str, float] = {}
+_counters = {"slow": 0, "n_plus_one": 0, "explained": 0, "explain_dropped": 0, "explain_failed": 0}
+_jobs: "queue.Queue[dict]" = queue.Queue(maxsize=EXPLAIN_QUEUE)
+_worker: Optional[threading.Thread] = None
+
+
+# ---------- statement hook (app/metrics.py) ----------
+def _on_statement(conn, statement, parameters, executemany, elapsed, timing: Optional[RequestTiming]) -> None:
+    if _internal.get():
+        return
+    if timing is not None and SQL_N1_THRESHOLD:
+        tpl = template(statement)
+        if timing.templates.get(tpl) == SQL_N1_THRESHOLD:
+            timing.locations[tpl] = _app_location()
+    elapsed_ms = elapsed * 1000
+    if SQL_SLOW_MS and elapsed_ms >= SQL_SLOW_MS:
+        _on_slow(conn, statement, parameters, executemany, elapsed_ms, timing)
+
+
+def _on_slow(conn, statement, parameters, executemany, elapsed_ms, timing) -> None:
+    tpl = template(statement)
+    shape = param_shape(parameters, executemany)
+    route = timing.route if timing is not None else None
+    log.warning("slow query %.1f ms%s: %s params=%s", elapsed_ms, f" [{route}]" if route else "", tpl, shape)
+    with _lock:
+        _counters["slow"] += 1
+        _recent_slow.append({
+            "at": time.time(), "ms": round(elapsed_ms, 2), "route": route,
+            "fingerprint": fingerprint(tpl), "template": tpl, "params": shape,
+        })
+    if not SQL_EXPLAIN_SAMPLE or executemany or random.random() >= SQL_EXPLAIN_SAMPLE or not _explainable(tpl):
+        return
+    fp = fingerprint(tpl)
+    now = time.monotonic()
+    with _lock:
+        if now - _last_explained.get(fp, -SQL_EXPLAIN_INTERVAL_SECONDS) < SQL_EXPLAIN_INTERVAL_SECONDS:
+            return
+        _last_explained[fp] = now
+    job = {
+        "statement": statement, "parameters": parameters, "paramstyle": conn.dialect.paramstyle,
+        "fingerprint": fp, "template": tpl, "params": shape, "route": route, "ms": elapsed_ms,
+    }
+    try:
+        _jobs.put_nowait(job)
+    except queue.Full:
+        _counters["explain_dropped"] += 1
+
+
+# ---------- N+1 (end of request) ----------
+def _finish_request(timing: RequestTiming) -> None:
+    route = None
+    for tpl, n in timing.templates.items():
+        if n < SQL_N1_THRESHOLD:
+            continue
+        route = route or timing.route
+        location = timing.locations.get(tpl)
+        log.warning("possible N+1 [%s]: %d x %s%s", route, n, tpl, f" (from {location})" if location else "")
+        key = (route, fingerprint(tpl))
+        with _lock:
+            _counters["n_plus_one"] += 1
+            found = _n_plus_one.get(key)
+            if found is None:
+                found = _n_plus_one[key] = {"route": route, "template": tpl, "location": location,
+                                            "requests": 0, "max_per_request": 0}
+            found["requests"] += 1
+            found["max_per_request"] = max(found["max_per_request"], n)
+            found["last_at"] = time.time()
+            found["location"] = found["location"] or location
+
+
+# ---------- EXPLAIN capture ----------
+def _driver_sql(job: dict) -> tuple[str, object]:
+    """The statement in psycopg2 form: the capture runs on the sync engine whatever engine ran it."""
+    statement, params = job["statement"], job["parameters"]
+    def plain(v):
+        return str(v) if isinstance(v, uuid.UUID) else v  # incl. asyncpg's UUID subclass
+    if job["paramstyle"] in ("numeric_dollar", "numeric"):
+        order = [int(m) for m in re.findall(r"\$(\d+)", statement)]
+        statement = re.sub(r"\$\d+", "%s", statement.replace("%", "%%"))
+        params = [plain(params[i - 1]) for i in order]
+    elif isinstance(params, dict):
+        params = {k: plain(v) for k, v in params.items()}
+    elif params:
+        params = [plain(v) for v in params]
+    return statement, params or None
+
+
+def _explain(job: dict) -> None:
+    statement, params = _driver_sql(job)
+    with sync_engine.connect() as conn:
+        cur = conn.connection.dbapi_connection.cursor()
+        try:
+            cur.execute(f"SET LOCAL statement_timeout = {int(SQL_EXPLAIN_TIMEOUT_MS)}")
+            cur.execute("EXPLAIN (ANALYZE, BUFFERS, FORMAT JSON) " + statement, params)
+            plan = cur.fetchone()[0]
+        finally:
+            cur.close()
+            conn.rollback()
+    with SessionLocal() as db:
+        db.add(SqlPlan(
+            fingerprint=job["fingerprint"], template=job["template"], params=job["params"],
+            route=job["route"], duration_ms=round(job["ms"], 2), plan=redact_plan(plan),
+        ))
+        db.commit()
+
+
+def _run_worker() -> None:
+    _internal.set(True)
+    while True:
+        job = _jobs.get()
+        try:
+            _explain(job)
+            _counters["explained"] += 1
+        except Exception:
+            _counters["explain_failed"] += 1
+            log.warning("EXPLAIN capture failed for %s", job["template"], exc_info=True)
+
+
+# ---------- wiring / report ----------
+def enabled() -> bool:
+    return bool(SQL_SLOW_MS or SQL_N1_THRESHOLD)
+
+
+def install() -> bool:
+    """Register with app/metrics.py; call before metrics.install()."""
+    global _worker
+    if not enabled():
+        return False
+    metrics.add_hooks(
+        on_statement=_on_statement,
+        on_finish=_finish_request if SQL_N1_THRESHOLD else None,
+        count_templates=bool(SQL_N1_THRESHOLD),
+    )
+    if SQL_EXPLAIN_SAMPLE and _worker is None:
+        _worker = threading.Thread(target=_run_worker, name="sql-explain", daemon=True)
+        _worker.start()
+    return True
+
+
+def report() -> dict:
+    with _lock:
+        return {
+            "settings": {
+                "slow_ms": SQL_SLOW_MS, "n1_threshold": SQL_N1_THRESHOLD,
+                "explain_sample": SQL_EXPLAIN_SAMPLE, "explain_interval_seconds": SQL_EXPLAIN_INTERVAL_SECONDS,
+            },
+            "counters": dict(_counters, explain_queued=_jobs.qsize()),
+            "n_plus_one": sorted(_n_plus_one.values(), key=lambda f: f["requests"], reverse=True),
+            "recent_slow": list(reversed(_recent_slow)),
+        }
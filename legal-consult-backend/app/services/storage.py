@@ -0,0 +1,365 @@
+# app/services/storage.py
+# Attachment bytes: a small storage-backend interface with a local-filesystem and an
+# S3-compatible implementation (ATTACHMENT_STORAGE=local|s3).
+#
+# Uploads arrive as an async iterator of body chunks (request.stream()) and are
+# hashed (sha256) and written as they arrive: memory per upload is one write buffer
+# (local, WRITE_BUFFER) or one multipart part (S3, S3_PART_SIZE), whatever the
+# file size. A failed or oversized upload leaves nothing behind.
+#
+# Downloads honour a single "Range: bytes=a-b" (206, or 416 when unsatisfiable;
+# multi-range requests get the whole object, which RFC 9110 allows):
+#   local  ATTACHMENT_ACCEL_REDIRECT set: an X-Accel-Redirect header only, nginx serves
+#          the file (sendfile, Range) from that internal location
+#          otherwise: sendfile through the ASGI zerocopy extension when the server
+#          offers it, else os.pread in READ_CHUNK pieces on the threadpool (uvicorn)
+#   s3     ATTACHMENT_S3_REDIRECT=1: 307 to a presigned URL (S3 handles Range)
+#          otherwise: ranged GetObject streamed through
+import asyncio
+import hashlib
+import os
+import re
+import uuid
+from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from typing import AsyncIterator, Optional
+from urllib.parse import quote
+
+from fastapi.responses import RedirectResponse, Response
+from starlette.concurrency import run_in_threadpool
+
+ATTACHMENT_STORAGE = os.getenv("ATTACHMENT_STORAGE", "local")
+ATTACHMENT_STORAGE_DIR = os.getenv("ATTACHMENT_STORAGE_DIR", "data/attachments")
+ATTACHMENT_ACCEL_REDIRECT = os.getenv("ATTACHMENT_ACCEL_REDIRECT") or None   # e.g. /_attachments/
+ATTACHMENT_MAX_BYTES = int(os.getenv("ATTACHMENT_MAX_BYTES", str(10 * 1024 ** 3)))
+ATTACHMENT_FSYNC = os.getenv("ATTACHMENT_FSYNC", "1") == "1"
+ATTACHMENT_S3_BUCKET = os.getenv("ATTACHMENT_S3_BUCKET")
+ATTACHMENT_S3_PREFIX = os.getenv("ATTACHMENT_S3_PREFIX", "attachments/")
+ATTACHMENT_S3_ENDPOINT = os.getenv("ATTACHMENT_S3_ENDPOINT") or None          # MinIO, R2, ...
+ATTACHMENT_S3_REDIRECT = os.getenv("ATTACHMENT_S3_REDIRECT", "0") == "1"
+
+WRITE_BUFFER = 1024 * 1024
+READ_CHUNK = 1024 * 1024
+S3_PART_SIZE = 8 * 1024 * 1024   # S3 minimum is 5 MiB (except the last part)
+PRESIGN_SECONDS = 300
+
+_RANGE_RE = re.compile(r"bytes=(\d*)-(\d*)$")
+
+
+class TooLarge(Exception):
+    """Upload exceeded the size limit; nothing was stored."""
+
+
+class RangeNotSatisfiable(Exception):
+    pass
+
+
+class ObjectMissing(Exception):
+    """The row exists but the stored bytes don't (or are shorter than recorded)."""
+
+
+@dataclass
+class Stored:
+    size: int
+    sha256: str
+
+
+def object_key(attachment_id: uuid.UUID) -> str:
+    h = attachment_id.hex
+    return f"{h[:2]}/{h}"
+
+
+def parse_range(header: Optional[str], size: int) -> Optional[tuple[int, int]]:
+    """(start, end exclusive) for a single satisfiable byte range, None for the whole object."""
+    if not header:
+        return None
+    m = _RANGE_RE.match(header.strip())
+    if not m:
+        return None  # multiple ranges or another unit: serve everything
+    first, last = m.groups()
+    if not first and not last:
+        return None
+    if size == 0:
+        raise RangeNotSatisfiable()  # no byte of an empty object can be addressed
+    if not first:  # suffix: the last N bytes
+        n = int(last)
+        if n == 0:
+            raise RangeNotSatisfiable()
+        return max(size - n, 0), size
+    start = int(first)
+    end = min(int(last) + 1, size) if last else size
+    if start >= size or start >= end:
+        raise RangeNotSatisfiable()
+    return start, end
+
+
+def _disposition(filename: Optional[str]) -> dict:
+    if not filename:
+        return {}
+    quoted = quote(filename)
+    if quoted == filename:
+        return {"content-disposition": f'attachment; filename="{filename}"'}
+    return {"content-disposition": f"attachment; filename*=utf-8''{quoted}"}
+
+
+class _RangeStream(Response, ABC):
+    """Status/headers for a (ranged) object; subclasses send the body. The object is
+    opened before this is built, so a missing one is a 404, not a truncated 200."""
+
+    def __init__(self, size: int, span: Optional[tuple[int, int]], media_type: Optional[str], headers: dict):
+        self.start, self.end = span or (0, size)
+        super().__init__(status_code=206 if span else 200, media_type=media_type, headers={
+            **headers, "accept-ranges": "bytes", "content-length": str(self.end - self.start),
+            **({"content-range": f"bytes {self.start}-{self.end - 1}/{size}"} if span else {}),
+        })
+
+    async def __call__(self, scope, receive, send):
+        try:
+            await send({"type": "http.response.start", "status": self.status_code, "headers": self.raw_headers})
+            if scope["method"] == "HEAD" or self.end == self.start:
+                await send({"type": "http.response.body", "body": b""})
+                return
+            await self.send_body(scope, send)
+        finally:
+            await self.close()
+
+    @abstractmethod
+    async def send_body(self, scope, send):
+        ...
+
+    @abstractmethod
+    async def close(self):
+        ...
+
+
+class _FileStream(_RangeStream):
+    def __init__(self, f, *args):
+        super().__init__(*args)
+        self.f = f
+
+    async def send_body(self, scope, send):
+        if "http.response.zerocopy" in scope.get("extensions", {}):
+            await send({"type": "http.response.zerocopy", "file": self.f, "offset": self.start,
+                        "count": self.end - self.start, "more_body": False})
+            return
+        fd, pos = self.f.fileno(), self.start
+        while pos < self.end:
+            chunk = await run_in_threadpool(os.pread, fd, min(READ_CHUNK, self.end - pos), pos)
+            if not chunk:
+                break  # truncated underneath us; the client sees a short body
+            pos += len(chunk)
+            await send({"type": "http.response.body", "body": chunk, "more_body": pos < self.end})
+
+    async def close(self):
+        await run_in_threadpool(self.f.close)
+
+
+class StorageBackend(ABC):
+    """Where attachment bytes live. Keys come from object_key()."""
+
+    name = ""
+
+    @abstractmethod
+    def url(self, key: str) -> str:
+        ...
+
+    @abstractmethod
+    async def save(self, key: str, chunks: AsyncIterator[bytes], content_type: Optional[str],
+                   max_bytes: int = ATTACHMENT_MAX_BYTES) -> Stored:
+        ...
+
+    @abstractmethod
+    async def delete(self, key: str) -> None:
+        ...
+
+    @abstractmethod
+    async def response(self, key: str, size: int, range_header: Optional[str], media_type: Optional[str],
+                       headers: dict, filename: Optional[str] = None) -> Response:
+        """Raises ObjectMissing (before anything is sent) when the bytes are gone."""
+
+
+class LocalStorage(StorageBackend):
+    name = "local"
+
+    def __init__(self, root: str = ATTACHMENT_STORAGE_DIR, accel_redirect: Optional[str] = ATTACHMENT_ACCEL_REDIRECT):
+        self.root = os.path.abspath(root)
+        self.accel_redirect = accel_redirect
+
+    def path(self, key: str) -> str:
+        return os.path.join(self.root, key)
+
+    def url(self, key: str) -> str:
+        return f"file://{self.path(key)}"
+
+    async def save(self, key, chunks, content_type, max_bytes=ATTACHMENT_MAX_BYTES) -> Stored:
+        final = self.path(key)
+        tmp = f"{final}.{uuid.uuid4().hex}.partial"
+        await run_in_threadpool(os.makedirs, os.path.dirname(final), exist_ok=True)
+        f = await run_in_threadpool(open, tmp, "wb")
+        digest, size, buf = hashlib.sha256(), 0, bytearray()
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise TooLarge()
+                digest.update(chunk)
+                buf += chunk
+                if len(buf) >= WRITE_BUFFER:
+                    await run_in_threadpool(f.write, buf)
+                    buf = bytearray()
+            if buf:
+                await run_in_threadpool(f.write, buf)
+            await run_in_threadpool(f.flush)
+            if ATTACHMENT_FSYNC:
+                await run_in_threadpool(os.fsync, f.fileno())
+        except BaseException:
+            await run_in_threadpool(f.close)
+            await run_in_threadpool(_unlink, tmp)
+            raise
+        await run_in_threadpool(f.close)
+        await run_in_threadpool(os.replace, tmp, final)
+        return Stored(size=size, sha256=digest.hexdigest())
+
+    async def delete(self, key):
+        await run_in_threadpool(_unlink, self.path(key))
+
+    async def response(self, key, size, range_header, media_type, headers, filename=None):
+        headers = {**headers, **_disposition(filename)}
+        if self.accel_redirect:
+            return Response(media_type=media_type, headers={**headers, "x-accel-redirect": self.accel_redirect + key})
+        span = parse_range(range_header, size)
+        try:
+            f = await run_in_threadpool(open, self.path(key), "rb")
+        except FileNotFoundError:
+            raise ObjectMissing(key)
+        if os.fstat(f.fileno()).st_size < size:
+            await run_in_threadpool(f.close)
+            raise ObjectMissing(key)
+        return _FileStream(f, size, span, media_type, headers)
+
+
+def _unlink(path: str) -> None:
+    try:
+        os.unlink(path)
+    except FileNotFoundError:
+        pass
+
+
+class _S3Stream(_RangeStream):
+    def __init__(self, body, *args):
+        super().__init__(*args)
+        self.body = body  # botocore StreamingBody of the (ranged) GetObject
+
+    async def send_body(self, scope, send):
+        chunks = self.body.iter_chunks(READ_CHUNK)
+        while True:
+            chunk = await run_in_threadpool(next, chunks, b"")
+            if not chunk:
+                break
+            await send({"type": "http.response.body", "body": chunk, "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+    async def close(self):
+        await run_in_threadpool(self.body.close)
+
+
+class S3Storage(StorageBackend):
+    name = "s3"
+
+    def __init__(self, bucket: Optional[str] = ATTACHMENT_S3_BUCKET, prefix: str = ATTACHMENT_S3_PREFIX,
+                 endpoint_url: Optional[str] = ATTACHMENT_S3_ENDPOINT, redirect: bool = ATTACHMENT_S3_REDIRECT):
+        try:
+            import boto3  # optional: only needed with ATTACHMENT_STORAGE=s3
+        except ImportError as e:
+            raise RuntimeError("ATTACHMENT_STORAGE=s3 needs boto3 (pip install boto3)") from e
+        if not bucket:
+            raise RuntimeError("ATTACHMENT_STORAGE=s3 needs ATTACHMENT_S3_BUCKET")
+        # credentials/region from the usual AWS_* environment or instance profile
+        self.client = boto3.client("s3", endpoint_url=endpoint_url)
+        self.bucket, self.prefix, self.redirect = bucket, prefix, redirect
+
+    def url(self, key: str) -> str:
+        return f"s3://{self.bucket}/{self.prefix}{key}"
+
+    async def save(self, key, chunks, content_type, max_bytes=ATTACHMENT_MAX_BYTES) -> Stored:
+        s3_key = self.prefix + key
+        extra = {"ContentType": content_type} if content_type else {}
+        digest, size, buf = hashlib.sha256(), 0, bytearray()
+        upload_id, parts = None, []
+        try:
+            async for chunk in chunks:
+                size += len(chunk)
+                if size > max_bytes:
+                    raise TooLarge()
+                digest.update(chunk)
+                buf += chunk
+                if len(buf) >= S3_PART_SIZE:
+                    if upload_id is None:
+                        upload_id = (await run_in_threadpool(
+                            self.client.create_multipart_upload, Bucket=self.bucket, Key=s3_key, **extra
+                        ))["UploadId"]
+                    parts.append(await self._upload_part(s3_key, upload_id, len(parts) + 1, bytes(buf)))
+                    buf = bytearray()
+            if upload_id is None:
+                # small object: one PUT
+                await run_in_threadpool(self.client.put_object, Bucket=self.bucket, Key=s3_key, Body=bytes(buf), **extra)
+            else:
+                if buf:
+                    parts.append(await self._upload_part(s3_key, upload_id, len(parts) + 1, bytes(buf)))
+                await run_in_threadpool(
+                    self.client.complete_multipart_upload, Bucket=self.bucket, Key=s3_key, UploadId=upload_id,
+                    MultipartUpload={"Parts": parts},
+                )
+        except BaseException:
+            if upload_id is not None:
+                await asyncio.shield(run_in_threadpool(
+                    self.client.abort_multipart_upload, Bucket=self.bucket, Key=s3_key, UploadId=upload_id
+                ))
+            raise
+        return Stored(size=size, sha256=digest.hexdigest())
+
+    async def _upload_part(self, s3_key: str, upload_id: str, number: int, body: bytes) -> dict:
+        res = await run_in_threadpool(
+            self.client.upload_part, Bucket=self.bucket, Key=s3_key, UploadId=upload_id, PartNumber=number, Body=body
+        )
+        return {"PartNumber": number, "ETag": res["ETag"]}
+
+    async def delete(self, key):
+        await run_in_threadpool(self.client.delete_object, Bucket=self.bucket, Key=self.prefix + key)
+
+    async def response(self, key, size, range_header, media_type, headers, filename=None):
+        headers = {**headers, **_disposition(filename)}
+        if self.redirect:
+            params = {"Bucket": self.bucket, "Key": self.prefix + key}
+            if filename:
+                params["ResponseContentDisposition"] = headers["content-disposition"]
+            url = await run_in_threadpool(
+                self.client.generate_presigned_url, "get_object", Params=params, ExpiresIn=PRESIGN_SECONDS
+            )
+            return RedirectResponse(url, status_code=307)
+        span = parse_range(range_header, size)
+        start, end = span or (0, size)
+        params = {"Bucket": self.bucket, "Key": self.prefix + key}
+        if end > start:
+            params["Range"] = f"bytes={start}-{end - 1}"
+        try:
+            obj = await run_in_threadpool(self.client.get_object, **params)
+        except self.client.exceptions.NoSuchKey:
+            raise ObjectMissing(key)
+        return _S3Stream(obj["Body"], size, span, media_type, headers)
+
+
+_backend: Optional[StorageBackend] = None
+
+
+def backend() -> StorageBackend:
+    """The configured backend, created on first use."""
+    global _backend
+    if _backend is None:
+        if ATTACHMENT_STORAGE == "s3":
+            _backend = S3Storage()
+        elif ATTACHMENT_STORAGE == "local":
+            _backend = LocalStorage()
+        else:
+            raise RuntimeError(f"unknown ATTACHMENT_STORAGE={ATTACHMENT_STORAGE!r} (local|s3)")
+    return _backend
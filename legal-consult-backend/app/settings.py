@@ -0,0 +1,50 @@
+# app/settings.py
+# Database connection settings, read from the environment (DB_*) after app.db has
+# loaded .env. Pool sizes are per engine per process: with N uvicorn workers the
+# server sees up to N * engines * (pool_size + max_overflow) connections, so set
+# DB_MAX_CONNECTIONS to the server's budget and the pools are capped to fit.
+from typing import Literal, Optional
+
+from pydantic import AliasChoices, Field
+from pydantic_settings import BaseSettings, SettingsConfigDict
+
+
+class DatabaseSettings(BaseSettings):
+    model_config = SettingsConfigDict(env_prefix="DB_", extra="ignore")
+
+    mode: Literal["async", "sync"] = "async"
+    pool_size: int = Field(5, ge=1)
+    max_overflow: int = Field(10, ge=0)
+    pool_timeout: float = Field(30, gt=0)          # seconds to wait for a free connection
+    pool_recycle: int = -1                         # seconds; replace connections older than this (-1 = never)
+    pool_use_lifo: bool = False                    # LIFO lets surplus idle connections age out via recycle
+    # always: ping on every checkout (SQLAlchemy pool_pre_ping)
+    # idle:   ping only connections that sat in the pool longer than pre_ping_idle_seconds
+    # never:  no ping; rely on pool_recycle
+    pre_ping: Literal["always", "idle", "never"] = "idle"
+    pre_ping_idle_seconds: float = 30
+    # per-worker sizing: total connections the server allows this deployment
+    max_connections: Optional[int] = Field(None, ge=1)
+    workers: int = Field(1, ge=1, validation_alias=AliasChoices("DB_WORKERS", "WEB_CONCURRENCY"))
+
+    def pool_limits(self, engines: int = 1) -> tuple[int, int]:
+        """(pool_size, max_overflow) for one engine, capped to its share of max_connections."""
+        if self.max_connections is None:
+            return self.pool_size, self.max_overflow
+        share = max(1, self.max_connections // (self.workers * engines))
+        size = min(self.pool_size, share)
+        return size, min(self.max_overflow, share - size)
+
+    def engine_kwargs(self, engines: int = 1) -> dict:
+        size, overflow = self.pool_limits(engines)
+        return {
+            "pool_size": size,
+            "max_overflow": overflow,
+            "pool_timeout": self.pool_timeout,
+            "pool_recycle": self.pool_recycle,
+            "pool_use_lifo": self.pool_use_lifo,
+            "pool_pre_ping": self.pre_ping == "always",
+        }
+
+
+db_settings = DatabaseSettings()
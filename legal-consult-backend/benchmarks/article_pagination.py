@@ -0,0 +1,90 @@
+# benchmarks/article_pagination.py
+# OFFSET vs keyset pagination on GET /articles.
+#
+#   python -m benchmarks.article_pagination --rows 200000 --pages 1,100,1000,10000
+#
+# Uses DATABASE_URL (same as the app). --rows tops the table up with synthetic
+# articles generated server-side; point it at a scratch database.
+import argparse
+import statistics
+import time
+
+from sqlalchemy import select, text, tuple_
+from sqlalchemy.orm import Session
+
+from app.db import engine
+from app.models.article import Article
+
+PAGE_SIZE = 10
+
+
+def ensure_rows(session: Session, rows: int) -> None:
+    have = session.execute(text("SELECT count(*) FROM articles")).scalar()
+    if have >= rows:
+        return
+    session.execute(
+        text("""
+            INSERT INTO articles (id, title, year, court, summary, tags, created_at)
+            SELECT gen_random_uuid(),
+                   'Synthetic judgment ' || g,
+                   1990 + g % 35,
+                   'Bench ' || g % 40,
+                   'Synthetic summary ' || g,
+                   ARRAY['bench-' || g % 40],
+                   now() - (g || ' seconds')::interval
+            FROM generate_series(1, :n) AS g
+        """),
+        {"n": rows - have},
+    )
+    session.commit()
+    session.execute(text("ANALYZE articles"))
+
+
+def timed(session: Session, stmt, repeat: int) -> float:
+    samples = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        session.execute(stmt).scalars().all()
+        samples.append((time.perf_counter() - t0) * 1000)
+    return statistics.median(samples)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--pages", default="1,10,100,1000,10000")
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    base = select(Article).order_by(Article.created_at.desc(), Article.id.desc())
+    with Session(engine) as session:
+        ensure_rows(session, args.rows)
+        print(f"{'page':>8} {'offset ms':>10} {'cursor ms':>10}")
+        for page in (int(p) for p in args.pages.split(",")):
+            offset = (page - 1) * PAGE_SIZE
+            offset_stmt = base.offset(offset).limit(PAGE_SIZE)
+
+            # the cursor a client would hold after reading page-1 pages
+            cursor_stmt = base.limit(PAGE_SIZE + 1)
+            if offset:
+                last = session.execute(
+                    select(Article.created_at, Article.id)
+                    .order_by(Article.created_at.desc(), Article.id.desc())
+                    .offset(offset - 1)
+                    .limit(1)
+                ).first()
+                if last is None:
+                    print(f"{page:>8} (past end of table)")
+                    continue
+                cursor_stmt = cursor_stmt.where(
+                    tuple_(Article.created_at, Article.id) < tuple_(last.created_at, last.id)
+                )
+
+            print(
+                f"{page:>8} {timed(session, offset_stmt, args.repeat):>10.2f} "
+                f"{timed(session, cursor_stmt, args.repeat):>10.2f}"
+            )
+
+
+if __name__ == "__main__":
+    main()
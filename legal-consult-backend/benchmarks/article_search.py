@@ -0,0 +1,73 @@
+# benchmarks/article_search.py
+# In-memory BM25 index vs the full-text SQL path of GET /articles?query=: memory footprint and QPS.
+#
+#   python -m benchmarks.article_search --rows 200000 --seconds 5
+import argparse
+import itertools
+import time
+import tracemalloc
+
+from sqlalchemy import select, func, cast
+from sqlalchemy.dialects.postgresql import REGCONFIG
+from sqlalchemy.orm import Session
+
+from app.db import engine
+from app.models.article import Article, TS_CONFIG
+from app.services.article_index import ArticleIndex
+from benchmarks.article_pagination import ensure_rows
+
+QUERIES = ["judgment", "synthetic summary", "bench", "judgment 4242", "summary 17"]
+TAGS = [None, "bench-3"]
+PAGE_SIZE = 10
+
+
+def sql_page(session: Session, query: str, tag):
+    # as app/routers/articles.py (page mode): search_vector match, ranked
+    tsq = func.websearch_to_tsquery(cast(TS_CONFIG, REGCONFIG), query)
+    stmt = select(Article).where(Article.search_vector.op("@@")(tsq))
+    if tag:
+        stmt = stmt.where(Article.tags.contains([tag]))
+    stmt = stmt.order_by(
+        func.ts_rank(Article.search_vector, tsq).desc(), Article.created_at.desc(), Article.id.desc()
+    ).limit(PAGE_SIZE)
+    return session.execute(stmt).scalars().all()
+
+
+def qps(fn, seconds: float) -> float:
+    cases = itertools.cycle(itertools.product(QUERIES, TAGS))
+    n = 0
+    deadline = time.perf_counter() + seconds
+    while time.perf_counter() < deadline:
+        fn(*next(cases))
+        n += 1
+    return n / seconds
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=200_000)
+    ap.add_argument("--seconds", type=float, default=5.0)
+    args = ap.parse_args()
+
+    with Session(engine) as session:
+        ensure_rows(session, args.rows)
+
+        tracemalloc.start()
+        t0 = time.perf_counter()
+        index = ArticleIndex()
+        index.load(session)
+        build_s = time.perf_counter() - t0
+        current, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        session.expunge_all()
+
+        print(f"index: {index.stats()}")
+        print(f"build: {build_s:.1f}s  resident: {current / 2**20:.1f} MiB  peak: {peak / 2**20:.1f} MiB")
+        mem = qps(lambda q, t: index.search(q, t, 0, PAGE_SIZE), args.seconds)
+        sql = qps(lambda q, t: sql_page(session, q, t), args.seconds)
+        print(f"memory index: {mem:>10.0f} q/s")
+        print(f"sql full-text:{sql:>10.0f} q/s  ({mem / sql:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,227 @@
+# benchmarks/attachments.py
+# Streamed attachments: upload/download throughput and server memory for multi-GB files.
+#
+#   python -m benchmarks.attachments --sizes-gb 0.5,2,4 --ranges 200
+#
+# Starts the app under uvicorn (benchmarks.http_load.serve) with ATTACHMENT_STORAGE=local
+# in a temporary directory, then for each size: POSTs a generated body of that size
+# (a repeated 1 MiB random block, so the client stays small too), GETs it back in full,
+# and fetches --ranges random 1 MiB Range slices. The server's RSS is sampled from
+# /proc throughout; flat peak RSS across sizes is the point (nothing is buffered whole).
+# Uploads are made as a throwaway user (a JWT from app.security.make_jwt) onto a
+# request tagged TAG; attachments are deleted through the API afterwards, the user and
+# request removed and the directory deleted.
+import argparse
+import hashlib
+import json
+import os
+import random
+import shutil
+import socket
+import tempfile
+import threading
+import time
+from urllib.parse import urlsplit
+
+from sqlalchemy import delete, insert
+from sqlalchemy.orm import Session
+
+from app.db import engine
+from app.models.request import Request
+from app.models.user import User
+from app.security import make_jwt
+from benchmarks.http_load import percentile, serve
+
+TAG = "bench-attachments"
+MiB = 1024 * 1024
+BLOCK = os.urandom(MiB)
+
+
+def _server_pid(port: int) -> int:
+    for pid in os.listdir("/proc"):
+        if not pid.isdigit():
+            continue
+        try:
+            with open(f"/proc/{pid}/cmdline", "rb") as f:
+                args = f.read().split(b"\0")
+        except OSError:
+            continue
+        if b"uvicorn" in args and str(port).encode() in args:
+            return int(pid)
+    raise RuntimeError("uvicorn process not found")
+
+
+def _rss_mib(pid: int) -> dict:
+    out = {}
+    with open(f"/proc/{pid}/status") as f:
+        for line in f:
+            if line.startswith(("VmRSS:", "VmHWM:")):
+                out[line[:5]] = int(line.split()[1]) / 1024
+    return out
+
+
+class RssSampler(threading.Thread):
+    def __init__(self, pid: int, interval: float = 0.05):
+        super().__init__(daemon=True)
+        self.pid, self.interval = pid, interval
+        self.peak = 0.0
+        self._stop = threading.Event()
+
+    def run(self):
+        while not self._stop.is_set():
+            self.peak = max(self.peak, _rss_mib(self.pid)["VmRSS"])
+            time.sleep(self.interval)
+
+    def reset(self) -> float:
+        self.peak = _rss_mib(self.pid)["VmRSS"]
+        return self.peak
+
+    def stop(self):
+        self._stop.set()
+
+
+def _read_head(sock: socket.socket) -> tuple[int, dict, bytes]:
+    buf = b""
+    while b"\r\n\r\n" not in buf:
+        chunk = sock.recv(65536)
+        if not chunk:
+            raise RuntimeError("connection closed")
+        buf += chunk
+    head, rest = buf.split(b"\r\n\r\n", 1)
+    lines = head.decode("latin-1").split("\r\n")
+    headers = {k.lower(): v.strip() for k, v in (line.split(":", 1) for line in lines[1:])}
+    return int(lines[0].split()[1]), headers, rest
+
+
+def _request(host: str, port: int, head: str) -> tuple[socket.socket, int, dict, bytes]:
+    sock = socket.create_connection((host, port))
+    sock.sendall(head.encode())
+    return (sock, *_read_head(sock))
+
+
+def upload(host: str, port: int, size: int, request_id, token: str) -> tuple[dict, str, float]:
+    sock = socket.create_connection((host, port))
+    sock.sendall((
+        f"POST /attachments/?entity_type=request&entity_id={request_id}&filename=bench.bin HTTP/1.1\r\n"
+        f"Host: {host}\r\nAuthorization: Bearer {token}\r\n"
+        f"Content-Type: application/octet-stream\r\nContent-Length: {size}\r\n\r\n"
+    ).encode())
+    digest, sent = hashlib.sha256(), 0
+    t0 = time.perf_counter()
+    view = memoryview(BLOCK)
+    while sent < size:
+        part = view[:min(MiB, size - sent)]
+        sock.sendall(part)
+        digest.update(part)
+        sent += len(part)
+    status, headers, rest = _read_head(sock)
+    body = rest
+    while len(body) < int(headers.get("content-length", 0)):
+        body += sock.recv(65536)
+    elapsed = time.perf_counter() - t0
+    sock.close()
+    if status != 201:
+        raise RuntimeError(f"upload failed: {status} {body[:200]!r}")
+    return json.loads(body), digest.hexdigest(), elapsed
+
+
+def download(host: str, port: int, attachment_id: str, token: str, byte_range: str = "") -> tuple[int, int, float]:
+    t0 = time.perf_counter()
+    extra = f"Range: bytes={byte_range}\r\n" if byte_range else ""
+    sock, status, headers, rest = _request(
+        host, port,
+        f"GET /attachments/{attachment_id}/content HTTP/1.1\r\nHost: {host}\r\n"
+        f"Authorization: Bearer {token}\r\n{extra}\r\n",
+    )
+    want, got = int(headers["content-length"]), len(rest)
+    buf = bytearray(4 * MiB)
+    while got < want:
+        n = sock.recv_into(buf)
+        if not n:
+            break
+        got += n
+    sock.close()
+    return status, got, time.perf_counter() - t0
+
+
+def remove(host: str, port: int, attachment_id: str, token: str) -> None:
+    sock, status, *_ = _request(
+        host, port,
+        f"DELETE /attachments/{attachment_id} HTTP/1.1\r\nHost: {host}\r\nAuthorization: Bearer {token}\r\n\r\n",
+    )
+    sock.close()
+    if status != 204:
+        raise RuntimeError(f"delete failed: {status}")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--sizes-gb", default="0.5,2", help="comma-separated file sizes in GiB")
+    ap.add_argument("--ranges", type=int, default=200, help="random 1 MiB Range requests per file")
+    ap.add_argument("--fsync", default="1", help="ATTACHMENT_FSYNC for the server")
+    ap.add_argument("--dir", default=None, help="storage directory (default: a temp dir, removed afterwards)")
+    ap.add_argument("--port", type=int, default=8769)
+    args = ap.parse_args()
+
+    sizes = [int(float(s) * 1024 * MiB) for s in args.sizes_gb.split(",")]
+    root = args.dir or tempfile.mkdtemp(prefix="bench-attachments-")
+    rows = []
+    with Session(engine) as db:
+        user_id = db.execute(insert(User).values(name=TAG, role="user").returning(User.id)).scalar()
+        request_id = db.execute(
+            insert(Request).values(description=TAG, status="pending", user_id=user_id).returning(Request.id)
+        ).scalar()
+        db.commit()
+    token = make_jwt(str(user_id), "")
+    try:
+        with serve(args.port, ATTACHMENT_STORAGE="local", ATTACHMENT_STORAGE_DIR=root,
+                   ATTACHMENT_FSYNC=args.fsync, ATTACHMENT_ACCEL_REDIRECT="") as url:
+            u = urlsplit(url)
+            pid = _server_pid(args.port)
+            sampler = RssSampler(pid)
+            sampler.start()
+            print(f"server pid {pid}, idle RSS {sampler.reset():.0f} MiB")
+            for size in sizes:
+                base = sampler.reset()
+                att, sha, up_s = upload(u.hostname, u.port, size, request_id, token)
+                up_peak = sampler.peak
+                if att["size"] != size or att["sha256"] != sha:
+                    raise RuntimeError(f"stored {att['size']} bytes sha256 {att['sha256']}, sent {size} {sha}")
+
+                sampler.reset()
+                status, got, down_s = download(u.hostname, u.port, att["id"], token)
+                if status != 200 or got != size:
+                    raise RuntimeError(f"download: {status}, {got} of {size} bytes")
+                down_peak = sampler.peak
+
+                latencies = []
+                for _ in range(args.ranges):
+                    start = random.randrange(0, max(size - MiB, 1))
+                    status, got, t = download(u.hostname, u.port, att["id"], token, f"{start}-{start + MiB - 1}")
+                    if status != 206 or got != min(MiB, size - start):
+                        raise RuntimeError(f"range: {status}, {got} bytes")
+                    latencies.append(t * 1000)
+                latencies.sort()
+                remove(u.hostname, u.port, att["id"], token)
+                rows.append((size, up_s, down_s, base, up_peak, down_peak, latencies))
+            sampler.stop()
+            hwm = _rss_mib(pid)["VmHWM"]
+    finally:
+        with Session(engine) as db:
+            db.execute(delete(Request).where(Request.description == TAG))
+            db.execute(delete(User).where(User.name == TAG))
+            db.commit()
+        if not args.dir:
+            shutil.rmtree(root, ignore_errors=True)
+
+    print(f"{'size':>8} {'upload MB/s':>12} {'download MB/s':>14} {'RSS before':>11} "
+          f"{'peak up':>8} {'peak down':>10} {'range p50/p99 ms':>17}")
+    for size, up_s, down_s, base, up_peak, down_peak, lat in rows:
+        print(f"{size / 1024 ** 3:>6.2f}Gi {size / MiB / up_s:>12.0f} {size / MiB / down_s:>14.0f} "
+              f"{base:>9.0f}Mi {up_peak:>6.0f}Mi {down_peak:>8.0f}Mi "
+              f"{percentile(lat, 50):>8.1f}/{percentile(lat, 99):.1f}")
+    print(f"server RSS high-water mark over the run: {hwm:.0f} MiB (sha256 verified for every upload)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+# benchmarks/claim_queue.py
+# Load test for POST /requests/claim semantics: many workers drain a queue of pending
+# requests concurrently; every request must be handed out exactly once.
+#
+#   python -m benchmarks.claim_queue --requests 20000 --workers 200 --batch 5
+#
+# Runs claims.claim() directly on a thread per worker (each with its own connection),
+# which is what the endpoint does per call. Also checks that an expired lease puts a
+# row back on the queue. Inserts rows tagged 'bench-claim' into DATABASE_URL.
+import argparse
+import statistics
+import threading
+import time
+from collections import Counter
+
+from sqlalchemy import create_engine, delete, insert, text
+from sqlalchemy.orm import Session
+
+from app.db import DATABASE_URL
+from app.models.request import Request
+from app.services import claims
+
+TAG = "bench-claim"
+
+
+def seed(engine, n: int) -> None:
+    with Session(engine) as db:
+        db.execute(delete(Request).where(Request.description == TAG))
+        db.execute(insert(Request), [{"description": TAG, "status": "pending"} for _ in range(n)])
+        db.commit()
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=20_000)
+    ap.add_argument("--workers", type=int, default=200)
+    ap.add_argument("--batch", type=int, default=5)
+    args = ap.parse_args()
+
+    engine = create_engine(DATABASE_URL, pool_size=args.workers, max_overflow=0)
+    with Session(engine) as db:
+        other = db.execute(text("SELECT count(*) FROM requests WHERE status = 'pending' AND description <> :t"), {"t": TAG}).scalar()
+    if other:
+        raise SystemExit(f"{other} non-benchmark pending requests in this database; use a scratch DB")
+    seed(engine, args.requests)
+
+    claimed: list = []
+    latencies: list[float] = []
+    lock = threading.Lock()
+    start = threading.Barrier(args.workers)
+
+    def worker(name: str) -> None:
+        mine, lat = [], []
+        with Session(engine) as db:
+            start.wait()
+            while True:
+                t0 = time.perf_counter()
+                rows = claims.claim(db, worker=name, n=args.batch, lease_seconds=3600)
+                lat.append((time.perf_counter() - t0) * 1000)
+                if not rows:
+                    break
+                mine.extend(r.id for r in rows)
+        with lock:
+            claimed.extend(mine)
+            latencies.extend(lat)
+
+    threads = [threading.Thread(target=worker, args=(f"w{i}",)) for i in range(args.workers)]
+    t0 = time.perf_counter()
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    elapsed = time.perf_counter() - t0
+
+    dupes = [rid for rid, c in Counter(claimed).items() if c > 1]
+    latencies.sort()
+    p = lambda q: latencies[int(q * (len(latencies) - 1))]
+    print(f"claimed {len(claimed)}/{args.requests} with {args.workers} workers in {elapsed:.1f}s "
+          f"({len(claimed) / elapsed:.0f} rows/s)")
+    print(f"claim latency: p50 {p(.5):.1f} ms  p95 {p(.95):.1f} ms  p99 {p(.99):.1f} ms  "
+          f"mean {statistics.mean(latencies):.1f} ms")
+    assert not dupes, f"{len(dupes)} requests were claimed more than once"
+    assert len(claimed) == args.requests, "some pending requests were never claimed"
+
+    # lease expiry: an abandoned claim comes back
+    seed(engine, 1)
+    with Session(engine) as db:
+        first = claims.claim(db, worker="abandons", lease_seconds=1)
+        time.sleep(1.5)
+        again = claims.claim(db, worker="rescuer")
+    assert [r.id for r in first] == [r.id for r in again], "expired lease was not returned to the queue"
+    print("no double claims; expired lease returned to the queue")
+
+    with Session(engine) as db:
+        db.execute(delete(Request).where(Request.description == TAG))
+        db.commit()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,223 @@
+# benchmarks/datagen.py
+# Synthetic users / lawyers / requests / payments / articles at configurable scale.
+#
+#   python -m benchmarks.datagen --scale 1          # 10k users, 1k lawyers, 100k requests, 30k payments, 50k articles
+#   python -m benchmarks.datagen --scale 20         # 2M requests, 1M articles, ...
+#   python -m benchmarks.datagen --requests 5000000 # override one table
+#   python -m benchmarks.datagen --drop             # delete everything generated here
+#
+# Rows are generated server-side (INSERT ... SELECT FROM generate_series) in
+# --batch sized transactions, so millions of rows never pass through Python.
+# Runs are top-ups: counts are targets, existing generated rows are kept. random()
+# is seeded per batch (--seed), so the same targets produce the same data apart
+# from UUIDs and created_at. Generated rows are marked so --drop finds them:
+#   users.phone 'dg-u-<n>' / 'dg-l-<n>' (lawyer accounts), requests.description 'datagen: ...',
+#   payments.provider_ref 'datagen-...', articles.title 'Datagen judgment <n>'.
+# Uses DATABASE_URL; point it at a scratch database.
+import argparse
+import json
+import sys
+import time
+
+from sqlalchemy import text
+from sqlalchemy.engine import Connection
+
+from app.db import engine
+from benchmarks.lawyer_matching import SPECIALTIES, WINDOWS
+
+BASE = {"users": 10_000, "lawyers": 1_000, "requests": 100_000, "payments": 30_000, "articles": 50_000}
+BATCH = 100_000
+
+COURTS = [
+    "Supreme Court of India", "High Court of Delhi", "Bombay High Court", "Madras High Court",
+    "Calcutta High Court", "Karnataka High Court", "NCLT Mumbai", "District Court Pune",
+]
+# article text vocabulary: real words so full-text search and ILIKE have something to match
+WORDS = [
+    "bail", "appeal", "contract", "tenant", "landlord", "custody", "divorce", "maintenance",
+    "cheque", "dishonour", "arbitration", "award", "injunction", "trademark", "copyright",
+    "negligence", "compensation", "insurance", "claim", "tax", "assessment", "labour",
+    "dismissal", "gratuity", "consumer", "deficiency", "service", "cyber", "fraud", "evidence",
+    "witness", "property", "partition", "succession", "will", "mortgage", "loan", "recovery",
+]
+STATUSES = ["pending", "assigned", "calling", "completed"]
+AVAILABILITY = [
+    {"weekly": {"mon": ["09:00-13:00"], "wed": ["14:00-18:00"], "fri": ["09:00-13:00"]}},
+    {"weekly": {"tue": ["17:00-21:00"], "thu": ["17:00-21:00"], "sat": ["10:00-14:00"]}},
+    {"weekly": {d: ["10:00-18:00"] for d in ("mon", "tue", "wed", "thu", "fri")}},
+    {"weekly": {"sat": ["09:00-13:00"], "sun": ["09:00-13:00"]}},
+]
+
+# must match app.models.article.content_hash() so later ingests dedupe against these rows
+CONTENT_HASH_SQL = """
+    encode(sha256(convert_to(
+        coalesce(title, '') || chr(31) || coalesce(year::text, '') || chr(31) ||
+        coalesce(court, '') || chr(31) || coalesce(summary, '') || chr(31) || coalesce(full_text, ''),
+        'UTF8')), 'hex')
+"""
+
+
+def _pick(values: list) -> str:
+    """SQL expression: a random element of a literal text array."""
+    items = ",".join("'" + str(v).replace("'", "''") + "'" for v in values)
+    return f"(ARRAY[{items}])[1 + floor(random() * {len(values)})::int]"
+
+
+def _words(n: int) -> str:
+    """SQL expression: n random WORDS joined by spaces."""
+    return " || ' ' || ".join(_pick(WORDS) for _ in range(n))
+
+
+COUNT_SQL = {
+    "users": "SELECT count(*) FROM users WHERE phone LIKE 'dg-u-%'",
+    "lawyers": "SELECT count(*) FROM users WHERE phone LIKE 'dg-l-%'",
+    "requests": "SELECT count(*) FROM requests WHERE description LIKE 'datagen: %'",
+    "payments": "SELECT count(*) FROM payments WHERE provider_ref LIKE 'datagen-%'",
+    "articles": "SELECT count(*) FROM articles WHERE title LIKE 'Datagen judgment %'",
+}
+
+# each statement inserts rows :lo..:hi of its table; :users / :lawyers are the pool sizes to pick from
+INSERT_SQL = {
+    "users": """
+        INSERT INTO users (id, name, phone, email, role, created_at)
+        SELECT gen_random_uuid(), 'Datagen user ' || g, 'dg-u-' || g, 'user' || g || '@datagen.invalid', 'user',
+               timezone('utc', now()) - random() * interval '730 days'
+        FROM generate_series(:lo, :hi) AS g
+    """,
+    "lawyers": f"""
+        WITH u AS (
+            INSERT INTO users (id, name, phone, email, role, created_at)
+            SELECT gen_random_uuid(), 'Datagen lawyer ' || g, 'dg-l-' || g, 'lawyer' || g || '@datagen.invalid',
+                   'lawyer', timezone('utc', now()) - random() * interval '730 days'
+            FROM generate_series(:lo, :hi) AS g
+            RETURNING id
+        )
+        INSERT INTO lawyers (id, user_id, specialties, rating, availability_json)
+        SELECT gen_random_uuid(), u.id,
+               array_remove(ARRAY[{_pick(SPECIALTIES)},
+                                  CASE WHEN random() < 0.6 THEN {_pick(SPECIALTIES)} END,
+                                  CASE WHEN random() < 0.3 THEN {_pick(SPECIALTIES)} END]::varchar[], NULL),
+               round((2.5 + random() * 2.5)::numeric, 1),
+               (ARRAY[{",".join("'" + json.dumps(a) + "'" for a in AVAILABILITY)}]::jsonb[])[1 + floor(random() * {len(AVAILABILITY)})::int]
+        FROM u
+    """,
+    # payments are attached to a random sample of each new batch (:payment_ratio)
+    "requests": f"""
+        WITH picks AS (
+            SELECT g, 1 + floor(random() * :users)::int AS ui, 1 + floor(random() * :lawyers)::int AS li,
+                   {_pick(STATUSES)} AS status
+            FROM generate_series(:lo, :hi) AS g
+        ), r AS (
+            INSERT INTO requests (id, user_id, description, status, assigned_lawyer, preferred_window, created_at)
+            SELECT gen_random_uuid(), u.id,
+                   'datagen: need advice on ' || {_pick([s.replace("-", " ") for s in SPECIALTIES])} || ', ' || {_words(6)},
+                   p.status,
+                   CASE WHEN p.status <> 'pending' THEN l.id END,
+                   {_pick([w for w in WINDOWS if w])},
+                   timezone('utc', now()) - random() * interval '365 days'
+            FROM picks p
+            LEFT JOIN users u ON u.phone = 'dg-u-' || p.ui
+            LEFT JOIN users lu ON lu.phone = 'dg-l-' || p.li
+            LEFT JOIN lawyers l ON l.user_id = lu.id
+            RETURNING id, status, created_at
+        )
+        INSERT INTO payments (id, request_id, request_created_at, provider_ref, amount, status, created_at)
+        SELECT gen_random_uuid(), r.id, r.created_at, 'datagen-' || r.id, (ARRAY[300, 500, 1000, 1500])[1 + floor(random() * 4)::int],
+               CASE WHEN r.status = 'completed' THEN 'paid' WHEN random() < 0.2 THEN 'failed' ELSE 'pending' END,
+               r.created_at + random() * interval '2 days'
+        FROM r
+        WHERE random() < :payment_ratio
+    """,
+    "articles": f"""
+        INSERT INTO articles (id, title, year, court, summary, full_text, tags, content_hash, created_at)
+        SELECT id, title, year, court, summary, full_text, tags, {CONTENT_HASH_SQL}, created_at
+        FROM (
+            SELECT gen_random_uuid() AS id, 'Datagen judgment ' || g AS title,
+                   1980 + floor(random() * 46)::int AS year,
+                   {_pick(COURTS)} AS court,
+                   'On ' || {_words(4)} || '; the court considered ' || {_words(8)} AS summary,
+                   repeat({_words(12)} || '. ', 4 + floor(random() * 12)::int) AS full_text,
+                   ARRAY[{_pick(SPECIALTIES)}, {_pick(SPECIALTIES)}]::varchar[] AS tags,
+                   timezone('utc', now()) - random() * interval '3650 days' AS created_at
+            FROM generate_series(:lo, :hi) AS g
+        ) a
+        ON CONFLICT (content_hash) DO NOTHING
+    """,
+}
+
+DROP_SQL = [
+    "DELETE FROM payments WHERE provider_ref LIKE 'datagen-%'",
+    "DELETE FROM requests WHERE description LIKE 'datagen: %'",
+    "DELETE FROM lawyers WHERE user_id IN (SELECT id FROM users WHERE phone LIKE 'dg-l-%')",
+    "DELETE FROM users WHERE phone LIKE 'dg-%'",
+    "DELETE FROM articles WHERE title LIKE 'Datagen judgment %'",
+]
+
+
+def count(conn: Connection, table: str) -> int:
+    return conn.execute(text(COUNT_SQL[table])).scalar()
+
+
+def generate(targets: dict[str, int], seed: float = 0.42, batch: int = BATCH) -> dict[str, int]:
+    """Top every table up to its target; returns rows inserted per table."""
+    inserted = {}
+    with engine.connect() as conn:
+        pools = {"users": max(count(conn, "users"), targets["users"]), "lawyers": max(count(conn, "lawyers"), targets["lawyers"])}
+        payments_before = count(conn, "payments")
+        missing_payments = max(targets["payments"] - payments_before, 0)
+        missing_requests = max(targets["requests"] - count(conn, "requests"), 0)
+        payment_ratio = min(missing_payments / missing_requests, 1.0) if missing_requests else 0.0
+        if missing_payments and not missing_requests:
+            print("payments are created alongside new requests; raise --requests to add more", file=sys.stderr)
+
+        # requests pick users/lawyers by number, so those go first
+        for table in ("users", "lawyers", "requests", "articles"):
+            have = count(conn, table)
+            target = targets[table]
+            inserted[table] = 0
+            t0 = time.perf_counter()
+            for lo in range(have + 1, target + 1, batch):
+                hi = min(lo + batch - 1, target)
+                # per-batch seed: reruns reproduce the same rows for the same numbers
+                conn.execute(text("SELECT setseed(:s)"), {"s": (seed + lo / 1e9) % 1})
+                conn.execute(text(INSERT_SQL[table]), {"lo": lo, "hi": hi, **pools, "payment_ratio": payment_ratio})
+                conn.commit()
+                inserted[table] += hi - lo + 1
+                rate = inserted[table] / max(time.perf_counter() - t0, 1e-9)
+                print(f"{table}: {hi}/{target} ({rate:,.0f} rows/s)", file=sys.stderr)
+        inserted["payments"] = count(conn, "payments") - payments_before
+        conn.commit()
+        for table in ("users", "lawyers", "requests", "payments", "articles"):
+            conn.execute(text(f"ANALYZE {table}"))
+        conn.commit()
+    return inserted
+
+
+def drop() -> None:
+    with engine.begin() as conn:
+        for sql in DROP_SQL:
+            n = conn.execute(text(sql)).rowcount
+            print(f"{sql.split(' WHERE')[0].removeprefix('DELETE FROM ')}: {n} rows deleted", file=sys.stderr)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Generate synthetic data for benchmarks")
+    ap.add_argument("--scale", type=float, default=1.0, help="multiplier on the base row counts")
+    for table, n in BASE.items():
+        ap.add_argument(f"--{table}", type=int, help=f"target row count (default {n} * scale)")
+    ap.add_argument("--seed", type=float, default=0.42, help="random() seed in [0, 1)")
+    ap.add_argument("--batch", type=int, default=BATCH, help="rows per INSERT / transaction")
+    ap.add_argument("--drop", action="store_true", help="delete generated rows and exit")
+    args = ap.parse_args()
+
+    if args.drop:
+        drop()
+        return
+    targets = {t: getattr(args, t) if getattr(args, t) is not None else int(n * args.scale) for t, n in BASE.items()}
+    t0 = time.perf_counter()
+    inserted = generate(targets, args.seed, args.batch)
+    print(f"done in {time.perf_counter() - t0:.1f}s, inserted: " + ", ".join(f"{t}={n}" for t, n in inserted.items()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/dispatch.py
+# Batch dispatch (NumPy cost matrix + Hungarian rounds) on synthetic data, optionally
+# against assigning the same requests one by one with the top-1 matcher.
+#
+#   python -m benchmarks.dispatch --requests 10000 --lawyers 2000 [--greedy]
+import argparse
+import copy
+import random
+import time
+
+import numpy as np
+
+from app.services.dispatch import score_matrix, solve
+from app.services.matching import LawyerMatcher, LOAD_CAP
+from app.services.availability import parse_window
+from benchmarks.lawyer_matching import SPECIALTIES, WINDOWS, fake_lawyers
+
+
+def fake_requests(n: int, rng: random.Random) -> tuple[list[str], list]:
+    descriptions, windows = [], []
+    for _ in range(n):
+        topics = rng.sample(SPECIALTIES, rng.randint(0, 2))
+        descriptions.append("Need advice on " + " and ".join(t.replace("-", " ") for t in topics))
+        windows.append(rng.choice(WINDOWS))
+    return descriptions, windows
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--requests", type=int, default=10_000)
+    ap.add_argument("--lawyers", type=int, default=2_000)
+    ap.add_argument("--greedy", action="store_true", help="also run one-by-one top-1 assignment")
+    args = ap.parse_args()
+
+    rng = random.Random(11)
+    matcher = LawyerMatcher(fake_lawyers(args.lawyers, rng), {})
+    descriptions, windows = fake_requests(args.requests, rng)
+
+    t0 = time.perf_counter()
+    scores, eligible = score_matrix(matcher, descriptions, windows)
+    build = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    pairs, total, rounds = solve(scores, eligible, np.asarray(matcher.loads))
+    solved = time.perf_counter() - t0
+    print(
+        f"batch:  {len(pairs)}/{args.requests} assigned, score {total:.1f}, {rounds} rounds; "
+        f"matrix {build:.2f}s + solve {solved:.2f}s = {build + solved:.2f}s"
+    )
+
+    if args.greedy:
+        greedy = copy.deepcopy(matcher)
+        t0 = time.perf_counter()
+        assigned, score = 0, 0.0
+        for text, window in zip(descriptions, windows):
+            wanted = greedy.infer_specialties(text)
+            # best candidate that still has capacity (and shares a specialty, like the batch)
+            pick = next(
+                (c for c in greedy.top_k(25, wanted, parse_window(window))
+                 if c.open_requests < LOAD_CAP and (c.matched_specialties or not wanted)),
+                None,
+            )
+            if pick is None:
+                continue
+            assigned += 1
+            score += pick.score  # scored with the load before this assignment, as in a batch round
+            greedy.bump_load(pick.lawyer_id)
+        print(f"greedy: {assigned}/{args.requests} assigned, score {score:.1f}; {time.perf_counter() - t0:.2f}s")
+
+
+if __name__ == "__main__":
+    main()
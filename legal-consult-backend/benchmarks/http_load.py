@@ -0,0 +1,165 @@
+# benchmarks/http_load.py
+# Closed-loop HTTP load generator + DB_MODE=sync vs DB_MODE=async comparison.
+#
+#   python -m benchmarks.http_load --clients 50,200,1000 --duration 15
+#
+# Starts `uvicorn app.main:app` once per DB_MODE on a local port and drives it with
+# N concurrent keep-alive clients (plain asyncio streams, no client library), each
+# firing its next request as soon as the previous response arrives. Paths are the
+# read-heavy routes the app hits most: /articles pages and GET /requests/{id}.
+# Seeds articles/requests into DATABASE_URL if the tables are small; use a scratch DB.
+import argparse
+import asyncio
+import itertools
+import os
+import resource
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from urllib.parse import urlsplit
+
+from sqlalchemy import insert, select, text
+from sqlalchemy.orm import Session
+
+from app.db import engine
+from app.models.request import Request
+from benchmarks.article_pagination import ensure_rows
+
+TAG = "bench-http"
+
+
+def percentile(sorted_values: list[float], p: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(p / 100 * len(sorted_values)))]
+
+
+async def _read_response(reader: asyncio.StreamReader) -> int:
+    head = await reader.readuntil(b"\r\n\r\n")
+    status = int(head[9:12])
+    length = 0
+    for line in head.split(b"\r\n")[1:]:
+        name, _, value = line.partition(b":")
+        if name.lower() == b"content-length":
+            length = int(value)
+    if length:
+        await reader.readexactly(length)
+    return status
+
+
+async def _client(host: str, port: int, paths, deadline: float, latencies: list, errors: list) -> None:
+    reader = writer = None
+    while time.perf_counter() < deadline:
+        try:
+            if writer is None:
+                reader, writer = await asyncio.open_connection(host, port)
+            path = next(paths)
+            t0 = time.perf_counter()
+            writer.write(f"GET {path} HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+            status = await _read_response(reader)
+            latencies.append((time.perf_counter() - t0) * 1000)
+            if status >= 400:
+                errors.append(status)
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            errors.append(type(e).__name__)
+            if writer is not None:
+                writer.close()
+            reader = writer = None
+            await asyncio.sleep(0.05)
+    if writer is not None:
+        writer.close()
+
+
+async def _run(base_url: str, paths: list[str], clients: int, duration: float) -> dict:
+    u = urlsplit(base_url)
+    cycle = itertools.cycle(paths)
+    latencies: list[float] = []
+    errors: list = []
+    t0 = time.perf_counter()
+    deadline = t0 + duration
+    await asyncio.gather(*(_client(u.hostname, u.port, cycle, deadline, latencies, errors) for _ in range(clients)))
+    elapsed = time.perf_counter() - t0
+    latencies.sort()
+    return {
+        "clients": clients,
+        "requests": len(latencies),
+        "rps": len(latencies) / elapsed,
+        "p50": percentile(latencies, 50),
+        "p95": percentile(latencies, 95),
+        "p99": percentile(latencies, 99),
+        "errors": len(errors),
+    }
+
+
+def load(base_url: str, paths: list[str], clients: int, duration: float) -> dict:
+    """Drive `clients` concurrent keep-alive connections for `duration` seconds."""
+    return asyncio.run(_run(base_url, paths, clients, duration))
+
+
+@contextmanager
+def serve(port: int, **env):
+    """Run the app under uvicorn (one worker) with extra environment variables."""
+    proc = subprocess.Popen(
+        [sys.executable, "-m", "uvicorn", "app.main:app", "--port", str(port),
+         "--log-level", "warning", "--backlog", "4096", "--no-access-log"],
+        env={**os.environ, **env},
+        stdout=subprocess.DEVNULL,  # dev prints (OTP codes); errors still reach stderr
+    )
+    try:
+        for _ in range(100):
+            try:
+                if load(f"http://127.0.0.1:{port}", ["/health"], 1, 0.01)["requests"]:
+                    break
+            except OSError:
+                pass
+            time.sleep(0.1)
+        else:
+            raise RuntimeError("uvicorn did not start")
+        yield f"http://127.0.0.1:{port}"
+    finally:
+        proc.terminate()
+        proc.wait(timeout=10)
+
+
+def seed(articles: int, requests: int) -> list[str]:
+    with Session(engine) as db:
+        ensure_rows(db, articles)
+        have = db.execute(select(Request.id).where(Request.description == TAG).limit(requests)).scalars().all()
+        if len(have) < requests:
+            db.execute(insert(Request), [{"description": TAG, "status": "completed"} for _ in range(requests - len(have))])
+            db.commit()
+            db.execute(text("ANALYZE requests"))
+            have = db.execute(select(Request.id).where(Request.description == TAG).limit(requests)).scalars().all()
+    return [str(i) for i in have]
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--clients", default="50,200,1000")
+    ap.add_argument("--duration", type=float, default=15)
+    ap.add_argument("--modes", default="sync,async")
+    ap.add_argument("--port", type=int, default=8765)
+    args = ap.parse_args()
+
+    # 1000 sockets + the server's in the same container
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, 65536), hard))
+
+    ids = seed(articles=20_000, requests=1_000)
+    paths = []
+    for i, rid in enumerate(ids):
+        paths.append(f"/requests/{rid}")
+        paths.append(f"/articles/?page={i % 50 + 1}&page_size=10")
+
+    print(f"{'mode':>6} {'clients':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'errors':>6}")
+    for mode in args.modes.split(","):
+        with serve(args.port, DB_MODE=mode) as url:
+            load(url, paths, 20, 2)  # warm pools and caches
+            for n in (int(c) for c in args.clients.split(",")):
+                r = load(url, paths, n, args.duration)
+                print(f"{mode:>6} {n:>7} {r['rps']:>8.0f} {r['p50']:>8.1f} {r['p95']:>8.1f} {r['p99']:>8.1f} {r['errors']:>6}")
+
+
+if __name__ == "__main__":
+    main()
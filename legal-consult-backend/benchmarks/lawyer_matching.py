@@ -0,0 +1,63 @@
+# benchmarks/lawyer_matching.py
+# Top-k lawyer matching latency on synthetic lawyers (in-process, no database writes).
+#
+#   python -m benchmarks.lawyer_matching --lawyers 50000 --queries 2000
+import argparse
+import random
+import statistics
+import time
+import uuid
+from types import SimpleNamespace
+
+from app.services.availability import parse_window
+from app.services.matching import LawyerMatcher
+
+SPECIALTIES = [
+    "criminal-law", "family", "divorce", "property", "tax", "labour", "corporate",
+    "cyber", "consumer", "immigration", "banking", "insurance", "ip", "arbitration",
+]
+WINDOWS = [None, "weekday evenings", "sat 10am-1pm", "monday morning", "tue 14:00-16:00"]
+
+
+def fake_lawyers(n: int, rng: random.Random) -> list:
+    out = []
+    for _ in range(n):
+        days = rng.sample(["mon", "tue", "wed", "thu", "fri", "sat"], 3)
+        out.append(SimpleNamespace(
+            id=uuid.uuid4(),
+            specialties=rng.sample(SPECIALTIES, rng.randint(1, 3)),
+            rating=round(rng.uniform(2.5, 5.0), 1),
+            availability_json={d: [rng.choice(["09:00-13:00", "14:00-18:00", "17:00-21:00"])] for d in days},
+        ))
+    return out
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--lawyers", type=int, default=50_000)
+    ap.add_argument("--queries", type=int, default=2_000)
+    ap.add_argument("--k", type=int, default=5)
+    args = ap.parse_args()
+
+    rng = random.Random(7)
+    lawyers = fake_lawyers(args.lawyers, rng)
+    loads = {l.id: rng.randint(0, 6) for l in rng.sample(lawyers, len(lawyers) // 3)}
+
+    t0 = time.perf_counter()
+    matcher = LawyerMatcher(lawyers, loads)
+    print(f"index build: {(time.perf_counter() - t0) * 1000:.0f} ms for {args.lawyers} lawyers")
+
+    samples = []
+    for _ in range(args.queries):
+        specs = rng.sample(SPECIALTIES, rng.randint(0, 3))
+        window = parse_window(rng.choice(WINDOWS))
+        t0 = time.perf_counter()
+        matcher.top_k(args.k, specs, window)
+        samples.append((time.perf_counter() - t0) * 1000)
+    samples.sort()
+    p = lambda q: samples[int(q * (len(samples) - 1))]
+    print(f"top-{args.k}: p50 {p(.5):.2f} ms  p95 {p(.95):.2f} ms  p99 {p(.99):.2f} ms  mean {statistics.mean(samples):.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,114 @@
+# benchmarks/report.py
+# Per-endpoint latency/throughput summaries for benchmarks.suite, and comparison with a baseline.
+#
+#   python -m benchmarks.report results.json --baseline benchmarks/baseline.json [--threshold 0.10]
+#
+# Results files are JSON: {"meta": {...}, "results": {scenario: {label: stats}}} with
+# stats = {requests, rps, p50, p95, p99, errors}. A row regresses when a latency
+# percentile rises, or throughput drops, by more than --threshold (relative).
+# Baselines are machine-specific; record one on the box you compare on.
+import argparse
+import json
+import sys
+from typing import Optional
+
+from benchmarks.http_load import percentile
+
+METRICS = ("rps", "p50", "p95", "p99")
+THRESHOLD = 0.10
+
+
+def summarize(latencies: dict[str, list[float]], errors: dict, elapsed: float) -> dict[str, dict]:
+    out = {}
+    for label in sorted(set(latencies) | set(errors)):
+        values = sorted(latencies.get(label, []))
+        out[label] = {
+            "requests": len(values),
+            "rps": round(len(values) / elapsed, 2),
+            "p50": round(percentile(values, 50), 3),
+            "p95": round(percentile(values, 95), 3),
+            "p99": round(percentile(values, 99), 3),
+            "errors": sum(errors.get(label, {}).values()),
+        }
+    return out
+
+
+def _delta(metric: str, now: float, before: float) -> Optional[float]:
+    """Relative change, signed so that positive is always worse."""
+    if not before:
+        return None
+    change = (now - before) / before
+    return -change if metric == "rps" else change
+
+
+def compare(current: dict, baseline: dict, threshold: float = THRESHOLD) -> list[dict]:
+    rows = []
+    for scenario, labels in current["results"].items():
+        for label, stats in labels.items():
+            base = baseline["results"].get(scenario, {}).get(label)
+            row = {"scenario": scenario, "label": label, "stats": stats, "deltas": {}, "verdict": "new"}
+            if base:
+                row["deltas"] = {m: _delta(m, stats[m], base[m]) for m in METRICS}
+                worse = [m for m, d in row["deltas"].items() if d is not None and d > threshold]
+                better = [m for m, d in row["deltas"].items() if d is not None and d < -threshold]
+                row["verdict"] = "REGRESSION" if worse else "improved" if better else "ok"
+            rows.append(row)
+    return rows
+
+
+def _fmt_delta(d: Optional[float]) -> str:
+    return "" if d is None else f"{d * 100:+.0f}%"
+
+
+def render(current: dict, baseline: Optional[dict] = None, threshold: float = THRESHOLD) -> str:
+    lines = []
+    meta = current.get("meta", {})
+    if meta:
+        lines.append("  ".join(f"{k}={v}" for k, v in meta.items()))
+    head = f"{'scenario':<9} {'endpoint':<30} {'req':>7} {'req/s':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8} {'err':>5}"
+    if baseline is not None:
+        head += f"  {'Δp50':>6} {'Δp95':>6} {'Δp99':>6} {'Δrps':>6}  verdict"
+    lines.append(head)
+    rows = compare(current, baseline, threshold) if baseline is not None else [
+        {"scenario": s, "label": l, "stats": st} for s, labels in current["results"].items() for l, st in labels.items()
+    ]
+    for row in rows:
+        st = row["stats"]
+        line = (f"{row['scenario']:<9} {row['label']:<30} {st['requests']:>7} {st['rps']:>8.1f} "
+                f"{st['p50']:>8.1f} {st['p95']:>8.1f} {st['p99']:>8.1f} {st['errors']:>5}")
+        if baseline is not None:
+            d = row["deltas"]
+            line += "  " + " ".join(f"{_fmt_delta(d.get(m)):>6}" for m in ("p50", "p95", "p99", "rps"))
+            line += f"  {row['verdict']}"
+        lines.append(line)
+    if baseline is not None:
+        bmeta = baseline.get("meta", {})
+        lines.append("baseline: " + "  ".join(f"{k}={v}" for k, v in bmeta.items()))
+        lines.append(f"Δ: positive = worse (slower, or fewer req/s); flagged beyond ±{threshold * 100:.0f}%")
+    return "\n".join(lines)
+
+
+def regressions(current: dict, baseline: dict, threshold: float = THRESHOLD) -> int:
+    return sum(1 for row in compare(current, baseline, threshold) if row["verdict"] == "REGRESSION")
+
+
+def load(path: str) -> dict:
+    with open(path) as f:
+        return json.load(f)
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Print a benchmarks.suite results file, optionally against a baseline")
+    ap.add_argument("results")
+    ap.add_argument("--baseline")
+    ap.add_argument("--threshold", type=float, default=THRESHOLD)
+    args = ap.parse_args()
+    current = load(args.results)
+    baseline = load(args.baseline) if args.baseline else None
+    print(render(current, baseline, args.threshold))
+    if baseline is not None and regressions(current, baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,71 @@
+# benchmarks/request_batch.py
+# Rows/second: looping POST /requests vs POST /requests/batch.
+#
+#   python -m benchmarks.request_batch --rows 5000 --batch 1000
+#
+# Starts the app under uvicorn (see benchmarks.http_load.serve), then inserts
+# --rows requests each way over one keep-alive connection. Rows are tagged
+# 'bench-batch' and deleted afterwards; use a scratch database anyway.
+import argparse
+import http.client
+import json
+import time
+
+from sqlalchemy import delete
+from sqlalchemy.orm import Session
+
+from app.db import engine
+from app.models.request import Request
+from benchmarks.http_load import serve
+
+TAG = "bench-batch"
+
+
+def post(conn: http.client.HTTPConnection, path: str, payload) -> tuple[int, dict]:
+    conn.request("POST", path, body=json.dumps(payload), headers={"Content-Type": "application/json"})
+    resp = conn.getresponse()
+    return resp.status, json.loads(resp.read())
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--batch", type=int, default=1000)
+    ap.add_argument("--port", type=int, default=8766)
+    ap.add_argument("--mode", default="async", help="DB_MODE for the server")
+    args = ap.parse_args()
+
+    item = {"description": TAG, "preferred_window": "weekday evenings"}
+    with serve(args.port, DB_MODE=args.mode) as url:
+        conn = http.client.HTTPConnection("127.0.0.1", args.port)
+
+        t0 = time.perf_counter()
+        for _ in range(args.rows):
+            status, _ = post(conn, "/requests/", item)
+            assert status == 201, status
+        single = args.rows / (time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        created = 0
+        for start in range(0, args.rows, args.batch):
+            n = min(args.batch, args.rows - start)
+            status, body = post(conn, "/requests/batch", [item] * n)
+            assert status == 201 and not body["errors"], body["errors"][:3]
+            created += len(body["created"])
+        batch = created / (time.perf_counter() - t0)
+
+        # per-item errors: the bad rows are reported, the rest still go in
+        status, body = post(conn, "/requests/batch", [item, {"description": 5}, item])
+        assert len(body["created"]) == 2 and body["errors"][0]["index"] == 1, body
+        conn.close()
+
+    with Session(engine) as db:
+        db.execute(delete(Request).where(Request.description == TAG))
+        db.commit()
+
+    print(f"single POST /requests:        {single:>9.0f} rows/s")
+    print(f"POST /requests/batch ({args.batch}): {batch:>9.0f} rows/s  ({batch / single:.1f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+# benchmarks/request_events.py
+# Status push fan-out: many GET /requests/{id}/events subscribers on one LISTEN connection.
+#
+#   python -m benchmarks.request_events --subscribers 2000 --requests 200 --rate 200
+#
+# Starts the app under uvicorn (benchmarks.http_load.serve), inserts --requests
+# pending requests tagged 'bench-events', opens --subscribers SSE streams spread over
+# them, then walks every request assigned -> calling -> completed with plain UPDATEs
+# (--rate per second), as any writer would. Reports delivery latency from the UPDATE
+# to the event arriving at each subscriber, missed events, and how many DB
+# connections the server holds meanwhile, next to the poll rate the same clients
+# would need. Rows are deleted afterwards; use a scratch database anyway.
+import argparse
+import asyncio
+import json
+import resource
+import time
+from collections import defaultdict
+from urllib.parse import urlsplit
+
+from sqlalchemy import delete, insert, text, update
+from sqlalchemy.orm import Session
+
+from app.db import engine
+from app.models.request import Request
+from benchmarks.http_load import percentile, serve
+
+TAG = "bench-events"
+STEPS = ("assigned", "calling", "completed")
+
+
+class Subscriber:
+    def __init__(self, request_id: str):
+        self.request_id = request_id
+        self.received: dict[str, float] = {}
+        self.ready = asyncio.Event()
+
+    async def run(self, host: str, port: int) -> None:
+        reader, writer = await asyncio.open_connection(host, port)
+        writer.write(f"GET /requests/{self.request_id}/events HTTP/1.1\r\nHost: {host}\r\n\r\n".encode())
+        head = await reader.readuntil(b"\r\n\r\n")
+        if head[9:12] != b"200":
+            raise RuntimeError(f"subscribe failed: {head[:12]!r}")
+        buf = b""
+        try:
+            while "completed" not in self.received:
+                # chunked transfer encoding: size line, data, CRLF
+                size = int((await reader.readuntil(b"\r\n")).split(b";")[0], 16)
+                if size == 0:
+                    break
+                buf += (await reader.readexactly(size + 2))[:-2]
+                while b"\n\n" in buf:
+                    message, buf = buf.split(b"\n\n", 1)
+                    for line in message.split(b"\n"):
+                        if line.startswith(b"data: "):
+                            self.received[json.loads(line[6:])["status"]] = time.perf_counter()
+                            self.ready.set()
+        finally:
+            writer.close()
+
+
+def _server_connections() -> int:
+    with engine.connect() as conn:
+        return conn.execute(text(
+            "SELECT count(*) FROM pg_stat_activity WHERE datname = current_database() AND pid <> pg_backend_pid()"
+        )).scalar()
+
+
+def _listeners() -> int:
+    with engine.connect() as conn:
+        return conn.execute(text("SELECT count(*) FROM pg_stat_activity WHERE query LIKE 'LISTEN %'")).scalar()
+
+
+async def _run(base_url: str, ids: list[str], subscribers: int, rate: float) -> dict:
+    u = urlsplit(base_url)
+    subs = [Subscriber(ids[i % len(ids)]) for i in range(subscribers)]
+    tasks = []
+    t0 = time.perf_counter()
+    for i in range(0, len(subs), 200):  # don't flood the accept backlog
+        tasks += [asyncio.create_task(s.run(u.hostname, u.port)) for s in subs[i:i + 200]]
+        await asyncio.gather(*(s.ready.wait() for s in subs[i:i + 200]))
+    connect_s = time.perf_counter() - t0
+    idle_connections = await asyncio.to_thread(_server_connections)
+    listeners = await asyncio.to_thread(_listeners)
+
+    sent: dict[tuple[str, str], float] = {}
+
+    def write_all():
+        with Session(engine) as db:
+            for status in STEPS:
+                for rid in ids:
+                    sent[(rid, status)] = time.perf_counter()
+                    db.execute(update(Request).where(Request.id == rid).values(status=status))
+                    db.commit()
+                    time.sleep(1 / rate)
+
+    t0 = time.perf_counter()
+    await asyncio.to_thread(write_all)
+    await asyncio.wait(tasks, timeout=10)
+    push_s = time.perf_counter() - t0
+
+    latencies, missed = [], defaultdict(int)
+    for s in subs:
+        for status in STEPS:
+            at = s.received.get(status)
+            if at is None:
+                missed[status] += 1
+            else:
+                latencies.append((at - sent[(s.request_id, status)]) * 1000)
+    latencies.sort()
+    for t in tasks:
+        t.cancel()
+    return {
+        "connect_s": connect_s, "push_s": push_s, "server_db_connections": idle_connections,
+        "listen_connections": listeners, "events": len(latencies), "missed": dict(missed),
+        "p50": percentile(latencies, 50), "p95": percentile(latencies, 95), "p99": percentile(latencies, 99),
+    }
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--subscribers", type=int, default=2000)
+    ap.add_argument("--requests", type=int, default=200)
+    ap.add_argument("--rate", type=float, default=200, help="status UPDATEs per second")
+    ap.add_argument("--mode", default="async", help="DB_MODE for the server")
+    ap.add_argument("--port", type=int, default=8768)
+    args = ap.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, 65536), hard))
+
+    with Session(engine) as db:
+        ids = [str(i) for i in db.execute(
+            insert(Request).returning(Request.id), [{"description": TAG, "status": "pending"} for _ in range(args.requests)]
+        ).scalars()]
+        db.commit()
+    try:
+        with serve(args.port, DB_MODE=args.mode) as url:
+            r = asyncio.run(_run(url, ids, args.subscribers, args.rate))
+    finally:
+        with Session(engine) as db:
+            db.execute(delete(Request).where(Request.description == TAG))
+            db.commit()
+
+    print(f"{args.subscribers} subscribers on {args.requests} requests, connected in {r['connect_s']:.1f}s")
+    print(f"server DB connections while streaming: {r['server_db_connections']} "
+          f"(LISTEN: {r['listen_connections']})")
+    print(f"events delivered: {r['events']}, missed: {r['missed'] or 0}")
+    print(f"UPDATE -> event latency ms: p50={r['p50']:.1f} p95={r['p95']:.1f} p99={r['p99']:.1f}")
+    print(f"polling GET /requests/{{id}} once a second instead: {args.subscribers} req/s, "
+          f"{args.subscribers * r['push_s']:.0f} requests over these {r['push_s']:.1f}s")
+
+
+if __name__ == "__main__":
+    main()
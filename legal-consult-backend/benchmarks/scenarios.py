@@ -0,0 +1,194 @@
+# benchmarks/scenarios.py
+# Scripted HTTP scenarios for benchmarks.suite, and the closed-loop runner that drives them.
+#
+# A scenario is an async function doing one iteration of a user flow through
+# Conn.call(); the runner starts N virtual users, each repeating its scenario until
+# the deadline. Every call is recorded under its label (one per endpoint), so a
+# report row is "this endpoint, as exercised by this scenario".
+#   articles  offset pages, keyset walks, ?query= and /search full-text search on /articles
+#   create    POST /requests and POST /requests/batch (100 items)
+#   status    create a request, then walk it pending -> assigned -> calling -> completed
+#   auth      request-code -> verify (code read back from otp_codes) -> /auth/me x5
+# Writes are tagged (requests.description TAG, users.phone 'dg-auth-...'); cleanup() removes them.
+import asyncio
+import json
+import random
+import time
+import uuid
+from collections import Counter, defaultdict
+from typing import Awaitable, Callable, Optional
+from urllib.parse import quote, urlsplit
+
+from sqlalchemy import delete, select
+
+from app.db import SessionLocal
+from app.models.otp import OtpCode
+from app.models.request import Request
+from app.models.user import User
+from benchmarks.datagen import WORDS
+from benchmarks.lawyer_matching import SPECIALTIES, WINDOWS
+
+TAG = "bench-suite"
+AUTH_PHONE_PREFIX = "dg-auth-"
+
+
+class CallError(Exception):
+    """Unexpected status in a step whose response the scenario needs."""
+
+
+class Recorder:
+    def __init__(self):
+        self.latencies: dict[str, list[float]] = defaultdict(list)
+        self.errors: dict[str, Counter] = defaultdict(Counter)
+
+
+class Conn:
+    """One keep-alive HTTP/1.1 connection (plain asyncio streams, no client library)."""
+
+    def __init__(self, host: str, port: int, rec: Recorder):
+        self.host, self.port, self.rec = host, port, rec
+        self.reader: Optional[asyncio.StreamReader] = None
+        self.writer: Optional[asyncio.StreamWriter] = None
+
+    async def call(self, label: str, method: str, path: str, body=None, headers: Optional[dict] = None) -> tuple[int, bytes]:
+        if self.writer is None:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+        payload = b"" if body is None else json.dumps(body).encode()
+        head = f"{method} {path} HTTP/1.1\r\nHost: {self.host}\r\nContent-Length: {len(payload)}\r\n"
+        if body is not None:
+            head += "Content-Type: application/json\r\n"
+        for k, v in (headers or {}).items():
+            head += f"{k}: {v}\r\n"
+        t0 = time.perf_counter()
+        self.writer.write(head.encode() + b"\r\n" + payload)
+        status, data = await self._read()
+        self.rec.latencies[label].append((time.perf_counter() - t0) * 1000)
+        if status >= 400:
+            self.rec.errors[label][status] += 1
+        return status, data
+
+    async def _read(self) -> tuple[int, bytes]:
+        head = await self.reader.readuntil(b"\r\n\r\n")
+        status = int(head[9:12])
+        length, chunked = 0, False
+        for line in head.split(b"\r\n")[1:]:
+            name, _, value = line.partition(b":")
+            name = name.strip().lower()
+            if name == b"content-length":
+                length = int(value)
+            elif name == b"transfer-encoding" and b"chunked" in value.lower():
+                chunked = True
+        if not chunked:
+            return status, await self.reader.readexactly(length) if length else b""
+        parts = []
+        while True:
+            size = int((await self.reader.readuntil(b"\r\n")).split(b";")[0], 16)
+            parts.append(await self.reader.readexactly(size + 2))
+            if size == 0:
+                return status, b"".join(p[:-2] for p in parts)
+
+    def close(self) -> None:
+        if self.writer is not None:
+            self.writer.close()
+        self.reader = self.writer = None
+
+
+def _json(status: int, data: bytes, expect: int = 200):
+    if status != expect:
+        raise CallError(status)
+    return json.loads(data)
+
+
+# ---------- scenarios ----------
+async def articles(conn: Conn, rng: random.Random) -> None:
+    await conn.call("GET /articles (offset)", "GET", f"/articles/?page={rng.randint(1, 50)}&page_size=10")
+
+    cursor = ""
+    for _ in range(3):
+        page = _json(*await conn.call("GET /articles (cursor)", "GET", f"/articles/?cursor={cursor}&page_size=20"))
+        cursor = page["next_cursor"]
+        if not cursor:
+            break
+
+    await conn.call("GET /articles (query)", "GET", f"/articles/?query={rng.choice(WORDS)}&page_size=10")
+    q = quote(f"{rng.choice(WORDS)} {rng.choice(WORDS)}")
+    await conn.call("GET /articles/search", "GET", f"/articles/search?q={q}&limit=10")
+
+
+def _request_body(rng: random.Random) -> dict:
+    topic = rng.choice(SPECIALTIES).replace("-", " ")
+    return {"description": f"{TAG}: need advice on {topic}", "preferred_window": rng.choice(WINDOWS)}
+
+
+async def create(conn: Conn, rng: random.Random) -> None:
+    for _ in range(5):
+        await conn.call("POST /requests", "POST", "/requests/", _request_body(rng))
+    await conn.call("POST /requests/batch (100)", "POST", "/requests/batch", [_request_body(rng) for _ in range(100)])
+
+
+async def status(conn: Conn, rng: random.Random) -> None:
+    rec = _json(*await conn.call("POST /requests", "POST", "/requests/", _request_body(rng)), expect=201)
+    for to in ("assigned", "calling", "completed"):
+        await conn.call("PATCH /requests/{id}/status", "PATCH", f"/requests/{rec['id']}/status?status={to}")
+    await conn.call("GET /requests/{id}", "GET", f"/requests/{rec['id']}")
+
+
+def _otp_code(phone: str) -> Optional[str]:
+    with SessionLocal() as db:
+        return db.execute(select(OtpCode.code).where(OtpCode.phone == phone)).scalar_one_or_none()
+
+
+async def auth(conn: Conn, rng: random.Random) -> None:
+    phone = AUTH_PHONE_PREFIX + uuid.UUID(int=rng.getrandbits(128)).hex[:16]
+    _json(*await conn.call("POST /auth/request-code", "POST", "/auth/request-code", {"phone": phone}))
+    # needs OTP_STORE=postgres on the server (benchmarks.suite sets it)
+    code = await asyncio.to_thread(_otp_code, phone)
+    if code is None:
+        raise CallError("no otp_codes row: is the server running with OTP_STORE=postgres?")
+    token = _json(*await conn.call("POST /auth/verify", "POST", "/auth/verify", {"phone": phone, "code": code}))["token"]
+    for _ in range(5):
+        await conn.call("GET /auth/me", "GET", "/auth/me", headers={"Authorization": f"Bearer {token}"})
+
+
+SCENARIOS: dict[str, Callable[[Conn, random.Random], Awaitable[None]]] = {
+    "articles": articles,
+    "create": create,
+    "status": status,
+    "auth": auth,
+}
+
+
+# ---------- runner ----------
+async def _user(base_url: str, scenario, deadline: float, rec: Recorder, seed: int) -> None:
+    u = urlsplit(base_url)
+    rng = random.Random(seed)
+    conn = Conn(u.hostname, u.port, rec)
+    while time.perf_counter() < deadline:
+        try:
+            await scenario(conn, rng)
+        except CallError as e:
+            rec.errors["scenario"][str(e.args[0])] += 1
+        except (OSError, asyncio.IncompleteReadError, asyncio.LimitOverrunError) as e:
+            rec.errors["connection"][type(e).__name__] += 1
+            conn.close()
+            await asyncio.sleep(0.05)
+    conn.close()
+
+
+async def _run(base_url: str, scenario, clients: int, duration: float, seed: int) -> tuple[Recorder, float]:
+    rec = Recorder()
+    t0 = time.perf_counter()
+    await asyncio.gather(*(_user(base_url, scenario, t0 + duration, rec, seed + i) for i in range(clients)))
+    return rec, time.perf_counter() - t0
+
+
+def run(base_url: str, name: str, clients: int, duration: float, seed: int = 1) -> tuple[Recorder, float]:
+    """Drive scenario `name` with `clients` virtual users for `duration` seconds."""
+    return asyncio.run(_run(base_url, SCENARIOS[name], clients, duration, seed))
+
+
+def cleanup() -> None:
+    with SessionLocal() as db:
+        db.execute(delete(Request).where(Request.description.like(f"{TAG}: %")))
+        db.execute(delete(User).where(User.phone.like(f"{AUTH_PHONE_PREFIX}%")))
+        db.commit()
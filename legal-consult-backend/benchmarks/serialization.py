@@ -0,0 +1,73 @@
+# benchmarks/serialization.py
+# CPU per 1,000 rows for list responses: ORM + pydantic response_model vs column tuples + orjson.
+#
+#   python -m benchmarks.serialization --rows 5000 --repeat 5
+#
+# "before" is what GET /articles and GET /requests used to do: load ORM entities,
+# validate them into ArticleOut/RequestOut (from_attributes) and JSON-encode the
+# result the way FastAPI's JSONResponse does. "after" is the app.fastjson path.
+# Both are timed with process_time (this process only; DB time excluded) and the
+# encoded bodies are checked to be identical. Read-only; needs rows in both tables.
+import argparse
+import json
+import statistics
+import time
+
+from pydantic import TypeAdapter
+from sqlalchemy import select
+from sqlalchemy.orm import Session
+
+from app import fastjson, projection
+from app.db import engine
+from app.models.article import Article
+from app.models.request import Request
+from app.schemas import ArticleOut, RequestOut
+
+
+def before(session: Session, model, schema, n: int) -> tuple[float, float, bytes]:
+    adapter = TypeAdapter(list[schema])
+    t0 = time.process_time()
+    rows = session.execute(select(model).order_by(model.created_at.desc(), model.id.desc()).limit(n)).scalars().all()
+    t1 = time.process_time()
+    data = adapter.dump_python(adapter.validate_python(rows, from_attributes=True), mode="json")
+    body = json.dumps(data, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")).encode()
+    t2 = time.process_time()
+    session.expunge_all()  # the next round loads fresh entities, as a new request would
+    return t1 - t0, t2 - t1, body
+
+
+def after(session: Session, model, schema, n: int) -> tuple[float, float, bytes]:
+    names = tuple(schema.model_fields)
+    loaded = projection.columns(model, names, extra=("created_at",))
+    t0 = time.process_time()
+    rows = session.execute(select(*loaded).order_by(model.created_at.desc(), model.id.desc()).limit(n)).all()
+    t1 = time.process_time()
+    body = fastjson.dump_list(names, rows)
+    t2 = time.process_time()
+    return t1 - t0, t2 - t1, body
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser()
+    ap.add_argument("--rows", type=int, default=5000)
+    ap.add_argument("--repeat", type=int, default=5)
+    args = ap.parse_args()
+
+    print(f"{'':<10}{'path':<8}{'fetch ms/1k':>12}{'encode ms/1k':>14}{'total ms/1k':>13}")
+    with Session(engine) as session:
+        for model, schema in ((Article, ArticleOut), (Request, RequestOut)):
+            results = {}
+            for label, fn in (("before", before), ("after", after)):
+                fn(session, model, schema, args.rows)  # warm-up: compile caches, first-use costs
+                samples = [fn(session, model, schema, args.rows) for _ in range(args.repeat)]
+                n = max(len(json.loads(samples[0][2])), 1)
+                fetch = statistics.median(s[0] for s in samples) * 1e6 / n
+                encode = statistics.median(s[1] for s in samples) * 1e6 / n
+                results[label] = (fetch + encode, samples[0][2])
+                print(f"{model.__tablename__:<10}{label:<8}{fetch:>12.2f}{encode:>14.2f}{fetch + encode:>13.2f}")
+            assert results["before"][1] == results["after"][1], f"{model.__tablename__}: bodies differ"
+            print(f"{model.__tablename__:<10}speedup {results['before'][0] / results['after'][0]:.1f}x, identical bodies")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+# benchmarks/suite.py
+# Reproducible end-to-end benchmark: synthetic data + scripted scenarios + p50/p95/p99 report.
+#
+#   python -m benchmarks.datagen --scale 1                      # once (top-up; see datagen.py)
+#   python -m benchmarks.suite --save-baseline                  # on the base commit
+#   python -m benchmarks.suite                                  # on your change: report + diff vs baseline
+#   python -m benchmarks.suite --scenarios articles,auth --clients 50 --duration 30 --mode sync
+#
+# Starts the app under uvicorn (benchmarks.http_load.serve) with OTP_STORE=postgres
+# so the auth scenario can read codes back, warms it up, then runs each scenario
+# on its own for --duration seconds with --clients virtual users. The results go to
+# --out as JSON, and are compared with --baseline when that file exists; the exit
+# status is 1 when any endpoint regresses beyond --threshold. Rows written by the
+# scenarios are deleted afterwards. Uses DATABASE_URL; point it at a scratch database.
+#
+# benchmarks/baseline.json is committed; its meta records the commit, datagen_scale and
+# hardware it was recorded with. A run whose data size, --mode or hardware differ from
+# it gets a warning instead of a meaningful diff: re-record it locally (or in CI) first.
+import argparse
+import json
+import os
+import resource
+import subprocess
+import sys
+from datetime import datetime, timezone
+
+from sqlalchemy import text
+
+from app.db import engine
+from benchmarks import datagen, report, scenarios
+from benchmarks.http_load import serve
+
+BASELINE = os.path.join(os.path.dirname(__file__), "baseline.json")
+
+
+def _git_rev() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def _row_counts() -> dict[str, int]:
+    with engine.connect() as conn:
+        return {t: conn.execute(text(f"SELECT count(*) FROM {t}")).scalar()
+                for t in ("users", "lawyers", "requests", "payments", "articles")}
+
+
+def _datagen_counts() -> dict[str, int]:
+    with engine.connect() as conn:
+        return {t: datagen.count(conn, t) for t in datagen.BASE}
+
+
+def _hardware() -> dict:
+    """CPU model, cores and memory: timings only compare on like hardware."""
+    out = {"cpus": os.cpu_count(), "cpu": None, "memory_gib": None, "python": sys.version.split()[0]}
+    try:
+        with open("/proc/cpuinfo") as f:
+            out["cpu"] = next((line.split(":", 1)[1].strip() for line in f if line.startswith("model name")), None)
+        with open("/proc/meminfo") as f:
+            kib = int(next(line for line in f if line.startswith("MemTotal:")).split()[1])
+            out["memory_gib"] = round(kib / 2**20, 1)
+    except (OSError, StopIteration, ValueError):
+        pass
+    return out
+
+
+# a baseline only compares with runs on the same data size and hardware
+_COMPARABLE = ("datagen_scale", "mode", "cpus", "cpu", "memory_gib")
+
+
+def main() -> None:
+    ap = argparse.ArgumentParser(description="Run benchmark scenarios and compare with a baseline")
+    ap.add_argument("--scenarios", default=",".join(scenarios.SCENARIOS))
+    ap.add_argument("--clients", type=int, default=20, help="virtual users per scenario")
+    ap.add_argument("--duration", type=float, default=15, help="seconds per scenario")
+    ap.add_argument("--warmup", type=float, default=3, help="seconds of each scenario before measuring")
+    ap.add_argument("--mode", default=os.getenv("DB_MODE", "async"), help="DB_MODE for the server")
+    ap.add_argument("--port", type=int, default=8767)
+    ap.add_argument("--seed", type=int, default=1)
+    ap.add_argument("--scale", type=float, help="top up synthetic data first (benchmarks.datagen --scale)")
+    ap.add_argument("--out", default="bench-results.json")
+    ap.add_argument("--baseline", default=BASELINE)
+    ap.add_argument("--save-baseline", action="store_true", help="write the results to --baseline as well")
+    ap.add_argument("--threshold", type=float, default=report.THRESHOLD)
+    args = ap.parse_args()
+
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    resource.setrlimit(resource.RLIMIT_NOFILE, (min(hard, 65536), hard))
+
+    if args.scale is not None:
+        datagen.generate({t: int(n * args.scale) for t, n in datagen.BASE.items()})
+    current = {
+        "meta": {
+            "date": datetime.now(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ"),
+            "commit": _git_rev(),
+            "mode": args.mode,
+            "clients": args.clients,
+            "duration": args.duration,
+            # datagen rows as a multiple of datagen.BASE (what --scale would have produced)
+            "datagen_scale": round(_datagen_counts()["requests"] / datagen.BASE["requests"], 2),
+            **_hardware(),
+            **_row_counts(),
+        },
+        "results": {},
+    }
+
+    names = [s.strip() for s in args.scenarios.split(",") if s.strip()]
+    try:
+        with serve(args.port, DB_MODE=args.mode, OTP_STORE="postgres") as url:
+            for name in names:
+                print(f"{name}: {args.clients} clients x {args.duration:.0f}s", file=sys.stderr)
+                if args.warmup:
+                    scenarios.run(url, name, args.clients, args.warmup, seed=args.seed + 10_000)
+                rec, elapsed = scenarios.run(url, name, args.clients, args.duration, seed=args.seed)
+                current["results"][name] = report.summarize(rec.latencies, rec.errors, elapsed)
+    finally:
+        scenarios.cleanup()
+
+    with open(args.out, "w") as f:
+        json.dump(current, f, indent=2)
+    baseline = report.load(args.baseline) if os.path.exists(args.baseline) and not args.save_baseline else None
+    if baseline is not None:
+        differs = [k for k in _COMPARABLE if baseline["meta"].get(k) != current["meta"][k]]
+        if differs:
+            print("warning: baseline recorded with different " + ", ".join(
+                f"{k} ({baseline['meta'].get(k)} vs {current['meta'][k]})" for k in differs
+            ) + "; re-record it with --save-baseline on the base commit", file=sys.stderr)
+    print(report.render(current, baseline, args.threshold))
+    print(f"results: {args.out}", file=sys.stderr)
+    if args.save_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(current, f, indent=2)
+        print(f"baseline saved: {args.baseline}", file=sys.stderr)
+    elif baseline is not None and report.regressions(current, baseline, args.threshold):
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
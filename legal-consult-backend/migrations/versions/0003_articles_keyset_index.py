@@ -0,0 +1,25 @@
+"""composite (created_at, id) index for keyset pagination on articles
+Revision ID: 0003_articles_keyset_index
+Revises: d884c77a9ccd
+Create Date: 2026-10-18 09:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0003_articles_keyset_index"
+down_revision = "d884c77a9ccd"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_created_at_id "
+            "ON articles (created_at, id)"
+        )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_articles_created_at_id")
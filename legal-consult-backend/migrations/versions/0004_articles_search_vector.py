@@ -0,0 +1,37 @@
+"""weighted tsvector column + GIN index on articles
+Revision ID: 0004_articles_search_vector
+Revises: 0003_articles_keyset_index
+Create Date: 2026-10-18 10:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0004_articles_search_vector"
+down_revision = "0003_articles_keyset_index"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # generated column: Postgres keeps it in sync on every INSERT/UPDATE, no trigger needed.
+    # NOTE: adding a STORED generated column rewrites the table once.
+    op.execute("""
+        ALTER TABLE articles
+        ADD COLUMN IF NOT EXISTS search_vector tsvector
+        GENERATED ALWAYS AS (
+            setweight(to_tsvector('english', coalesce(title, '')), 'A') ||
+            setweight(to_tsvector('english', coalesce(summary, '')), 'B') ||
+            setweight(to_tsvector('english', coalesce(court, '')), 'C') ||
+            setweight(to_tsvector('english', coalesce(full_text, '')), 'D')
+        ) STORED
+    """)
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_articles_search_vector "
+            "ON articles USING gin (search_vector)"
+        )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_articles_search_vector")
+    op.execute("ALTER TABLE articles DROP COLUMN IF EXISTS search_vector")
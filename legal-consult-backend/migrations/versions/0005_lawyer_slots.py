@@ -0,0 +1,32 @@
+"""lawyer_slots: tstzrange availability with GiST index
+Revision ID: 0005_lawyer_slots
+Revises: 0004_articles_search_vector
+Create Date: 2026-10-18 11:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0005_lawyer_slots"
+down_revision = "0004_articles_search_vector"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "lawyer_slots",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("lawyer_id", postgresql.UUID(as_uuid=True), nullable=False),
+        sa.Column("slot", postgresql.TSTZRANGE(), nullable=False),
+        sa.ForeignKeyConstraint(["lawyer_id"], ["lawyers.id"], ondelete="CASCADE"),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_lawyer_slots_lawyer_id", "lawyer_slots", ["lawyer_id"])
+    op.create_index("ix_lawyer_slots_slot", "lawyer_slots", ["slot"], postgresql_using="gist")
+
+def downgrade():
+    op.drop_index("ix_lawyer_slots_slot", table_name="lawyer_slots")
+    op.drop_index("ix_lawyer_slots_lawyer_id", table_name="lawyer_slots")
+    op.drop_table("lawyer_slots")
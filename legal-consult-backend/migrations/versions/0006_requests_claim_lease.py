@@ -0,0 +1,36 @@
+"""requests work-queue lease columns + queue indexes
+Revision ID: 0006_requests_claim_lease
+Revises: 0005_lawyer_slots
+Create Date: 2026-10-18 12:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0006_requests_claim_lease"
+down_revision = "0005_lawyer_slots"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("requests", sa.Column("claimed_by", sa.String(), nullable=True))
+    op.add_column("requests", sa.Column("lease_expires_at", sa.DateTime(), nullable=True))
+    with op.get_context().autocommit_block():
+        # claim order: oldest pending first
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_requests_pending_created_at "
+            "ON requests (created_at) WHERE status = 'pending'"
+        )
+        # lease reaper
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_requests_lease_expires_at "
+            "ON requests (lease_expires_at) WHERE lease_expires_at IS NOT NULL"
+        )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_requests_lease_expires_at")
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_requests_pending_created_at")
+    op.drop_column("requests", "lease_expires_at")
+    op.drop_column("requests", "claimed_by")
@@ -0,0 +1,25 @@
+"""composite (created_at, id) index for keyset pagination on requests
+Revision ID: 0007_requests_keyset_index
+Revises: 0006_requests_claim_lease
+Create Date: 2026-10-18 15:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0007_requests_keyset_index"
+down_revision = "0006_requests_claim_lease"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE INDEX CONCURRENTLY IF NOT EXISTS ix_requests_created_at_id "
+            "ON requests (created_at, id)"
+        )
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ix_requests_created_at_id")
@@ -0,0 +1,29 @@
+"""otp_codes: UNLOGGED table for the shared OTP store
+Revision ID: 0008_otp_codes
+Revises: 0007_requests_keyset_index
+Create Date: 2026-10-18 16:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0008_otp_codes"
+down_revision = "0007_requests_keyset_index"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "otp_codes",
+        sa.Column("phone", sa.String(), nullable=False),
+        sa.Column("code", sa.String(), nullable=False),
+        sa.Column("expires_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("phone"),
+        prefixes=["UNLOGGED"],
+    )
+    op.create_index("ix_otp_codes_expires_at", "otp_codes", ["expires_at"])
+
+def downgrade():
+    op.drop_index("ix_otp_codes_expires_at", table_name="otp_codes")
+    op.drop_table("otp_codes")
@@ -0,0 +1,43 @@
+"""table_versions change counter + trigger on articles
+Revision ID: 0009_table_versions
+Revises: 0008_otp_codes
+Create Date: 2026-10-18 17:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0009_table_versions"
+down_revision = "0008_otp_codes"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "table_versions",
+        sa.Column("table_name", sa.String(), nullable=False),
+        sa.Column("version", sa.BigInteger(), nullable=False, server_default="0"),
+        sa.PrimaryKeyConstraint("table_name"),
+    )
+    op.execute("INSERT INTO table_versions (table_name, version) VALUES ('articles', 1)")
+    # once per statement, not per row: a bulk insert bumps the version once
+    op.execute("""
+        CREATE OR REPLACE FUNCTION bump_table_version() RETURNS trigger AS $$
+        BEGIN
+            INSERT INTO table_versions (table_name, version) VALUES (TG_TABLE_NAME, 1)
+            ON CONFLICT (table_name) DO UPDATE SET version = table_versions.version + 1;
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER articles_bump_version
+        AFTER INSERT OR UPDATE OR DELETE OR TRUNCATE ON articles
+        FOR EACH STATEMENT EXECUTE FUNCTION bump_table_version()
+    """)
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS articles_bump_version ON articles")
+    op.execute("DROP FUNCTION IF EXISTS bump_table_version()")
+    op.drop_table("table_versions")
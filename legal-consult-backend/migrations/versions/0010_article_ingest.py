@@ -0,0 +1,57 @@
+"""articles.content_hash (unique) + ingest_checkpoints for resumable imports
+Revision ID: 0010_article_ingest
+Revises: 0009_table_versions
+Create Date: 2026-10-18 18:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0010_article_ingest"
+down_revision = "0009_table_versions"
+branch_labels = None
+depends_on = None
+
+# must match app.models.article.content_hash()
+CONTENT_HASH_SQL = """
+    encode(sha256(convert_to(
+        coalesce(title, '') || chr(31) || coalesce(year::text, '') || chr(31) ||
+        coalesce(court, '') || chr(31) || coalesce(summary, '') || chr(31) || coalesce(full_text, ''),
+        'UTF8')), 'hex')
+"""
+
+def upgrade():
+    op.add_column("articles", sa.Column("content_hash", sa.String(), nullable=True))
+    op.execute(f"UPDATE articles SET content_hash = {CONTENT_HASH_SQL}")
+    # rows that already duplicate each other: the oldest keeps the hash
+    op.execute("""
+        UPDATE articles a SET content_hash = NULL
+        FROM (
+            SELECT id, row_number() OVER (PARTITION BY content_hash ORDER BY created_at, id) AS n
+            FROM articles
+        ) d
+        WHERE a.id = d.id AND d.n > 1
+    """)
+    with op.get_context().autocommit_block():
+        op.execute(
+            "CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS ux_articles_content_hash "
+            "ON articles (content_hash)"
+        )
+
+    op.create_table(
+        "ingest_checkpoints",
+        sa.Column("source", sa.String(), nullable=False),
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column("position", sa.BigInteger(), nullable=False),
+        sa.Column("records", sa.BigInteger(), nullable=False),
+        sa.Column("inserted", sa.BigInteger(), nullable=False),
+        sa.Column("updated_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("source"),
+    )
+
+def downgrade():
+    op.drop_table("ingest_checkpoints")
+    with op.get_context().autocommit_block():
+        op.execute("DROP INDEX CONCURRENTLY IF EXISTS ux_articles_content_hash")
+    op.drop_column("articles", "content_hash")
@@ -0,0 +1,34 @@
+"""sql_plans: sampled EXPLAIN (ANALYZE, BUFFERS) of slow statements
+Revision ID: 0011_sql_plans
+Revises: 0010_article_ingest
+Create Date: 2026-10-18 19:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0011_sql_plans"
+down_revision = "0010_article_ingest"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.create_table(
+        "sql_plans",
+        sa.Column("id", sa.BigInteger(), autoincrement=True, nullable=False),
+        sa.Column("fingerprint", sa.String(), nullable=False),
+        sa.Column("template", sa.Text(), nullable=False),
+        sa.Column("params", sa.String(), nullable=True),
+        sa.Column("route", sa.String(), nullable=True),
+        sa.Column("duration_ms", sa.Float(), nullable=False),
+        sa.Column("plan", postgresql.JSONB(), nullable=False),
+        sa.Column("captured_at", sa.DateTime(), nullable=False),
+        sa.PrimaryKeyConstraint("id"),
+    )
+    op.create_index("ix_sql_plans_fingerprint_captured_at", "sql_plans", ["fingerprint", "captured_at"])
+
+def downgrade():
+    op.drop_index("ix_sql_plans_fingerprint_captured_at", table_name="sql_plans")
+    op.drop_table("sql_plans")
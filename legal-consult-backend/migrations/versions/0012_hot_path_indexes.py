@@ -0,0 +1,49 @@
+"""indexes for the hot query paths (status list, FK lookups, article tags, attachments)
+Revision ID: 0012_hot_path_indexes
+Revises: 0011_sql_plans
+Create Date: 2026-10-18 21:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0012_hot_path_indexes"
+down_revision = "0011_sql_plans"
+branch_labels = None
+depends_on = None
+
+# articles.created_at is already served by ix_articles_created_at_id (0003)
+INDEXES = {
+    # GET /requests?status=...: equality + ORDER BY created_at DESC, id DESC + keyset seek
+    "ix_requests_status_created_at_id": "requests (status, created_at, id)",
+    "ix_requests_user_id": "requests (user_id)",
+    "ix_requests_assigned_lawyer": "requests (assigned_lawyer)",
+    "ix_payments_request_id": "payments (request_id)",
+    # Article.tags.contains([tag]) -> tags @> ARRAY[...]
+    "ix_articles_tags": "articles USING gin (tags)",
+    "ix_attachments_entity": "attachments (entity_type, entity_id)",
+    # declared on the model (index=True) since d884c77a9ccd, which never created it
+    "ix_lawyers_user_id": "lawyers (user_id)",
+}
+
+def upgrade():
+    # CONCURRENTLY can't run inside the migration transaction
+    with op.get_context().autocommit_block():
+        bind = op.get_bind()
+        for name, target in INDEXES.items():
+            # an interrupted CONCURRENTLY build leaves an INVALID index behind, which
+            # IF NOT EXISTS would keep (and the planner never uses): rebuild it
+            invalid = bind.execute(
+                sa.text("SELECT 1 FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+                        "WHERE c.relname = :name AND NOT i.indisvalid"),
+                {"name": name},
+            ).scalar()
+            if invalid:
+                op.execute(f"DROP INDEX CONCURRENTLY {name}")
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON {target}")
+
+def downgrade():
+    with op.get_context().autocommit_block():
+        for name in INDEXES:
+            op.execute(f"DROP INDEX CONCURRENTLY IF EXISTS {name}")
@@ -0,0 +1,135 @@
+"""partition requests by month on created_at (existing rows become requests_legacy)
+Revision ID: 0013_requests_partitioned
+Revises: 0012_hot_path_indexes
+Create Date: 2026-10-18 22:00:00.000000
+
+Online conversion, no data copy:
+  1. outside a transaction: backfill NULL created_at (nullable since 0002), build the
+     (id, created_at) unique index CONCURRENTLY and add + VALIDATE CHECK (created_at
+     IS NOT NULL) and CHECK (created_at < cutover), which only take SHARE UPDATE
+     EXCLUSIVE; cutover = the first day of next month. Safe to re-run.
+  2. one short transaction: created_at becomes NOT NULL (proved by the validated
+     CHECK, so no scan), the old table becomes requests_legacy (PK switched to the
+     prebuilt index), a partitioned requests is created with the same columns,
+     constraints and indexes, and requests_legacy is attached FOR VALUES FROM (MINVALUE)
+     TO (cutover). The validated CHECK and the existing indexes mean ATTACH neither
+     scans nor builds anything. Partitions for the next months are created too;
+     app/services/partitions.py keeps creating them.
+
+The primary key of a partitioned table must contain the partition key, so it
+becomes (id, created_at), and payments.request_id can no longer be a foreign key
+on its own (0017 adds payments.request_created_at and a composite one). Downgrade copies every row back into one table.
+"""
+from datetime import date, datetime
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0013_requests_partitioned"
+down_revision = "0012_hot_path_indexes"
+branch_labels = None
+depends_on = None
+
+MONTHS_AHEAD = 3
+
+# name -> definition, on requests (0006, 0007, 0012)
+INDEXES = {
+    "ix_requests_created_at_id": "(created_at, id)",
+    "ix_requests_pending_created_at": "(created_at) WHERE status = 'pending'",
+    "ix_requests_lease_expires_at": "(lease_expires_at) WHERE lease_expires_at IS NOT NULL",
+    "ix_requests_status_created_at_id": "(status, created_at, id)",
+    "ix_requests_user_id": "(user_id)",
+    "ix_requests_assigned_lawyer": "(assigned_lawyer)",
+}
+STATUS_CHECK = "status IN ('pending','assigned','calling','completed')"
+
+
+def _add_months(d: date, n: int) -> date:
+    y, m = divmod(d.month - 1 + n, 12)
+    return date(d.year + y, m + 1, 1)
+
+
+def _add_check(name: str, condition: str) -> None:
+    """ADD CONSTRAINT ... NOT VALID unless a previous, interrupted run already did."""
+    exists = op.get_bind().execute(
+        sa.text("SELECT 1 FROM pg_constraint WHERE conrelid = 'requests'::regclass AND conname = :name"),
+        {"name": name},
+    ).scalar()
+    if not exists:
+        op.execute(f"ALTER TABLE requests ADD CONSTRAINT {name} CHECK ({condition}) NOT VALID")
+    op.execute(f"ALTER TABLE requests VALIDATE CONSTRAINT {name}")
+
+
+def upgrade():
+    today = datetime.utcnow().date()
+    cutover = _add_months(today, 1)
+
+    with op.get_context().autocommit_block():
+        # the primary key needs created_at NOT NULL; rows without one get "now"
+        op.execute("UPDATE requests SET created_at = timezone('utc', now()) WHERE created_at IS NULL")
+        op.execute("CREATE UNIQUE INDEX CONCURRENTLY IF NOT EXISTS requests_legacy_pkey ON requests (id, created_at)")
+        for name, definition in INDEXES.items():
+            # present since 0012, but ATTACH would build any that are missing while holding the lock
+            op.execute(f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {name} ON requests {definition}")
+        # validated CHECKs let SET NOT NULL and ATTACH skip their full-table scans
+        _add_check("requests_created_at_not_null", "created_at IS NOT NULL")
+        _add_check("requests_legacy_range", f"created_at < '{cutover.isoformat()}'")
+
+    # fail fast rather than queue every request behind a long-running transaction
+    op.execute("SET LOCAL lock_timeout = '10s'")
+    op.execute("ALTER TABLE payments DROP CONSTRAINT IF EXISTS payments_request_id_fkey")
+    op.execute("ALTER TABLE requests ALTER COLUMN created_at SET NOT NULL")
+    op.execute("ALTER TABLE requests DROP CONSTRAINT requests_created_at_not_null")
+    op.execute("ALTER TABLE requests DROP CONSTRAINT requests_pkey")
+    op.execute("ALTER TABLE requests ADD CONSTRAINT requests_legacy_pkey PRIMARY KEY USING INDEX requests_legacy_pkey")
+    op.execute("ALTER TABLE requests RENAME TO requests_legacy")
+    for name in INDEXES:
+        op.execute(f"ALTER INDEX {name} RENAME TO {name.replace('ix_requests_', 'requests_legacy_')}")
+
+    op.execute("CREATE TABLE requests (LIKE requests_legacy INCLUDING DEFAULTS) PARTITION BY RANGE (created_at)")
+    op.execute("ALTER TABLE requests ADD CONSTRAINT requests_pkey PRIMARY KEY (id, created_at)")
+    op.execute(f"ALTER TABLE requests ADD CONSTRAINT requests_status_chk CHECK ({STATUS_CHECK})")
+    op.execute("ALTER TABLE requests ADD CONSTRAINT requests_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute(
+        "ALTER TABLE requests ADD CONSTRAINT requests_assigned_lawyer_fkey "
+        "FOREIGN KEY (assigned_lawyer) REFERENCES lawyers (id)"
+    )
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON requests {definition}")
+    op.execute(
+        f"ALTER TABLE requests ATTACH PARTITION requests_legacy "
+        f"FOR VALUES FROM (MINVALUE) TO ('{cutover.isoformat()}')"
+    )
+    op.execute("ALTER TABLE requests_legacy DROP CONSTRAINT requests_legacy_range")
+
+    month = cutover
+    for _ in range(MONTHS_AHEAD):
+        nxt = _add_months(month, 1)
+        op.execute(
+            f"CREATE TABLE requests_y{month.year}m{month.month:02d} PARTITION OF requests "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{nxt.isoformat()}')"
+        )
+        month = nxt
+
+
+def downgrade():
+    # offline: rows of every attached partition are copied into one plain table
+    op.execute("CREATE TABLE requests_flat (LIKE requests INCLUDING DEFAULTS)")
+    op.execute("INSERT INTO requests_flat SELECT * FROM requests")
+    op.execute("DROP TABLE requests CASCADE")
+    op.execute("ALTER TABLE requests_flat RENAME TO requests")
+    op.execute("ALTER TABLE requests ADD CONSTRAINT requests_pkey PRIMARY KEY (id)")
+    op.execute(f"ALTER TABLE requests ADD CONSTRAINT requests_status_chk CHECK ({STATUS_CHECK})")
+    op.execute("ALTER TABLE requests ADD CONSTRAINT requests_user_id_fkey FOREIGN KEY (user_id) REFERENCES users (id)")
+    op.execute(
+        "ALTER TABLE requests ADD CONSTRAINT requests_assigned_lawyer_fkey "
+        "FOREIGN KEY (assigned_lawyer) REFERENCES lawyers (id)"
+    )
+    for name, definition in INDEXES.items():
+        op.execute(f"CREATE INDEX {name} ON requests {definition}")
+    op.execute(
+        "ALTER TABLE payments ADD CONSTRAINT payments_request_id_fkey "
+        "FOREIGN KEY (request_id) REFERENCES requests (id)"
+    )
@@ -0,0 +1,39 @@
+"""NOTIFY request_events on requests status / assignment changes
+Revision ID: 0014_request_events_notify
+Revises: 0013_requests_partitioned
+Create Date: 2026-10-18 23:00:00.000000
+"""
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision = "0014_request_events_notify"
+down_revision = "0013_requests_partitioned"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # a trigger covers every writer: PATCH /status, bulk status, dispatch, claims,
+    # lease expiry, psql. Delivered on commit; app/services/request_events.py listens.
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_request_event() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('request_events', json_build_object(
+                'id', NEW.id, 'status', NEW.status, 'assigned_lawyer', NEW.assigned_lawyer
+            )::text);
+            RETURN NULL;
+        END
+        $$ LANGUAGE plpgsql
+    """)
+    # row-level on the partitioned table: cloned onto every partition, future ones included
+    op.execute("""
+        CREATE TRIGGER requests_notify_event
+        AFTER UPDATE OF status, assigned_lawyer ON requests
+        FOR EACH ROW
+        WHEN (OLD.status IS DISTINCT FROM NEW.status OR OLD.assigned_lawyer IS DISTINCT FROM NEW.assigned_lawyer)
+        EXECUTE FUNCTION notify_request_event()
+    """)
+
+def downgrade():
+    op.execute("DROP TRIGGER IF EXISTS requests_notify_event ON requests")
+    op.execute("DROP FUNCTION IF EXISTS notify_request_event()")
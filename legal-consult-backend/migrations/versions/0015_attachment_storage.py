@@ -0,0 +1,30 @@
+"""attachments: filename, size, sha256, uploaded_by, created_at for streamed uploads
+Revision ID: 0015_attachment_storage
+Revises: 0014_request_events_notify
+Create Date: 2026-10-18 23:30:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0015_attachment_storage"
+down_revision = "0014_request_events_notify"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # nullable, no defaults: metadata-only on existing rows
+    op.add_column("attachments", sa.Column("filename", sa.String(), nullable=True))
+    op.add_column("attachments", sa.Column("size", sa.BigInteger(), nullable=True))
+    op.add_column("attachments", sa.Column("sha256", sa.String(length=64), nullable=True))
+    op.add_column("attachments", sa.Column("uploaded_by", postgresql.UUID(as_uuid=True), nullable=True))
+    op.add_column("attachments", sa.Column("created_at", sa.DateTime(), nullable=True))
+
+def downgrade():
+    op.drop_column("attachments", "created_at")
+    op.drop_column("attachments", "uploaded_by")
+    op.drop_column("attachments", "sha256")
+    op.drop_column("attachments", "size")
+    op.drop_column("attachments", "filename")
@@ -0,0 +1,22 @@
+"""requests.claimed_lawyer: the lawyer a claim assigned, so an expired lease only undoes its own assignment
+Revision ID: 0016_requests_claimed_lawyer
+Revises: 0015_attachment_storage
+Create Date: 2026-10-19 09:00:00.000000
+"""
+from alembic import op
+import sqlalchemy as sa
+from sqlalchemy.dialects import postgresql
+
+
+# revision identifiers, used by Alembic.
+revision = "0016_requests_claimed_lawyer"
+down_revision = "0015_attachment_storage"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    # nullable, no default: metadata-only, on the parent and every partition
+    op.add_column("requests", sa.Column("claimed_lawyer", postgresql.UUID(as_uuid=True), nullable=True))
+
+def downgrade():
+    op.drop_column("requests", "claimed_lawyer")
@@ -0,0 +1,44 @@
+"""payments.request_created_at + composite FK (request_id, request_created_at) -> requests (id, created_at)
+Revision ID: 0017_payments_request_fk
+Revises: 0016_requests_claimed_lawyer
+Create Date: 2026-10-19 10:00:00.000000
+
+0013 had to drop payments.request_id's FK: the primary key of the partitioned requests
+is (id, created_at). The FK comes back as a composite one. Online: the column is added
+nullable (metadata only), backfilled from requests, and the FK and a CHECK that
+request_id implies request_created_at (MATCH SIMPLE ignores rows with a NULL column)
+are added NOT VALID and then VALIDATEd, which doesn't block writes. A payment whose
+request no longer exists fails the validation: find them with
+  SELECT p.id FROM payments p WHERE p.request_id IS NOT NULL AND p.request_created_at IS NULL;
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = "0017_payments_request_fk"
+down_revision = "0016_requests_claimed_lawyer"
+branch_labels = None
+depends_on = None
+
+def upgrade():
+    op.add_column("payments", sa.Column("request_created_at", sa.DateTime(), nullable=True))
+    op.execute(
+        "UPDATE payments p SET request_created_at = r.created_at FROM requests r "
+        "WHERE r.id = p.request_id AND p.request_created_at IS NULL"
+    )
+    op.execute(
+        "ALTER TABLE payments ADD CONSTRAINT payments_request_fkey FOREIGN KEY (request_id, request_created_at) "
+        "REFERENCES requests (id, created_at) NOT VALID"
+    )
+    op.execute(
+        "ALTER TABLE payments ADD CONSTRAINT payments_request_created_at_chk "
+        "CHECK (request_id IS NULL OR request_created_at IS NOT NULL) NOT VALID"
+    )
+    op.execute("ALTER TABLE payments VALIDATE CONSTRAINT payments_request_fkey")
+    op.execute("ALTER TABLE payments VALIDATE CONSTRAINT payments_request_created_at_chk")
+
+def downgrade():
+    op.execute("ALTER TABLE payments DROP CONSTRAINT IF EXISTS payments_request_created_at_chk")
+    op.execute("ALTER TABLE payments DROP CONSTRAINT IF EXISTS payments_request_fkey")
+    op.drop_column("payments", "request_created_at")
@@ -1,10 +1,9 @@
 import os
-import uuid
-from sqlalchemy import create_engine, select
-from sqlalchemy.orm import Session
+from sqlalchemy import create_engine
 
 from app.db import Base
-from app import models
+from app import models  # noqa: F401  (registers tables for create_all)
+from app.services.article_ingest import load_records
 
 DATABASE_URL = os.getenv("DATABASE_URL")
 if not DATABASE_URL:
@@ -59,23 +58,9 @@ def seed():
         },
     ]
 
-    with Session(engine) as session:
-        existing_titles = {
-            t for (t,) in session.execute(select(models.Article.title)).all()
-        }
-        for e in entries:
-            if e["title"] in existing_titles:
-                continue
-            a = models.Article(
-                title=e["title"],
-                year=e["year"],
-                court=e["court"],
-                summary=e["summary"],
-                full_text=e["full_text"],
-                tags=e["tags"],
-            )
-            session.add(a)
-        session.commit()
+    # same path as bulk imports: dedupe on content_hash, COPY + ON CONFLICT DO NOTHING
+    stats = load_records(entries)
+    print(f"inserted={stats.inserted} duplicates={stats.duplicates}")
     print("Seed complete.")
 
 if __name__ == "__main__":
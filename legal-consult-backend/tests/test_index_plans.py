@@ -0,0 +1,164 @@
+# tests/test_index_plans.py
+# EXPLAIN-based index regression check: every hot query must be planned with its index.
+#
+#   DATABASE_URL=postgresql+psycopg2://... python -m pytest tests/test_index_plans.py
+#   INDEX_CHECK_SCALE=1 python -m pytest tests/test_index_plans.py     # larger data set
+#   INDEX_CHECK_SEED=0 python -m pytest tests/test_index_plans.py -rA  # check the data as it is
+#
+# Seeds a data set big enough that the planner prefers indexes over sequential
+# scans (benchmarks.datagen, plus attachments marked ATTACHMENT_MARK, removed
+# afterwards), ANALYZEs, then EXPLAINs each query in CHECKS, built the way the
+# routers build it, with parameters sampled from the data. A check passes when the
+# plan has an Index / Index Only / Bitmap Index Scan on one of its expected indexes;
+# a failure prints the plan. Skipped without a reachable Postgres DATABASE_URL, which
+# should point at a scratch database (migrated to head).
+import json
+import os
+from typing import Callable
+
+import pytest
+
+if not os.getenv("DATABASE_URL", "").startswith("postgresql"):
+    pytest.skip("DATABASE_URL is not a Postgres database", allow_module_level=True)
+
+from sqlalchemy import func, select, text, tuple_  # noqa: E402
+from sqlalchemy.exc import OperationalError  # noqa: E402
+
+from app.db import engine  # noqa: E402
+from app.models.article import Article  # noqa: E402
+from app.models.attachment import Attachment  # noqa: E402
+from app.models.lawyer import Lawyer  # noqa: E402
+from app.models.payment import Payment  # noqa: E402
+from app.models.request import Request  # noqa: E402
+from benchmarks import datagen  # noqa: E402
+from benchmarks.lawyer_matching import SPECIALTIES  # noqa: E402
+
+SCALE = float(os.getenv("INDEX_CHECK_SCALE", "0.2"))
+SEED = os.getenv("INDEX_CHECK_SEED", "1") == "1"
+ATTACHMENTS = 20_000
+
+ATTACHMENT_MARK = "index-check:"
+INDEX_NODES = ("Index Scan", "Index Only Scan", "Bitmap Index Scan")
+
+SAMPLE_SQL = {
+    "user_id": "SELECT user_id FROM requests WHERE user_id IS NOT NULL LIMIT 1",
+    "lawyer_id": "SELECT assigned_lawyer FROM requests WHERE assigned_lawyer IS NOT NULL LIMIT 1",
+    "lawyer_user_id": "SELECT user_id FROM lawyers WHERE user_id IS NOT NULL LIMIT 1",
+    "request_id": "SELECT request_id FROM payments WHERE request_id IS NOT NULL LIMIT 1",
+    "entity_id": "SELECT entity_id FROM attachments WHERE entity_type = 'request' LIMIT 1",
+    # keyset cursor a few pages in
+    "cursor_created_at": "SELECT created_at FROM requests ORDER BY created_at DESC, id DESC OFFSET 500 LIMIT 1",
+    "cursor_id": "SELECT id FROM requests ORDER BY created_at DESC, id DESC OFFSET 500 LIMIT 1",
+}
+
+
+def _requests_by_status(s):
+    return (select(Request.id, Request.status, Request.created_at).where(Request.status == "assigned")
+            .order_by(Request.created_at.desc(), Request.id.desc()).limit(51))
+
+
+def _requests_by_status_keyset(s):
+    return _requests_by_status(s).where(
+        tuple_(Request.created_at, Request.id) < tuple_(s["cursor_created_at"], s["cursor_id"]),
+        Request.created_at <= s["cursor_created_at"],  # partition pruning, as in the router
+    )
+
+
+# (name, statement builder, indexes that may serve it)
+CHECKS: list[tuple[str, Callable[[dict], object], tuple[str, ...]]] = [
+    ("GET /requests?status=", _requests_by_status, ("ix_requests_status_created_at_id",)),
+    ("GET /requests?status=&cursor=", _requests_by_status_keyset, ("ix_requests_status_created_at_id",)),
+    ("requests of a user", lambda s: select(Request).where(Request.user_id == s["user_id"]), ("ix_requests_user_id",)),
+    ("requests of a lawyer", lambda s: select(Request).where(Request.assigned_lawyer == s["lawyer_id"]),
+     ("ix_requests_assigned_lawyer",)),
+    ("payment of a request", lambda s: select(Payment).where(Payment.request_id == s["request_id"]),
+     ("ix_payments_request_id",)),
+    ("lawyer profile of a user", lambda s: select(Lawyer).where(Lawyer.user_id == s["lawyer_user_id"]),
+     ("ix_lawyers_user_id",)),
+    ("GET /articles (newest)", lambda s: select(Article.id, Article.title, Article.created_at)
+     .order_by(Article.created_at.desc(), Article.id.desc()).limit(21), ("ix_articles_created_at_id",)),
+    ("GET /articles?query=", lambda s: select(Article.id, Article.title)
+     .where(Article.search_vector.op("@@")(func.websearch_to_tsquery("english", s["words"])))
+     .order_by(func.ts_rank(Article.search_vector, func.websearch_to_tsquery("english", s["words"])).desc())
+     .limit(10), ("ix_articles_search_vector",)),
+    ("articles with a tag", lambda s: select(func.count()).select_from(Article)
+     .where(Article.tags.contains([s["tag"]])), ("ix_articles_tags",)),
+    ("attachments of an entity", lambda s: select(Attachment)
+     .where(Attachment.entity_type == "request", Attachment.entity_id == s["entity_id"]), ("ix_attachments_entity",)),
+]
+
+
+def seed_attachments(conn, n: int) -> int:
+    """Attachments for the first n requests (datagen has no attachments table)."""
+    have = conn.execute(text("SELECT count(*) FROM attachments")).scalar()
+    if have >= n:
+        return 0
+    inserted = conn.execute(text(
+        "INSERT INTO attachments (id, entity_type, entity_id, s3_url, mime) "
+        "SELECT gen_random_uuid(), 'request', id, :mark || id, 'application/pdf' FROM requests LIMIT :n"
+    ), {"mark": ATTACHMENT_MARK, "n": n - have}).rowcount
+    conn.execute(text("ANALYZE attachments"))
+    conn.commit()
+    return inserted
+
+
+def _index_nodes(plan: dict):
+    if plan.get("Node Type") in INDEX_NODES:
+        yield plan["Node Type"], plan.get("Index Name")
+    for child in plan.get("Plans", ()):
+        yield from _index_nodes(child)
+
+
+def parent_indexes(conn) -> dict[str, str]:
+    """Index of a partition -> the partitioned index it belongs to (requests is partitioned)."""
+    return dict(conn.execute(text(
+        "SELECT c.relname, p.relname FROM pg_inherits i JOIN pg_class c ON c.oid = i.inhrelid "
+        "JOIN pg_class p ON p.oid = i.inhparent WHERE c.relkind = 'i'"
+    )).all())
+
+
+def explain(conn, stmt) -> dict:
+    compiled = stmt.compile(dialect=engine.dialect)
+    return conn.exec_driver_sql(f"EXPLAIN (FORMAT JSON) {compiled}", compiled.params).scalar()[0]
+
+
+@pytest.fixture(scope="module")
+def conn():
+    try:
+        with engine.connect() as c:
+            c.execute(text("SELECT 1"))
+    except OperationalError as e:
+        pytest.skip(f"Postgres at DATABASE_URL is not reachable: {e}")
+    if SEED:
+        datagen.generate({t: int(n * SCALE) for t, n in datagen.BASE.items()})
+    with engine.connect() as c:
+        try:
+            if SEED:
+                seed_attachments(c, ATTACHMENTS)
+            yield c
+            c.rollback()
+        finally:
+            c.execute(text("DELETE FROM attachments WHERE s3_url LIKE :m"), {"m": ATTACHMENT_MARK + "%"})
+            c.commit()
+
+
+@pytest.fixture(scope="module")
+def samples(conn) -> dict:
+    out = {k: conn.execute(text(sql)).scalar() for k, sql in SAMPLE_SQL.items()}
+    out["tag"] = SPECIALTIES[0]
+    out["words"] = f"{datagen.WORDS[0]} {datagen.WORDS[1]}"
+    missing = [k for k, v in out.items() if v is None]
+    if missing:
+        pytest.fail(f"no data to sample {', '.join(missing)}; run with INDEX_CHECK_SEED=1")
+    return out
+
+
+@pytest.mark.parametrize("build, expected", [(b, e) for _, b, e in CHECKS], ids=[name for name, _, _ in CHECKS])
+def test_planned_with_index(conn, samples, build, expected):
+    plan = explain(conn, build(samples))
+    parents = parent_indexes(conn)
+    used = [(node, parents.get(index, index)) for node, index in _index_nodes(plan["Plan"])]
+    assert any(index in expected for _, index in used), (
+        f"expected a scan on {' or '.join(expected)}, got {used or plan['Plan']['Node Type']}\n"
+        + json.dumps(plan["Plan"], indent=2)
+    )